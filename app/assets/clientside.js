@@ -0,0 +1,438 @@
+// Filtragem no navegador (CLIENTSIDE_FILTERING=1): o servidor envia uma vez
+// por versão dos dados os agregados por (ano, faixa de avaliação) e os
+// sliders passam a ser respondidos aqui, sem ida ao servidor. Com gênero
+// ou país selecionado, a resposta volta a vir do servidor.
+(function () {
+    var LOADING_TEXT = 'Carregando...';
+
+    function selection(payload, yearRange, minRating) {
+        if (!payload.years || !yearRange) {
+            return null;
+        }
+        var low = Math.max(Math.ceil(yearRange[0]), payload.first_year) - payload.first_year;
+        var high = Math.min(Math.floor(yearRange[1]), payload.first_year + payload.years - 1) - payload.first_year;
+        var bucket = minRating > 0 ? Math.floor(minRating * 2) : 0;
+        if (low > high || bucket >= payload.buckets) {
+            return null;
+        }
+        return {low: low, high: high, bucket: bucket, buckets: payload.buckets};
+    }
+
+    function selected(sel, cell) {
+        var year = Math.floor(cell / sel.buckets);
+        return year >= sel.low && year <= sel.high && cell % sel.buckets >= sel.bucket;
+    }
+
+    function totalMovies(payload, sel) {
+        var total = 0;
+        for (var cell = 0; cell < payload.count.length; cell++) {
+            if (selected(sel, cell)) {
+                total += payload.count[cell];
+            }
+        }
+        return total;
+    }
+
+    // Soma as entradas esparsas por chave (gênero ou país), guardando a
+    // primeira posição para desempatar como o servidor.
+    function totalsByKey(sparse, sel, fields) {
+        var totals = {};
+        for (var i = 0; i < sparse.cell.length; i++) {
+            if (!selected(sel, sparse.cell[i])) {
+                continue;
+            }
+            var key = sparse.key[i];
+            var entry = totals[key];
+            if (!entry) {
+                entry = totals[key] = {key: key, first: sparse.first[i]};
+                fields.forEach(function (field) { entry[field] = 0; });
+            }
+            fields.forEach(function (field) { entry[field] += sparse[field][i]; });
+            entry.first = Math.min(entry.first, sparse.first[i]);
+        }
+        return Object.keys(totals).map(function (key) { return totals[key]; });
+    }
+
+    function ranked(entries, field, topN) {
+        return entries
+            .filter(function (entry) { return entry.count > 0; })
+            .sort(function (a, b) { return b[field] - a[field] || a.first - b.first; })
+            .slice(0, topN);
+    }
+
+    function emptyFigure(payload, title) {
+        return {data: [], layout: {template: payload ? payload.style.template : undefined, title: {text: title}}};
+    }
+
+    function figure(payload, data, layout) {
+        layout.template = payload.style.template;
+        layout.barmode = 'relative';
+        layout.title = {text: layout.title};
+        ['xaxis', 'yaxis'].forEach(function (axis) {
+            layout[axis] = Object.assign({title: {text: layout[axis + '_title']}}, layout[axis]);
+            delete layout[axis + '_title'];
+        });
+        return {data: data, layout: layout};
+    }
+
+    function colorAxis(colorscale, title) {
+        return {colorscale: colorscale, colorbar: {title: {text: title}}};
+    }
+
+    function noData(payload) {
+        return emptyFigure(payload, 'Nenhum dado disponível');
+    }
+
+    function stats(yearRange, minRating, payload) {
+        if (!payload) {
+            return [LOADING_TEXT, LOADING_TEXT, LOADING_TEXT, LOADING_TEXT];
+        }
+        var sel = selection(payload, yearRange, minRating);
+        var total = sel ? totalMovies(payload, sel) : 0;
+        if (!total) {
+            return ['0', '0.0', '$0', 'N/A'];
+        }
+
+        var ratingSum = 0;
+        var revenueSum = 0;
+        for (var cell = 0; cell < payload.count.length; cell++) {
+            if (selected(sel, cell)) {
+                ratingSum += payload.rating_sum[cell];
+                revenueSum += payload.revenue_sum[cell];
+            }
+        }
+        var genres = ranked(totalsByKey(payload.genre, sel, ['count']), 'count', 1);
+
+        return [
+            total.toLocaleString('en-US'),
+            (ratingSum / total).toFixed(1),
+            '$' + (revenueSum / 1e9).toFixed(1) + 'B',
+            genres.length ? payload.genres[genres[0].key] : 'N/A'
+        ];
+    }
+
+    function genreChart(yearRange, minRating, payload) {
+        if (!payload) {
+            return emptyFigure(null, 'Carregando dados...');
+        }
+        var sel = selection(payload, yearRange, minRating);
+        if (!sel || !totalMovies(payload, sel)) {
+            return noData(payload);
+        }
+
+        var counts = {};
+        var totals = {};
+        var sparse = payload.genre;
+        for (var i = 0; i < sparse.cell.length; i++) {
+            if (!selected(sel, sparse.cell[i])) {
+                continue;
+            }
+            var year = Math.floor(sparse.cell[i] / sel.buckets) + payload.first_year;
+            var genre = payload.genres[sparse.key[i]];
+            var key = year + '|' + genre;
+            counts[key] = (counts[key] || 0) + sparse.count[i];
+            totals[genre] = (totals[genre] || 0) + sparse.count[i];
+        }
+        if (!Object.keys(counts).length) {
+            return noData(payload);
+        }
+
+        var byName = function (a, b) { return a < b ? -1 : a > b ? 1 : 0; };
+        var topGenres = Object.keys(totals)
+            .sort(function (a, b) { return totals[b] - totals[a] || byName(a, b); })
+            .slice(0, 10);
+
+        var rows = Object.keys(counts).map(function (key) {
+            var parts = key.split('|');
+            return {year: Number(parts[0]), genre: parts[1], count: counts[key]};
+        }).filter(function (row) {
+            return topGenres.indexOf(row.genre) >= 0;
+        }).sort(function (a, b) {
+            return a.year - b.year || byName(a.genre, b.genre);
+        });
+
+        var traces = {};
+        var data = [];
+        rows.forEach(function (row) {
+            var trace = traces[row.genre];
+            if (!trace) {
+                var colors = payload.style.genre_colors;
+                trace = traces[row.genre] = {
+                    type: 'bar', name: row.genre, legendgroup: row.genre, x: [], y: [],
+                    marker: {color: colors[data.length % colors.length]},
+                    hovertemplate: 'Gênero=' + row.genre + '<br>Ano=%{x}<br>Número de Filmes=%{y}<extra></extra>'
+                };
+                data.push(trace);
+            }
+            trace.x.push(row.year);
+            trace.y.push(row.count);
+        });
+
+        var tickvals = [];
+        for (var tick = yearRange[0]; tick <= yearRange[1]; tick++) {
+            tickvals.push(tick);
+        }
+
+        return figure(payload, data, {
+            title: 'Top 10 Gêneros por Ano',
+            xaxis_title: 'Ano',
+            yaxis_title: 'Número de Filmes',
+            legend: {title: {text: 'Gênero'}, tracegroupgap: 0},
+            hovermode: 'closest',
+            xaxis: {tickmode: 'array', tickvals: tickvals, tickangle: 0}
+        });
+    }
+
+    function countriesChart(yearRange, minRating, payload) {
+        if (!payload) {
+            return emptyFigure(null, 'Carregando dados...');
+        }
+        var sel = selection(payload, yearRange, minRating);
+        var top = sel && totalMovies(payload, sel) ? ranked(totalsByKey(payload.country, sel, ['count']), 'count', 15) : [];
+        if (!top.length) {
+            return noData(payload);
+        }
+
+        var counts = top.map(function (entry) { return entry.count; });
+        return figure(payload, [{
+            type: 'bar', orientation: 'h',
+            x: counts,
+            y: top.map(function (entry) { return payload.countries[entry.key]; }),
+            marker: {color: counts, coloraxis: 'coloraxis'},
+            hovertemplate: 'Número de Filmes=%{x}<br>País=%{y}<extra></extra>'
+        }], {
+            title: 'Top 15 Países Produtores',
+            xaxis_title: 'Número de Filmes',
+            yaxis_title: 'País',
+            yaxis: {categoryorder: 'total ascending'},
+            coloraxis: colorAxis(payload.style.viridis, 'Número de Filmes')
+        });
+    }
+
+    function roiChart(yearRange, minRating, payload) {
+        if (!payload) {
+            return emptyFigure(null, 'Carregando dados...');
+        }
+        var sel = selection(payload, yearRange, minRating);
+        var roi = payload.roi;
+        var candidates = [];
+        if (sel && totalMovies(payload, sel)) {
+            for (var i = 0; i < roi.cell.length; i++) {
+                if (selected(sel, roi.cell[i])) {
+                    candidates.push(i);
+                }
+            }
+        }
+        if (!candidates.length) {
+            return noData(payload);
+        }
+
+        var top = candidates
+            .sort(function (a, b) { return roi.value[b] - roi.value[a] || roi.position[a] - roi.position[b]; })
+            .slice(0, 15);
+        var values = top.map(function (i) { return roi.value[i]; });
+
+        return figure(payload, [{
+            type: 'bar', orientation: 'h',
+            x: values,
+            y: top.map(function (i) { return roi.title[i]; }),
+            marker: {color: values, coloraxis: 'coloraxis'},
+            customdata: top.map(function (i) { return [roi.budget[i], roi.revenue[i], roi.year[i]]; }),
+            hovertemplate: 'ROI (%)=%{x:.2f}<br>' +
+                'Filme=%{y}<br>' +
+                'Orçamento=%{customdata[0]:,.2f}<br>' +
+                'Receita=%{customdata[1]:,.2f}<br>' +
+                'Ano=%{customdata[2]}<extra></extra>'
+        }], {
+            title: 'Top 15 Filmes por ROI (%)',
+            xaxis_title: 'ROI (%)',
+            yaxis_title: 'Filme',
+            yaxis: {categoryorder: 'total ascending'},
+            xaxis: {tickformat: '.2f'},
+            coloraxis: colorAxis(payload.style.rdylgn, 'ROI (%)')
+        });
+    }
+
+    function spendingChart(yearRange, minRating, payload) {
+        if (!payload) {
+            return [emptyFigure(null, 'Carregando dados...'), ''];
+        }
+        var sel = selection(payload, yearRange, minRating);
+        var top = sel && totalMovies(payload, sel) ? ranked(totalsByKey(payload.spending, sel, ['count', 'sum']), 'sum', 15) : [];
+        if (!top.length) {
+            return [noData(payload), ''];
+        }
+
+        var millions = top.map(function (entry) { return entry.sum / 1e6; });
+        var totalSpending = top.reduce(function (total, entry) { return total + entry.sum; }, 0) / 1e9;
+
+        var fig = figure(payload, [{
+            type: 'bar',
+            x: top.map(function (entry) { return payload.countries[entry.key]; }),
+            y: millions,
+            marker: {color: millions, coloraxis: 'coloraxis'},
+            customdata: top.map(function (entry) { return [entry.count, entry.sum / entry.count / 1e6]; }),
+            hovertemplate: 'País=%{x}<br>' +
+                'Orçamento Total= %{y:,.2f}<br>' +
+                'Número de Filmes= %{customdata[0]}<br>' +
+                'Orçamento Médio= %{customdata[1]:,.2f}<extra></extra>'
+        }], {
+            title: 'Gastos Totais com Filmes por País (Top 15)',
+            xaxis_title: 'País',
+            yaxis_title: 'Orçamento Total (Milhões $)',
+            xaxis: {categoryorder: 'total descending'},
+            coloraxis: colorAxis(payload.style.viridis, 'Orçamento Total (Milhões $)')
+        });
+
+        var info = {
+            namespace: 'dash_bootstrap_components',
+            type: 'Alert',
+            props: {
+                children: 'Total de investimentos: $' + totalSpending.toFixed(2) +
+                    ' bilhões. País com maior investimento: ' + payload.countries[top[0].key],
+                color: 'info'
+            }
+        };
+        return [fig, info];
+    }
+
+    // Correlação a partir das somas, como CorrelationAccumulator.from_sums
+    function correlation(n, sx, sy, sxx, syy, sxy) {
+        var meanX = sx / n;
+        var meanY = sy / n;
+        var m2x = Math.max(0, sxx - sx * meanX);
+        var m2y = Math.max(0, syy - sy * meanY);
+        if (n < 2 || m2x <= 0 || m2y <= 0) {
+            return NaN;
+        }
+        return (sxy - sx * meanY) / Math.sqrt(m2x * m2y);
+    }
+
+    function logTickText(tick) {
+        var value = Math.pow(10, tick);
+        if (tick >= 0) {
+            return value.toLocaleString('en-US', {maximumFractionDigits: 0});
+        }
+        return tick >= -4 ? String(Number(value.toPrecision(6))) : '1e-' + ('0' + (-tick)).slice(-2);
+    }
+
+    function popularityChart(yearRange, minRating, payload) {
+        if (!payload) {
+            return emptyFigure(null, 'Carregando dados...');
+        }
+        var sel = selection(payload, yearRange, minRating);
+        var density = payload.density;
+        if (!sel || !density || !density.edges.length) {
+            return noData(payload);
+        }
+
+        var sums = {density_n: 0, density_sx: 0, density_sy: 0, density_sxx: 0, density_syy: 0, density_sxy: 0};
+        for (var cell = 0; cell < payload.count.length; cell++) {
+            if (selected(sel, cell)) {
+                Object.keys(sums).forEach(function (name) { sums[name] += density[name][cell]; });
+            }
+        }
+        if (!sums.density_n) {
+            return noData(payload);
+        }
+
+        var rows = density.rating_bins;
+        var columns = density.popularity_bins;
+        var fine = new Array(rows * columns).fill(0);
+        var movies = 0;
+        for (var i = 0; i < density.cell.length; i++) {
+            if (selected(sel, density.cell[i])) {
+                fine[density.key[i]] += density.count[i];
+                movies += density.count[i];
+            }
+        }
+
+        // Com poucos filmes a grade é agrupada em blocos, como density_result
+        var factor = 1;
+        while (factor < 8 && movies < fine.length / (factor * factor)) {
+            factor *= 2;
+        }
+
+        var edges = density.edges.filter(function (edge, index) { return index % factor === 0; });
+        var ratingEdges = [];
+        for (var edge = 0; edge <= rows; edge += factor) {
+            ratingEdges.push(edge * 10 / rows);
+        }
+        var middles = function (values) {
+            return values.slice(1).map(function (value, index) { return (values[index] + value) / 2; });
+        };
+
+        var z = [];
+        var customdata = [];
+        for (var row = 0; row < rows / factor; row++) {
+            var line = new Array(columns / factor).fill(0);
+            for (var fineRow = row * factor; fineRow < (row + 1) * factor; fineRow++) {
+                for (var column = 0; column < columns; column++) {
+                    line[Math.floor(column / factor)] += fine[fineRow * columns + column];
+                }
+            }
+            z.push(line.map(function (count) { return count || null; }));
+            customdata.push(edges.slice(0, -1).map(function (value) { return Math.pow(10, value); }));
+        }
+
+        var ticks = [];
+        for (var tick = Math.floor(edges[0]); tick <= Math.ceil(edges[edges.length - 1]); tick++) {
+            ticks.push(tick);
+        }
+
+        var corr = correlation(sums.density_n, sums.density_sx, sums.density_sy,
+                               sums.density_sxx, sums.density_syy, sums.density_sxy);
+
+        return figure(payload, [{
+            type: 'heatmap',
+            x: middles(edges),
+            y: middles(ratingEdges),
+            z: z,
+            colorscale: 'Viridis',
+            colorbar: {title: {text: 'Filmes'}},
+            customdata: customdata,
+            hovertemplate: 'Popularidade a partir de %{customdata:,.1f}<br>' +
+                'Avaliação≈%{y:.2f}<br>' +
+                'Filmes=%{z}<extra></extra>'
+        }], {
+            title: movies.toLocaleString('en-US') + ' filmes · correlação ' + (isNaN(corr) ? 'N/A' : corr.toFixed(2)),
+            xaxis_title: 'Popularidade (escala log)',
+            yaxis_title: 'Avaliação',
+            xaxis: {tickmode: 'array', tickvals: ticks, ticktext: ticks.map(logTickText)}
+        });
+    }
+
+    function hasFilters(genres, countries) {
+        return Boolean((genres && genres.length) || (countries && countries.length));
+    }
+
+    // O pacote só conhece ano e avaliação: com gênero ou país selecionado
+    // os filtros vão para server-filters e os callbacks do servidor respondem
+    function serverFilters(yearRange, minRating, genres, countries, dataVersion) {
+        if (!hasFilters(genres, countries)) {
+            throw window.dash_clientside.PreventUpdate;
+        }
+        return [yearRange, minRating, genres, countries, dataVersion];
+    }
+
+    function local(render) {
+        return function (yearRange, minRating, genres, countries, payload) {
+            if (hasFilters(genres, countries)) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return render(yearRange, minRating, payload);
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dashboard: {
+            server_filters: serverFilters,
+            stats: local(stats),
+            genre_chart: local(genreChart),
+            countries_chart: local(countriesChart),
+            roi_chart: local(roiChart),
+            spending_chart: local(spendingChart),
+            popularity_chart: local(popularityChart)
+        }
+    });
+})();
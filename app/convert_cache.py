@@ -0,0 +1,34 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.columnar_cache import import_json, export_json
+from utils.logging_config import setup_logging
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Converte o cache de filmes entre JSON e o formato colunar")
+    parser.add_argument('source', help="Arquivo .json ou diretório .cols")
+    parser.add_argument('target', nargs='?', help="Destino da conversão")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    source = args.source.rstrip('/')
+
+    if source.endswith('.json'):
+        target = args.target or source[:-len('.json')] + '.cols'
+        import_json(source, target)
+    else:
+        target = args.target or source[:-len('.cols')] + '.json'
+        export_json(source, target)
+
+    print(f"{source} -> {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.tmdb_client import TMDBClient, TMDB_BASE_URL
+from utils.ingestion_store import IngestionStore
+from utils.partitioned_cache import PartitionedCache
+from utils.data_processor import DataProcessor, COMPACT_SCHEMA, COMPACT_COLUMNS
+from utils.aggregate_cube import load_or_build_cube
+from utils.logging_config import setup_logging
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingestão offline de filmes do TMDB")
+    parser.add_argument('--start-year', type=int, default=2015)
+    parser.add_argument('--end-year', type=int, default=2024)
+    parser.add_argument('--max-pages', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('TMDB_MAX_WORKERS', 8)))
+    parser.add_argument('--max-retries', type=int, default=5,
+                        help="Novas tentativas por requisição em 429, 5xx e erros de rede")
+    parser.add_argument('--base-url', default=os.getenv('TMDB_BASE_URL', TMDB_BASE_URL),
+                        help="URL base da API (p.ex. o servidor local de benchmarks/fake_tmdb.py)")
+    parser.add_argument('--store-dir', default='data/ingestion')
+    parser.add_argument('--cache-dir', default='data/movies',
+                        help="Diretório das partições anuais do cache colunar")
+    parser.add_argument('--export-json', action='store_true',
+                        help="Também exporta o resultado em JSON")
+    parser.add_argument('--append-to-response', default='',
+                        help="Sub-recursos extras buscados junto com /movie/{id}, separados por vírgula")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    api_key = os.getenv('TMDB_API_KEY')
+    if not api_key:
+        print("TMDB_API_KEY não configurada")
+        sys.exit(1)
+
+    store = IngestionStore(args.store_dir)
+    print(f"Checkpoint: {len(store.pages)} páginas e {len(store.details)} filmes já salvos")
+
+    extras = [resource for resource in args.append_to_response.split(',') if resource]
+    client = TMDBClient(api_key, max_workers=args.workers, store=store, append_to_response=extras,
+                        max_retries=args.max_retries, base_url=args.base_url)
+
+    started = time.time()
+    movies = client.get_movies_by_year_range(args.start_year, args.end_year, args.max_pages)
+    print(client.request_stats.report())
+
+    if client.last_run_failures:
+        print(f"Ingestão incompleta: {client.last_run_failures} falhas. Execute novamente para retomar do checkpoint.")
+        sys.exit(1)
+
+    cache = PartitionedCache(args.cache_dir)
+    by_year = {}
+    for movie in movies:
+        by_year.setdefault(movie['year'], []).append(movie)
+    for year, year_movies in sorted(by_year.items()):
+        cache.write(year, year_movies)
+
+    years = range(args.start_year, args.end_year + 1)
+    columns = COMPACT_COLUMNS if COMPACT_SCHEMA else None
+    processor = DataProcessor.from_columns(cache.load(years, columns), compact=COMPACT_SCHEMA)
+    load_or_build_cube(processor, cache.cube_path(args.start_year, args.end_year))
+
+    if args.export_json:
+        client.save_data_to_cache(movies, f'movies_{args.start_year}_{args.end_year}.json')
+
+    print(f"{len(movies)} filmes salvos em {args.cache_dir} ({len(by_year)} partições) em {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
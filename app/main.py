@@ -1,158 +1,460 @@
-
 import os
 import sys
+import time
+import logging
+import functools
 import dash
-from dash import dcc, html, Input, Output
-import plotly.express as px
+from dash import dcc, html, Input, Output, State, ClientsideFunction
+from flask import jsonify, Response, g, has_request_context
 from dotenv import load_dotenv
 import dash_bootstrap_components as dbc
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.tmdb_client import TMDBClient
-from utils.data_processor import DataProcessor
+from utils.tmdb_client import TMDBClient, TMDB_BASE_URL
+from utils.data_processor import DataProcessor, COMPACT_SCHEMA, COMPACT_COLUMNS, GENRE_MAP
+from utils.ingestion_store import IngestionStore
+from utils.aggregate_cube import load_or_build_cube
+from utils.dataset import DatasetHolder
+from utils.refresh_scheduler import RefreshScheduler
+from utils.partitioned_cache import PartitionedCache
+from utils.client_payload import build_client_payload
+from utils.api import create_api
+from utils.sqlite_store import SQLiteStore, write_sqlite, read_meta
+from utils.lru_cache import LRUCache
+from utils.file_lock import file_lock
+from utils.compression import compress_responses
+from utils.figures import (GENRE_CHART, COUNTRIES_CHART, ROI_CHART, SPENDING_CHART, POPULARITY_CHART,
+                           LOADING_TITLE, EMPTY_TITLE, genre_figure, countries_figure, roi_figure,
+                           spending_figure, popularity_figure)
+from utils.metrics import REGISTRY, Counter, Gauge, Histogram, pop_data_seconds
+from utils.logging_config import setup_logging
 
 load_dotenv()
+setup_logging()
+
+logger = logging.getLogger(__name__)
 
 API_KEY = os.getenv('TMDB_API_KEY', '42e2738ab23b0fb7344caddfdec2fa98')
 
-tmdb_client = TMDBClient(API_KEY)
-movies_data = tmdb_client.get_cached_or_fetch_movies(2015, 2024)
+START_YEAR = 2015
+END_YEAR = 2024
+DATA_REFRESH_ENABLED = os.getenv('DATA_REFRESH_ENABLED', '1') == '1'
+DATA_BACKEND = os.getenv('DATA_BACKEND', 'memory')
+SQLITE_PATH = os.getenv('SQLITE_PATH', f'data/movies_{START_YEAR}_{END_YEAR}.sqlite')
+CLIENTSIDE_FILTERING = os.getenv('CLIENTSIDE_FILTERING', '0') == '1'
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', '1') == '1'
+
+if CLIENTSIDE_FILTERING and DATA_BACKEND == 'sqlite':
+    # O pacote do navegador é montado a partir do cubo em memória
+    logger.warning("CLIENTSIDE_FILTERING requer DATA_BACKEND=memory; os filtros continuam no servidor")
+    CLIENTSIDE_FILTERING = False
+
+def create_tmdb_client() -> TMDBClient:
+    return TMDBClient(API_KEY, max_workers=int(os.getenv('TMDB_MAX_WORKERS', 8)), store=IngestionStore(),
+                      base_url=os.getenv('TMDB_BASE_URL', TMDB_BASE_URL))
+
+def load_data_processor() -> DataProcessor:
+    if DATA_BACKEND == 'sqlite':
+        return load_sqlite_store()
+
+    columns = COMPACT_COLUMNS if COMPACT_SCHEMA else None
+    client = create_tmdb_client()
+    movies_columns = client.get_cached_or_fetch_columns(START_YEAR, END_YEAR, columns)
+
+    data_processor = DataProcessor.from_columns(movies_columns, compact=COMPACT_SCHEMA)
+    data_processor.use_cube(load_or_build_cube(data_processor, client.cache.cube_path(START_YEAR, END_YEAR)))
+    return data_processor
+
+def load_sqlite_store() -> SQLiteStore:
+    client = create_tmdb_client()
+    missing = client.fill_partitions(START_YEAR, END_YEAR)
+    if missing:
+        logger.warning("Anos sem dados", extra={'years': missing})
+
+    # O banco só é refeito quando alguma partição muda; os workers apenas o abrem
+    years = range(START_YEAR, END_YEAR + 1)
+    signature = client.cache.signature(years)
+    with file_lock(SQLITE_PATH):
+        meta = read_meta(SQLITE_PATH)
+        if meta is None or meta['signature'] != signature:
+            processor = DataProcessor.from_columns(client.cache.load(years, COMPACT_COLUMNS), compact=True)
+            write_sqlite(processor, SQLITE_PATH, signature)
+            logger.info("Banco SQLite gerado", extra={'path': SQLITE_PATH, 'movies': len(processor)})
+
+    return SQLiteStore(SQLITE_PATH)
+
+dataset = DatasetHolder(load_data_processor)
+
+refresh_scheduler = RefreshScheduler(
+    dataset, create_tmdb_client, load_data_processor,
+    PartitionedCache(), START_YEAR, END_YEAR
+)
+
+LOADING_TEXT = "Carregando..."
 
-data_processor = DataProcessor(movies_data)
+CALLBACK_SECONDS = Histogram('dash_callback_seconds', 'Latência total dos callbacks', ['callback'])
+CALLBACK_RENDER_SECONDS = Histogram('dash_callback_render_seconds',
+                                    'Tempo dos callbacks fora do DataProcessor (montagem das figuras)', ['callback'])
+CALLBACK_ERRORS = Counter('dash_callback_errors_total', 'Exceções lançadas pelos callbacks', ['callback'])
+PAYLOAD_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 262144, 1048576)
+CALLBACK_RESPONSE_BYTES = Histogram('dash_callback_response_bytes', 'Tamanho das respostas dos callbacks antes da compressão',
+                                    ['callback'], buckets=PAYLOAD_BUCKETS)
+CALLBACK_WIRE_BYTES = Histogram('dash_callback_response_wire_bytes', 'Tamanho das respostas dos callbacks enviado ao navegador',
+                                ['callback', 'encoding'], buckets=PAYLOAD_BUCKETS)
+
+def collect_dataset():
+    processor = dataset.processor
+    if processor is None:
+        return []
+    return [((), len(processor))]
+
+def collect_dataset_bytes():
+    processor = dataset.processor
+    if not isinstance(processor, DataProcessor):
+        return []
+    bridges = [processor.genre_movie, processor.genre_id, processor.country_movie, processor.country_code]
+    return [((), int(processor.base_df.memory_usage(index=True).sum()) + sum(values.nbytes for values in bridges))]
+
+def collect_cache(field):
+    def collect():
+        processor = dataset.processor
+        if processor is None:
+            return []
+        return [((cache,), stats[field]) for cache, stats in processor.cache_stats().items()]
+    return collect
+
+Gauge('dataset_ready', 'Conjunto de dados carregado (1) ou carregando (0)',
+      collect=lambda: [((), 1 if dataset.processor is not None else 0)])
+Gauge('dataset_movies', 'Filmes no conjunto de dados atual', collect=collect_dataset)
+Gauge('dataset_memory_bytes', 'Memória do DataFrame e das pontes de gêneros/países', collect=collect_dataset_bytes)
+Gauge('dataset_load_seconds', 'Tempo da carga inicial dos dados',
+      collect=lambda: [((), dataset.loaded_at - dataset.started_at)] if dataset.loaded_at else [])
+Gauge('dataset_last_swap_timestamp_seconds', 'Momento da última troca do conjunto de dados',
+      collect=lambda: [((), dataset.swapped_at)] if dataset.swapped_at else [])
+Counter('data_processor_cache_hits_total', 'Acertos nos caches do DataProcessor', ['cache'], collect=collect_cache('hits'))
+Counter('data_processor_cache_misses_total', 'Falhas nos caches do DataProcessor', ['cache'], collect=collect_cache('misses'))
+Counter('data_processor_cache_shared_total', 'Acertos que aguardaram um cálculo em andamento da mesma chave',
+        ['cache'], collect=collect_cache('shared'))
+Gauge('data_processor_cache_entries', 'Entradas nos caches do DataProcessor', ['cache'], collect=collect_cache('size'))
+
+def instrumented(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if has_request_context():
+            g.callback = name
+        pop_data_seconds()
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            CALLBACK_ERRORS.inc(name)
+            logger.exception("Erro no callback", extra={'callback': name})
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            CALLBACK_SECONDS.observe(elapsed, name)
+            CALLBACK_RENDER_SECONDS.observe(max(0.0, elapsed - pop_data_seconds()), name)
+
+    return wrapper
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 app.title = "Movie Dashboard - Análise TMDB"
 
-app.layout = dbc.Container([
-    html.Div([
-        html.H1("🎬 Movie Dashboard", className="display-4"),
-        html.P("Análise de Dados de Filmes TMDB", className="lead")
-    ], className="text-center bg-primary text-white p-4 mb-4 rounded"),
-
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4(id="total-movies", className="text-primary"),
-                    html.P("Total de Filmes", className="text-muted")
+@app.server.route('/health')
+def health():
+    return jsonify({'status': 'ok'})
+
+@app.server.route('/ready')
+def ready():
+    status = dataset.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.server.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+app.server.register_blueprint(create_api(dataset, START_YEAR, END_YEAR))
+
+def observe_payload(response, raw_size):
+    callback = g.get('callback')
+    if callback is None:
+        return
+    CALLBACK_RESPONSE_BYTES.observe(raw_size, callback)
+    CALLBACK_WIRE_BYTES.observe(response.content_length or 0, callback, response.headers.get('Content-Encoding', 'identity'))
+
+compress_responses(app.server, enabled=RESPONSE_COMPRESSION, observe=observe_payload)
+
+def server_callback(outputs, inputs, **kwargs):
+    if not CLIENTSIDE_FILTERING:
+        return app.callback(outputs, inputs, **kwargs)
+
+    # No modo clientside os sliders são respondidos no navegador
+    # (assets/clientside.js); o servidor só entra com gênero ou país
+    # selecionado, quando o navegador publica os filtros em server-filters
+    def duplicate(output):
+        return Output(output.component_id, output.component_property, allow_duplicate=True)
+
+    def register(func):
+        fallback_outputs = [duplicate(output) for output in outputs] if isinstance(outputs, list) else duplicate(outputs)
+        app.callback(fallback_outputs, Input('server-filters', 'data'), prevent_initial_call=True)(
+            functools.wraps(func)(lambda filters: func(*filters))
+        )
+        return func
+
+    return register
+
+DEFAULT_YEAR_RANGE = [START_YEAR, END_YEAR]
+DEFAULT_MIN_RATING = 0
+
+INITIAL_VIEWS = LRUCache(2)
+
+def loading_view():
+    return {
+        'version': None,
+        'stats': [LOADING_TEXT] * 4,
+        'genre-chart': GENRE_CHART.initial(),
+        'countries-chart': COUNTRIES_CHART.initial(),
+        'roi-chart': ROI_CHART.initial(),
+        'spending-chart': SPENDING_CHART.initial(),
+        'spending-info': "",
+        'popularity-chart': POPULARITY_CHART.initial(),
+        'country-options': [],
+        'client-payload': None
+    }
+
+def build_initial_view(data_processor):
+    # Os próprios callbacks, sem a instrumentação, no estado inicial dos filtros
+    args = (DEFAULT_YEAR_RANGE, DEFAULT_MIN_RATING, None, None, data_processor.version)
+    spending_patch, spending_info = update_spending_chart.__wrapped__(*args)
+    return {
+        'version': data_processor.version,
+        'stats': list(update_stats.__wrapped__(*args)),
+        'genre-chart': GENRE_CHART.render(update_genre_chart.__wrapped__(*args)),
+        'countries-chart': COUNTRIES_CHART.render(update_countries_chart.__wrapped__(*args)),
+        'roi-chart': ROI_CHART.render(update_roi_chart.__wrapped__(*args)),
+        'spending-chart': SPENDING_CHART.render(spending_patch),
+        'spending-info': spending_info,
+        'popularity-chart': POPULARITY_CHART.render(update_popularity_chart.__wrapped__(*args)),
+        'country-options': update_country_options(data_processor.version),
+        'client-payload': CLIENT_PAYLOADS.get_or_compute(data_processor.version, lambda: build_client_payload(data_processor))
+                          if CLIENTSIDE_FILTERING else None
+    }
+
+def initial_view():
+    data_processor = dataset.processor
+    if data_processor is None:
+        return loading_view()
+    return INITIAL_VIEWS.get_or_compute(data_processor.version, lambda: build_initial_view(data_processor))
+
+def serve_layout():
+    # A visão padrão vai pronta no layout: a primeira carga não dispara callbacks
+    view = initial_view()
+    return dbc.Container([
+        html.Div([
+            html.H1("🎬 Movie Dashboard", className="display-4"),
+            html.P("Análise de Dados de Filmes TMDB", className="lead")
+        ], className="text-center bg-primary text-white p-4 mb-4 rounded"),
+
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4(view['stats'][0], id="total-movies", className="text-primary"),
+                        html.P("Total de Filmes", className="text-muted")
+                    ])
                 ])
-            ])
-        ], md=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4(id="avg-rating", className="text-success"),
-                    html.P("Avaliação Média", className="text-muted")
+            ], md=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4(view['stats'][1], id="avg-rating", className="text-success"),
+                        html.P("Avaliação Média", className="text-muted")
+                    ])
                 ])
-            ])
-        ], md=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4(id="total-revenue", className="text-info"),
-                    html.P("Receita Total", className="text-muted")
+            ], md=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4(view['stats'][2], id="total-revenue", className="text-info"),
+                        html.P("Receita Total", className="text-muted")
+                    ])
                 ])
-            ])
-        ], md=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4(id="top-genre", className="text-warning"),
-                    html.P("Gênero Mais Popular", className="text-muted")
+            ], md=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4(view['stats'][3], id="top-genre", className="text-warning"),
+                        html.P("Gênero Mais Popular", className="text-muted")
+                    ])
                 ])
+            ], md=3)
+        ], className="mb-4"),
+
+        dbc.Card([
+            dbc.CardBody([
+                html.H5("🔍 Filtros", className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Intervalo de Anos:"),
+                        dcc.RangeSlider(
+                            id='year-slider',
+                            min=START_YEAR,
+                            max=END_YEAR,
+                            step=1,
+                            marks={i: str(i) for i in range(START_YEAR, END_YEAR + 1)},
+                            value=DEFAULT_YEAR_RANGE,
+                            tooltip={"placement": "bottom", "always_visible": True}
+                        )
+                    ], md=6),
+                    dbc.Col([
+                        html.Label("Avaliação Mínima:"),
+                        dcc.Slider(
+                            id='rating-slider',
+                            min=0,
+                            max=10,
+                            step=0.5,
+                            marks={i: str(i) for i in range(0, 11, 2)},
+                            value=DEFAULT_MIN_RATING,
+                            tooltip={"placement": "bottom", "always_visible": True}
+                        )
+                    ], md=6)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Gêneros:"),
+                        dcc.Dropdown(
+                            id='genre-filter',
+                            options=[{'label': name, 'value': genre_id}
+                                     for genre_id, name in sorted(GENRE_MAP.items(), key=lambda item: item[1])],
+                            multi=True,
+                            placeholder="Todos os gêneros"
+                        )
+                    ], md=6),
+                    dbc.Col([
+                        html.Label("Países:"),
+                        dcc.Dropdown(
+                            id='country-filter',
+                            options=view['country-options'],
+                            multi=True,
+                            placeholder="Todos os países"
+                        )
+                    ], md=6)
+                ], className="mt-4")
             ])
-        ], md=3)
-    ], className="mb-4"),
-
-    dbc.Card([
-        dbc.CardBody([
-            html.H5("🔍 Filtros", className="mb-3"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Intervalo de Anos:"),
-                    dcc.RangeSlider(
-                        id='year-slider',
-                        min=2015,
-                        max=2024,
-                        step=1,
-                        marks={i: str(i) for i in range(2015, 2025)},
-                        value=[2015, 2024],
-                        tooltip={"placement": "bottom", "always_visible": True}
-                    )
-                ], md=6),
-                dbc.Col([
-                    html.Label("Avaliação Mínima:"),
-                    dcc.Slider(
-                        id='rating-slider',
-                        min=0,
-                        max=10,
-                        step=0.5,
-                        marks={i: str(i) for i in range(0, 11, 2)},
-                        value=0,
-                        tooltip={"placement": "bottom", "always_visible": True}
-                    )
-                ], md=6)
-            ])
-        ])
-    ], className="mb-4"),
-
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("📊 Gêneros Mais Frequentes por Ano", className="mb-3"),
-                    dcc.Graph(id='genre-chart')
+        ], className="mb-4"),
+
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("📊 Gêneros Mais Frequentes por Ano", className="mb-3"),
+                        dcc.Graph(id='genre-chart', figure=view['genre-chart'])
+                    ])
                 ])
-            ])
-        ], md=6),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("🌍 Países que Mais Produzem Filmes", className="mb-3"),
-                    dcc.Graph(id='countries-chart')
+            ], md=6),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("🌍 Países que Mais Produzem Filmes", className="mb-3"),
+                        dcc.Graph(id='countries-chart', figure=view['countries-chart'])
+                    ])
                 ])
-            ])
-        ], md=6)
-    ], className="mb-4"),
+            ], md=6)
+        ], className="mb-4"),
     
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("💰 Filmes com Melhor ROI", className="mb-3"),
-                    dcc.Graph(id='roi-chart')
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("💰 Filmes com Melhor ROI", className="mb-3"),
+                        dcc.Graph(id='roi-chart', figure=view['roi-chart'])
+                    ])
                 ])
-            ])
-        ], md=6),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("💰 Gastos com Filmes por País Produtor", className="mb-3"),
-                    dcc.Graph(id='spending-chart'),
-                    html.Div(id='spending-info', className="mt-2")
+            ], md=6),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("💰 Gastos com Filmes por País Produtor", className="mb-3"),
+                        dcc.Graph(id='spending-chart', figure=view['spending-chart']),
+                        html.Div(view['spending-info'], id='spending-info', className="mt-2")
+                    ])
                 ])
-            ])
-        ], md=6)
-    ], className="mb-4"),
+            ], md=6)
+        ], className="mb-4"),
 
-    html.Hr(),
-    html.P("Dashboard desenvolvido com Dash e dados do TMDB", 
-           className="text-center text-muted")
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("⭐ Popularidade x Avaliação", className="mb-3"),
+                        dcc.Graph(id='popularity-chart', figure=view['popularity-chart'])
+                    ])
+                ])
+            ], md=12)
+        ], className="mb-4"),
+
+        dcc.Interval(id='data-poll', interval=2000 if view['version'] is None else 60000),
+        dcc.Store(id='data-version', data=view['version']),
+        dcc.Store(id='client-payload', data=view['client-payload']),
+        dcc.Store(id='server-filters'),
+
+        html.Hr(),
+        html.P("Dashboard desenvolvido com Dash e dados do TMDB", 
+               className="text-center text-muted")
     
-], fluid=True)
+    ], fluid=True)
 
 @app.callback(
+    [Output('data-version', 'data'),
+     Output('data-poll', 'interval')],
+    Input('data-poll', 'n_intervals'),
+    State('data-version', 'data'),
+    prevent_initial_call=True
+)
+def poll_data_version(n_intervals, current_version):
+    processor = dataset.processor
+    if processor is None:
+        return dash.no_update, 2000
+
+    if processor.version == current_version:
+        return dash.no_update, 60000
+
+    return processor.version, 60000
+
+@app.callback(
+    Output('country-filter', 'options'),
+    Input('data-version', 'data'),
+    prevent_initial_call=True
+)
+def update_country_options(data_version):
+    processor = dataset.processor
+    if processor is None:
+        return dash.no_update
+
+    return [{'label': name, 'value': name} for name in sorted(processor.country_names.tolist())]
+
+@server_callback(
     [Output('total-movies', 'children'),
      Output('avg-rating', 'children'),
      Output('total-revenue', 'children'),
      Output('top-genre', 'children')],
     [Input('year-slider', 'value'),
-     Input('rating-slider', 'value')]
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
 )
-def update_stats(year_range, min_rating):
-    filtered_processor = data_processor.filter_data(year_range, min_rating)
-    stats = filtered_processor.get_summary_stats()
+@instrumented
+def update_stats(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return LOADING_TEXT, LOADING_TEXT, LOADING_TEXT, LOADING_TEXT
+
+    stats = data_processor.query(year_range, min_rating, 'get_summary_stats', genres=genres, countries=countries)
     
     if not stats:
         return "0", "0.0", "$0", "N/A"
@@ -164,179 +466,186 @@ def update_stats(year_range, min_rating):
     
     return total_movies, avg_rating, total_revenue, top_genre
 
-@app.callback(
+@server_callback(
     Output('genre-chart', 'figure'),
     [Input('year-slider', 'value'),
-     Input('rating-slider', 'value')]
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
 )
-def update_genre_chart(year_range, min_rating):
-    filtered_processor = data_processor.filter_data(year_range, min_rating)
-    genre_data = filtered_processor.get_genre_frequency_by_year()
+@instrumented
+def update_genre_chart(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return GENRE_CHART.message(LOADING_TITLE)
+
+    genre_data = data_processor.query(year_range, min_rating, 'get_genre_frequency_by_year', genres=genres, countries=countries)
     
     if genre_data.empty:
-        return px.bar(title="Nenhum dado disponível")
+        return GENRE_CHART.message(EMPTY_TITLE)
 
-    top_genres = genre_data.groupby('genre')['count'].sum().nlargest(10).index
-    filtered_genre_data = genre_data[genre_data['genre'].isin(top_genres)]
-    
-    fig = px.bar(
-        filtered_genre_data,
-        x='year',
-        y='count',
-        color='genre',
-        title="Top 10 Gêneros por Ano",
-        labels={'count': 'Número de Filmes', 'year': 'Ano', 'genre': 'Gênero'},
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    
-    fig.update_layout(
-        xaxis_title="Ano",
-        yaxis_title="Número de Filmes",
-        legend_title="Gênero",
-        hovermode='closest',
-        xaxis = dict(
-            tickmode='array',
-            tickvals=list(range(year_range[0], year_range[1] + 1)),
-            tickangle=0
-        )
-    )
-    
-    return fig
+    return genre_figure(genre_data, year_range)
 
-@app.callback(
+@server_callback(
     Output('countries-chart', 'figure'),
     [Input('year-slider', 'value'),
-     Input('rating-slider', 'value')]
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
 )
-def update_countries_chart(year_range, min_rating):
-    filtered_processor = data_processor.filter_data(year_range, min_rating)
-    countries_data = filtered_processor.get_top_producing_countries(15)
+@instrumented
+def update_countries_chart(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return COUNTRIES_CHART.message(LOADING_TITLE)
+
+    countries_data = data_processor.query(year_range, min_rating, 'get_top_producing_countries', 15, genres=genres, countries=countries)
     
     if countries_data.empty:
-        return px.bar(title="Nenhum dado disponível")
-    
-    fig = px.bar(
-        countries_data,
-        x='movie_count',
-        y='country',
-        orientation='h',
-        title="Top 15 Países Produtores",
-        labels={'movie_count': 'Número de Filmes', 'country': 'País'},
-        color='movie_count',
-        color_continuous_scale='viridis'
-    )
+        return COUNTRIES_CHART.message(EMPTY_TITLE)
     
-    fig.update_layout(
-        xaxis_title="Número de Filmes",
-        yaxis_title="País",
-        yaxis={'categoryorder': 'total ascending'}
-    )
-    
-    return fig
+    return countries_figure(countries_data)
 
-@app.callback(
+@server_callback(
     Output('roi-chart', 'figure'),
     [Input('year-slider', 'value'),
-     Input('rating-slider', 'value')]
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
 )
-def update_roi_chart(year_range, min_rating):
-    filtered_processor = data_processor.filter_data(year_range, min_rating)
-    roi_data = filtered_processor.get_best_roi_movies(1000000, 15)
+@instrumented
+def update_roi_chart(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return ROI_CHART.message(LOADING_TITLE)
+
+    roi_data = data_processor.query(year_range, min_rating, 'get_best_roi_movies', 1000000, 15, genres=genres, countries=countries)
     
     if roi_data.empty:
-        return px.bar(title="Nenhum dado disponível")
-    
-    fig = px.bar(
-        roi_data,
-        x='roi',
-        y='title',
-        orientation='h',
-        title="Top 15 Filmes por ROI (%)",
-        labels={'roi': 'ROI (%)', 'title': 'Filme', 'budget': 'Orçamento', 'revenue': 'Receita', 'year': 'Ano'},
-        color='roi',
-        color_continuous_scale='RdYlGn',
-        hover_data=['budget', 'revenue', 'year']
-    )
+        return ROI_CHART.message(EMPTY_TITLE)
 
-    fig.update_traces(
-        customdata=roi_data[['budget', 'revenue', 'year']].values,
-        hovertemplate=(
-            "ROI (%)=%{x:.2f}<br>"
-            "Filme=%{y}<br>"
-            "Orçamento=%{customdata[0]:,.2f}<br>"
-            "Receita=%{customdata[1]:,.2f}<br>"
-            "Ano=%{customdata[2]}<extra></extra>"
-        )
-    )
+    return roi_figure(roi_data)
 
-    fig.update_layout(
-        xaxis_title="ROI (%)",
-        yaxis_title="Filme",
-        yaxis={'categoryorder': 'total ascending'},
-        xaxis_tickformat = ".2f"
-    )
-
-    return fig
-
-@app.callback(
+@server_callback(
     [Output('spending-chart', 'figure'),
      Output('spending-info', 'children')],
     [Input('year-slider', 'value'),
-     Input('rating-slider', 'value')]
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
 )
-def update_spending_chart(year_range, min_rating):
-    filtered_processor = data_processor.filter_data(year_range, min_rating)
-    spending_data = filtered_processor.get_movie_spending_by_country(15)
+@instrumented
+def update_spending_chart(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return SPENDING_CHART.message(LOADING_TITLE), ""
+
+    spending_data = data_processor.query(year_range, min_rating, 'get_movie_spending_by_country', 15, genres=genres, countries=countries)
 
     if spending_data.empty:
-        return px.bar(title="Nenhum dado disponível"), ""
-
-    spending_data['budget_millions'] = spending_data['total_budget'] / 1e6
-    spending_data['avg_budget_millions'] = spending_data['avg_budget'] / 1e6
-
-    fig = px.bar(
-        spending_data,
-        x='country',
-        y='budget_millions',
-        title="Gastos Totais com Filmes por País (Top 15)",
-        labels={
-            'budget_millions': 'Orçamento Total (Milhões $)',
-            'country': 'País',
-            'movie_count': 'Número de Filmes',
-            'avg_budget_millions': 'Orçamento Médio (Milhões $)'
-        },
-        color='budget_millions',
-        color_continuous_scale='Viridis',
-        hover_data=['movie_count', 'avg_budget_millions']
-    )
+        return SPENDING_CHART.message(EMPTY_TITLE), ""
 
-    fig.update_traces(
-        customdata=spending_data[['movie_count', 'avg_budget_millions']].values,
-        hovertemplate=(
-            "País=%{x}<br>"
-            "Orçamento Total= %{y:,.2f}<br>"
-            "Número de Filmes= %{customdata[0]}<br>"
-            "Orçamento Médio= %{customdata[1]:,.2f}<extra></extra>"
-        )
+    top_country = spending_data.iloc[0]['country']
+    total_spending = spending_data['total_budget'].sum() / 1e9
+
+    spending_info = dbc.Alert(
+        f"Total de investimentos: ${total_spending:.2f} bilhões. País com maior investimento: {top_country}",
+        color="info"
     )
 
-    fig.update_layout(
-        xaxis_title="País",
-        yaxis_title="Orçamento Total (Milhões $)",
-        xaxis={'categoryorder': 'total descending'}
+    return spending_figure(spending_data), spending_info
+
+@server_callback(
+    Output('popularity-chart', 'figure'),
+    [Input('year-slider', 'value'),
+     Input('rating-slider', 'value'),
+     Input('genre-filter', 'value'),
+     Input('country-filter', 'value'),
+     Input('data-version', 'data')],
+    prevent_initial_call=True
+)
+@instrumented
+def update_popularity_chart(year_range, min_rating, genres, countries, data_version):
+    data_processor = dataset.processor
+    if data_processor is None:
+        return POPULARITY_CHART.message(LOADING_TITLE)
+
+    density = data_processor.query(year_range, min_rating, 'get_popularity_rating_density', genres=genres, countries=countries)
+
+    if not density:
+        return POPULARITY_CHART.message(EMPTY_TITLE)
+
+    return popularity_figure(density)
+
+CLIENT_PAYLOADS = LRUCache(2)
+
+if CLIENTSIDE_FILTERING:
+    @app.callback(
+        Output('client-payload', 'data'),
+        Input('data-version', 'data'),
+        prevent_initial_call=True
     )
+    @instrumented
+    def update_client_payload(data_version):
+        data_processor = dataset.processor
+        if data_processor is None:
+            return dash.no_update
 
-    top_country = spending_data.iloc[0]['country'] if not spending_data.empty else "N/A"
-    total_spending = spending_data['total_budget'].sum() / 1e9 if not spending_data.empty else 0
+        return CLIENT_PAYLOADS.get_or_compute(data_processor.version, lambda: build_client_payload(data_processor))
 
-    spending_info = dbc.Alert(
-        f"Total de investimentos: ${total_spending:.2f} bilhões. País com maior investimento: {top_country}",
-        color="info"
+    filter_inputs = [Input('year-slider', 'value'), Input('rating-slider', 'value'), Input('genre-filter', 'value'),
+                     Input('country-filter', 'value'), Input('client-payload', 'data')]
+
+    app.clientside_callback(
+        ClientsideFunction('dashboard', 'server_filters'),
+        Output('server-filters', 'data'),
+        [Input('year-slider', 'value'),
+         Input('rating-slider', 'value'),
+         Input('genre-filter', 'value'),
+         Input('country-filter', 'value'),
+         Input('data-version', 'data')],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        ClientsideFunction('dashboard', 'stats'),
+        [Output('total-movies', 'children'),
+         Output('avg-rating', 'children'),
+         Output('total-revenue', 'children'),
+         Output('top-genre', 'children')],
+        filter_inputs
+    )
+    app.clientside_callback(ClientsideFunction('dashboard', 'genre_chart'), Output('genre-chart', 'figure'), filter_inputs)
+    app.clientside_callback(ClientsideFunction('dashboard', 'countries_chart'), Output('countries-chart', 'figure'), filter_inputs)
+    app.clientside_callback(ClientsideFunction('dashboard', 'roi_chart'), Output('roi-chart', 'figure'), filter_inputs)
+    app.clientside_callback(
+        ClientsideFunction('dashboard', 'spending_chart'),
+        [Output('spending-chart', 'figure'),
+         Output('spending-info', 'children')],
+        filter_inputs
     )
+    app.clientside_callback(ClientsideFunction('dashboard', 'popularity_chart'), Output('popularity-chart', 'figure'), filter_inputs)
+
+# Definido depois dos callbacks: o Dash já chama serve_layout ao validar o layout
+app.layout = serve_layout
 
-    return fig, spending_info
+# Calcula a visão inicial assim que um conjunto de dados entra, na carga
+# (antes de o Gunicorn recriar os workers) e em cada troca
+dataset.load_callbacks.append(lambda processor: initial_view())
+dataset.swap_callbacks.append(lambda processor: initial_view())
+dataset.start()
 
 if __name__ == '__main__':
-    print("Iniciando Movie Dashboard...")
-    print(f"Dashboard disponível em: http://localhost:8050")
+    logger.info("Iniciando Movie Dashboard...")
+    logger.info("Dashboard disponível em: http://localhost:8050")
+    if DATA_REFRESH_ENABLED:
+        refresh_scheduler.start()
     app.run_server(debug=False, host='0.0.0.0', port=8050)
@@ -0,0 +1,336 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Tuple
+
+from .data_processor import (
+    DataProcessor, genre_name, plain_columns, density_cells, density_result,
+    DENSITY_POPULARITY_BINS, DENSITY_RATING_BINS
+)
+from .file_lock import file_lock, temp_path
+from .streaming_stats import CorrelationAccumulator
+
+RATING_BUCKETS = 21
+ROI_MIN_BUDGET = 1000000
+ROI_CANDIDATES = 20
+NO_POSITION = np.iinfo(np.int64).max
+DENSITY_CELLS = DENSITY_POPULARITY_BINS * DENSITY_RATING_BINS
+DENSITY_SUMS = ['density_n', 'density_sx', 'density_sy', 'density_sxx', 'density_syy', 'density_sxy']
+
+SUPPORTED_METHODS = [
+    'get_summary_stats',
+    'get_genre_frequency_by_year',
+    'get_top_producing_countries',
+    'get_movie_spending_by_country',
+    'get_best_roi_movies',
+    'get_popularity_rating_density',
+]
+
+DICT_METHODS = ['get_summary_stats', 'get_popularity_rating_density']
+
+
+def _cell_sum(cells: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    result = np.zeros(size, dtype=values.dtype if len(values) else np.int64)
+    if len(cells):
+        sums = pd.Series(values).groupby(cells).sum()
+        result[sums.index.to_numpy()] = sums.to_numpy()
+    return result
+
+
+def _cell_min(cells: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    result = np.full(size, NO_POSITION, dtype=np.int64)
+    if len(cells):
+        minimums = pd.Series(values).groupby(cells).min()
+        result[minimums.index.to_numpy()] = minimums.to_numpy()
+    return result
+
+
+def _suffix_sum(values: np.ndarray) -> np.ndarray:
+    return np.flip(np.cumsum(np.flip(values, axis=1), axis=1), axis=1)
+
+
+def _suffix_min(values: np.ndarray) -> np.ndarray:
+    return np.flip(np.minimum.accumulate(np.flip(values, axis=1), axis=1), axis=1)
+
+
+def _year_prefix(values: np.ndarray) -> np.ndarray:
+    zeros = np.zeros((1,) + values.shape[1:], dtype=values.dtype)
+    return np.concatenate([zeros, np.cumsum(values, axis=0)])
+
+
+class AggregateCube:
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.version = str(arrays['version'])
+        self.first_year = int(arrays['first_year'])
+        self.years = int(arrays['years'])
+        self.genre_ids = arrays['genre_ids']
+        self.raw = arrays
+        self._accumulate()
+
+    @classmethod
+    def build(cls, processor: DataProcessor) -> 'AggregateCube':
+        valid = ~np.isnan(processor.years)
+        arrays = {'version': processor.version, 'genre_ids': np.unique(processor.genre_id)}
+
+        if not valid.any():
+            arrays.update({'first_year': 0, 'years': 0})
+            return cls(arrays)
+
+        first_year = int(np.nanmin(processor.years))
+        years = int(np.nanmax(processor.years)) - first_year + 1
+        arrays.update({'first_year': first_year, 'years': years})
+
+        buckets = np.clip(np.floor(processor.ratings * 2), 0, RATING_BUCKETS - 1).astype(np.int64)
+        cells = np.full(processor.size, -1, dtype=np.int64)
+        cells[valid] = (processor.years[valid].astype(np.int64) - first_year) * RATING_BUCKETS + buckets[valid]
+        size = years * RATING_BUCKETS
+
+        movie_cells = cells[valid]
+        funded = valid & (processor.budgets > 0)
+        arrays['count'] = np.bincount(movie_cells, minlength=size)
+        arrays['rating_sum'] = np.bincount(movie_cells, weights=processor.ratings[valid], minlength=size)
+        arrays['revenue_sum'] = _cell_sum(movie_cells, processor.revenues[valid], size)
+        arrays['funded_count'] = np.bincount(cells[funded], minlength=size)
+        arrays['funded_sum'] = _cell_sum(cells[funded], processor.budgets[funded], size)
+
+        genres = len(arrays['genre_ids'])
+        genre_cells = cells[processor.genre_movie]
+        genre_rows = genre_cells >= 0
+        genre_keys = genre_cells[genre_rows] * genres + np.searchsorted(arrays['genre_ids'], processor.genre_id[genre_rows])
+        arrays['genre_count'] = np.bincount(genre_keys, minlength=size * genres)
+        arrays['genre_first'] = _cell_min(genre_keys, np.flatnonzero(genre_rows), size * genres)
+
+        countries = len(processor.country_names)
+        country_cells = cells[processor.country_movie]
+        country_rows = country_cells >= 0
+        country_keys = country_cells[country_rows] * countries + processor.country_code[country_rows]
+        arrays['country_count'] = np.bincount(country_keys, minlength=size * countries)
+        arrays['country_first'] = _cell_min(country_keys, np.flatnonzero(country_rows), size * countries)
+
+        country_budgets = processor.budgets[processor.country_movie]
+        spending_rows = country_rows & (country_budgets > 0)
+        spending_keys = country_cells[spending_rows] * countries + processor.country_code[spending_rows]
+        arrays['spending_sum'] = _cell_sum(spending_keys, country_budgets[spending_rows], size * countries)
+        arrays['spending_count'] = np.bincount(spending_keys, minlength=size * countries)
+        arrays['spending_first'] = _cell_min(spending_keys, np.flatnonzero(spending_rows), size * countries)
+
+        qualifying = np.flatnonzero(
+            valid & (processor.budgets >= ROI_MIN_BUDGET) & (processor.revenues > 0) & (processor.roi > 0)
+        )
+        order = np.lexsort((qualifying, -processor.roi[qualifying], cells[qualifying]))
+        ranked = qualifying[order]
+        ranked_cells = cells[ranked]
+        group_start = np.searchsorted(ranked_cells, ranked_cells, side='left')
+        keep = np.arange(len(ranked)) - group_start < ROI_CANDIDATES
+        arrays['roi_cell'] = ranked_cells[keep]
+        arrays['roi_position'] = ranked[keep].astype(np.int64)
+        arrays['roi_value'] = processor.roi[ranked[keep]]
+
+        popularity_edges = processor.popularity_edges()
+        arrays['density_edges'] = popularity_edges if popularity_edges is not None else np.array([])
+        density_rows = valid & (processor.popularity > 0) & (processor.ratings > 0)
+        if popularity_edges is None:
+            density_rows[:] = False
+        popularity = processor.popularity[density_rows].astype(np.float64)
+        ratings = processor.ratings[density_rows].astype(np.float64)
+        density_movie_cells = cells[density_rows]
+        density_keys = density_movie_cells * DENSITY_CELLS
+        if len(popularity):
+            density_keys = density_keys + density_cells(popularity, ratings, popularity_edges)
+        arrays['density_count'] = np.bincount(density_keys, minlength=size * DENSITY_CELLS)
+        for name, weights in zip(DENSITY_SUMS, [None, popularity, ratings, popularity * popularity,
+                                                ratings * ratings, popularity * ratings]):
+            arrays[name] = np.bincount(density_movie_cells, weights=weights, minlength=size)
+
+        return cls(arrays)
+
+    def _accumulate(self):
+        self.cumulative = {}
+        if self.years == 0:
+            return
+
+        shape = (self.years, RATING_BUCKETS)
+        genres = len(self.genre_ids)
+        countries = len(self.raw['country_count']) // (self.years * RATING_BUCKETS)
+
+        self.per_year = {}
+        for name in ['count', 'rating_sum', 'revenue_sum', 'funded_count', 'funded_sum'] + DENSITY_SUMS:
+            self.cumulative[name] = _year_prefix(_suffix_sum(self.raw[name].reshape(shape)))
+        self.per_year['count'] = _suffix_sum(self.raw['count'].reshape(shape))
+
+        self.per_year['genre_count'] = _suffix_sum(self.raw['genre_count'].reshape(shape + (genres,)))
+        self.cumulative['genre_count'] = _year_prefix(self.per_year['genre_count'])
+        self.per_year['genre_first'] = _suffix_min(self.raw['genre_first'].reshape(shape + (genres,)))
+
+        for name in ['country_count', 'spending_sum', 'spending_count']:
+            self.cumulative[name] = _year_prefix(_suffix_sum(self.raw[name].reshape(shape + (countries,))))
+        for name in ['country_first', 'spending_first']:
+            self.per_year[name] = _suffix_min(self.raw[name].reshape(shape + (countries,)))
+
+        self.cumulative['density_count'] = _year_prefix(
+            _suffix_sum(self.raw['density_count'].reshape(shape + (DENSITY_CELLS,)))
+        )
+
+    def save(self, path: str):
+        tmp_path = temp_path(path, '.npz')
+        np.savez(tmp_path, **self.raw)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['AggregateCube']:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls({name: data[name] for name in data.files})
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def supports(self, method: str, year_range: List[int], min_rating: float, args: Tuple) -> bool:
+        if method not in SUPPORTED_METHODS or not year_range:
+            return False
+        if (min_rating or 0) > 0 and (min_rating * 2) != math.floor(min_rating * 2):
+            return False
+        if method == 'get_best_roi_movies':
+            min_budget = args[0] if len(args) > 0 else 1000000
+            top_n = args[1] if len(args) > 1 else 20
+            return min_budget == ROI_MIN_BUDGET and top_n <= ROI_CANDIDATES
+        return True
+
+    def _selection(self, year_range: List[int], min_rating: float) -> Optional[Tuple[int, int, int]]:
+        if self.years == 0:
+            return None
+
+        low = max(math.ceil(year_range[0]), self.first_year) - self.first_year
+        high = min(math.floor(year_range[1]), self.first_year + self.years - 1) - self.first_year
+        bucket = int(min_rating * 2) if (min_rating or 0) > 0 else 0
+
+        if low > high or bucket >= RATING_BUCKETS:
+            return None
+        return low, high, bucket
+
+    def _total(self, name: str, selection: Tuple[int, int, int]) -> np.ndarray:
+        low, high, bucket = selection
+        cumulative = self.cumulative[name]
+        return cumulative[high + 1, bucket] - cumulative[low, bucket]
+
+    def _first(self, name: str, selection: Tuple[int, int, int]) -> np.ndarray:
+        low, high, bucket = selection
+        return self.per_year[name][low:high + 1, bucket].min(axis=0)
+
+    def answer(self, processor: DataProcessor, method: str, year_range: List[int], min_rating: float, args: Tuple):
+        selection = self._selection(year_range, min_rating)
+        if selection is None or self._total('count', selection) == 0:
+            return {} if method in DICT_METHODS else pd.DataFrame()
+
+        return getattr(self, f'_{method}')(processor, selection, *args)
+
+    def _get_summary_stats(self, processor: DataProcessor, selection: Tuple[int, int, int]) -> Dict:
+        low, high, bucket = selection
+        total = self._total('count', selection)
+        years = np.flatnonzero(self.per_year['count'][low:high + 1, bucket]) + low + self.first_year
+        funded_count = self._total('funded_count', selection)
+
+        return {
+            'total_movies': int(total),
+            'years_range': f"{years.min():.0f} - {years.max():.0f}",
+            'avg_rating': self._total('rating_sum', selection) / total,
+            'total_revenue': self._total('revenue_sum', selection),
+            'avg_budget': self._total('funded_sum', selection) / funded_count if funded_count else np.nan,
+            'top_genre': self._top_genre(selection)
+        }
+
+    def _top_genre(self, selection: Tuple[int, int, int]) -> str:
+        counts = self._total('genre_count', selection)
+        if not counts.any():
+            return "N/A"
+
+        first = self._first('genre_first', selection)
+        best = np.lexsort((first, -counts))[0]
+        return genre_name(int(self.genre_ids[best]))
+
+    def _get_genre_frequency_by_year(self, processor: DataProcessor, selection: Tuple[int, int, int]) -> pd.DataFrame:
+        low, high, bucket = selection
+        counts = self.per_year['genre_count'][low:high + 1, bucket]
+        year_index, genre_index = np.nonzero(counts)
+        if len(year_index) == 0:
+            return pd.DataFrame()
+
+        genre_df = pd.DataFrame({
+            'year': year_index + low + self.first_year,
+            'genre': [genre_name(int(gid)) for gid in self.genre_ids[genre_index]],
+            'count': counts[year_index, genre_index]
+        })
+        return genre_df.groupby(['year', 'genre'])['count'].sum().reset_index()
+
+    def _ranked_countries(self, values: np.ndarray, counts: np.ndarray, first: np.ndarray, top_n: int) -> np.ndarray:
+        present = np.flatnonzero(counts > 0)
+        order = np.lexsort((first[present], -values[present]))
+        return present[order][:top_n]
+
+    def _get_top_producing_countries(self, processor: DataProcessor, selection: Tuple[int, int, int],
+                                     top_n: int = 15) -> pd.DataFrame:
+        counts = self._total('country_count', selection)
+        top = self._ranked_countries(counts, counts, self._first('country_first', selection), top_n)
+        if len(top) == 0:
+            return pd.DataFrame()
+
+        return pd.DataFrame({
+            'country': processor.country_names[top],
+            'movie_count': counts[top]
+        })
+
+    def _get_movie_spending_by_country(self, processor: DataProcessor, selection: Tuple[int, int, int],
+                                       top_n: int = 15) -> pd.DataFrame:
+        counts = self._total('spending_count', selection)
+        totals = self._total('spending_sum', selection)
+        top = self._ranked_countries(totals, counts, self._first('spending_first', selection), top_n)
+        if len(top) == 0:
+            return pd.DataFrame()
+
+        return pd.DataFrame({
+            'country': processor.country_names[top],
+            'total_budget': totals[top],
+            'movie_count': counts[top],
+            'avg_budget': totals[top] / counts[top]
+        })
+
+    def _get_best_roi_movies(self, processor: DataProcessor, selection: Tuple[int, int, int],
+                             min_budget: int = 1000000, top_n: int = 20) -> pd.DataFrame:
+        low, high, bucket = selection
+        cells = self.raw['roi_cell']
+        years = cells // RATING_BUCKETS
+        selected = (years >= low) & (years <= high) & (cells % RATING_BUCKETS >= bucket)
+        if not selected.any():
+            return pd.DataFrame()
+
+        positions = self.raw['roi_position'][selected]
+        order = np.lexsort((positions, -self.raw['roi_value'][selected]))[:top_n]
+
+        return plain_columns(processor.base_df.iloc[positions[order]][
+            ['title', 'budget', 'revenue', 'roi', 'year', 'vote_average']
+        ])
+
+    def _get_popularity_rating_density(self, processor: DataProcessor, selection: Tuple[int, int, int]) -> Dict:
+        accumulator = CorrelationAccumulator.from_sums(*[self._total(name, selection) for name in DENSITY_SUMS])
+        if accumulator.n == 0:
+            return {}
+
+        counts = self._total('density_count', selection).reshape(DENSITY_RATING_BINS, DENSITY_POPULARITY_BINS)
+        return density_result(counts, self.raw['density_edges'], accumulator)
+
+
+def load_or_build_cube(processor: DataProcessor, path: str) -> AggregateCube:
+    cube = AggregateCube.load(path)
+    if cube is not None and cube.version == processor.version:
+        return cube
+    if not path:
+        return AggregateCube.build(processor)
+
+    with file_lock(path):
+        # Outro processo pode ter gerado o cubo enquanto este esperava o lock
+        cube = AggregateCube.load(path)
+        if cube is None or cube.version != processor.version:
+            cube = AggregateCube.build(processor)
+            cube.save(path)
+    return cube
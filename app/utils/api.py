@@ -0,0 +1,133 @@
+import math
+import orjson
+import pandas as pd
+from flask import Blueprint, Response, request
+from typing import List, Tuple
+
+from .dataset import DatasetHolder
+from .lru_cache import LRUCache
+from .metrics import Counter, Histogram
+
+API_PREFIX = '/api/v1'
+API_FORMAT = 'v1'
+RESPONSE_CACHE_SIZE = 256
+MAX_TOP_N = 100
+
+# Mesmos argumentos usados pelos callbacks, para compartilhar o cache de consultas
+ENDPOINTS = {
+    'summary': ('get_summary_stats', []),
+    'genres': ('get_genre_frequency_by_year', []),
+    'countries': ('get_top_producing_countries', ['top_n']),
+    'roi': ('get_best_roi_movies', ['min_budget', 'top_n']),
+    'spending': ('get_movie_spending_by_country', ['top_n']),
+}
+DEFAULTS = {'top_n': 15, 'min_budget': 1000000}
+
+API_SECONDS = Histogram('api_request_seconds', 'Latência dos endpoints JSON', ['endpoint'])
+API_RESPONSES = Counter('api_responses_total', 'Respostas dos endpoints JSON por status', ['endpoint', 'status'])
+
+
+def _json_response(payload, status: int = 200) -> Response:
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), status=status,
+                    mimetype='application/json')
+
+
+def _integer(args, name: str, default: int, low: int, high: int) -> int:
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' deve ser um número inteiro")
+    if not low <= number <= high:
+        raise ValueError(f"'{name}' deve estar entre {low} e {high}")
+    return number
+
+
+def parse_params(args, extra: List[str], start_year: int, end_year: int) -> Tuple[List[int], float, Tuple]:
+    year_range = [
+        _integer(args, 'year_start', start_year, start_year, end_year),
+        _integer(args, 'year_end', end_year, start_year, end_year)
+    ]
+    if year_range[0] > year_range[1]:
+        raise ValueError("'year_start' deve ser menor ou igual a 'year_end'")
+
+    try:
+        min_rating = float(args.get('min_rating', 0))
+    except ValueError:
+        raise ValueError("'min_rating' deve ser um número")
+    if not math.isfinite(min_rating) or not 0 <= min_rating <= 10:
+        raise ValueError("'min_rating' deve estar entre 0 e 10")
+
+    limits = {'top_n': (1, MAX_TOP_N), 'min_budget': (0, 10 ** 12)}
+    method_args = tuple(_integer(args, name, DEFAULTS[name], *limits[name]) for name in extra)
+    return year_range, min_rating, method_args
+
+
+def parse_list_filters(args) -> Tuple[List[int], List[str]]:
+    try:
+        genres = sorted({int(value) for value in args.getlist('genre')})
+    except ValueError:
+        raise ValueError("'genre' deve ser o id numérico de um gênero")
+    countries = sorted({value for value in args.getlist('country') if value})
+    return genres, countries
+
+
+def _records(result) -> object:
+    if isinstance(result, pd.DataFrame):
+        return result.to_dict('records')
+    return result
+
+
+def create_api(dataset: DatasetHolder, start_year: int, end_year: int) -> Blueprint:
+    api = Blueprint('api', __name__, url_prefix=API_PREFIX)
+    responses = LRUCache(RESPONSE_CACHE_SIZE)
+
+    @api.route('/<endpoint>')
+    def aggregate(endpoint: str):
+        if endpoint not in ENDPOINTS:
+            API_RESPONSES.inc('unknown', '404')
+            return _json_response({'error': f"Endpoint desconhecido: {endpoint}",
+                                   'endpoints': sorted(ENDPOINTS)}, 404)
+
+        with API_SECONDS.time(endpoint):
+            response = _aggregate(endpoint)
+        API_RESPONSES.inc(endpoint, str(response.status_code))
+        return response
+
+    def _aggregate(endpoint: str) -> Response:
+        processor = dataset.processor
+        if processor is None:
+            response = _json_response({'error': "Dados ainda carregando"}, 503)
+            response.headers['Retry-After'] = '2'
+            return response
+
+        method, extra = ENDPOINTS[endpoint]
+        try:
+            year_range, min_rating, method_args = parse_params(request.args, extra, start_year, end_year)
+            genres, countries = parse_list_filters(request.args)
+        except ValueError as error:
+            return _json_response({'error': str(error)}, 400)
+
+        # A resposta depende só da URL e da versão dos dados
+        etag = f'{API_FORMAT}-{processor.version}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            filters = dict({'year_start': year_range[0], 'year_end': year_range[1], 'min_rating': min_rating,
+                            'genres': genres, 'countries': countries}, **dict(zip(extra, method_args)))
+            key = (processor.version, endpoint, orjson.dumps(filters))
+            body = responses.get_or_compute(key, lambda: orjson.dumps({
+                'version': processor.version,
+                'filters': filters,
+                'data': _records(processor.query(year_range, min_rating, method, *method_args,
+                                                 genres=genres, countries=countries))
+            }, option=orjson.OPT_SERIALIZE_NUMPY))
+            response = Response(body, mimetype='application/json')
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return api
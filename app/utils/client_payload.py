@@ -0,0 +1,76 @@
+import numpy as np
+from typing import Dict, List
+
+from .aggregate_cube import AggregateCube, RATING_BUCKETS, DENSITY_CELLS, DENSITY_SUMS
+from .data_processor import DataProcessor, genre_name, DENSITY_POPULARITY_BINS, DENSITY_RATING_BINS
+from .figures import TEMPLATE, GENRE_COLORS, VIRIDIS, RDYLGN
+
+
+def _sparse(arrays: Dict[str, np.ndarray], present_in: str, keys: int, **values: str) -> Dict[str, List]:
+    # Só as células (ano, faixa de avaliação, chave) com filmes vão para o navegador
+    present = np.flatnonzero(arrays[present_in])
+    sparse = {
+        'cell': (present // keys).tolist(),
+        'key': (present % keys).tolist()
+    }
+    for field, name in values.items():
+        sparse[field] = arrays[name][present].tolist()
+    return sparse
+
+
+def figure_style() -> Dict:
+    return {
+        'template': TEMPLATE,
+        'genre_colors': GENRE_COLORS,
+        'viridis': VIRIDIS,
+        'rdylgn': RDYLGN
+    }
+
+
+def build_client_payload(processor: DataProcessor) -> Dict:
+    cube = processor.cube or AggregateCube.build(processor)
+    payload = {
+        'version': processor.version,
+        'first_year': cube.first_year,
+        'years': cube.years,
+        'buckets': RATING_BUCKETS,
+        'style': figure_style()
+    }
+    if cube.years == 0:
+        return payload
+
+    raw = cube.raw
+    genres = len(cube.genre_ids)
+    countries = len(processor.country_names)
+
+    roi_positions = raw['roi_position']
+    roi_movies = processor.base_df.iloc[roi_positions]
+
+    payload.update({
+        'count': raw['count'].tolist(),
+        'rating_sum': raw['rating_sum'].tolist(),
+        'revenue_sum': raw['revenue_sum'].tolist(),
+        'genres': [genre_name(int(gid)) for gid in cube.genre_ids],
+        'genre': _sparse(raw, 'genre_count', genres, count='genre_count', first='genre_first'),
+        'countries': processor.country_names.tolist(),
+        'country': _sparse(raw, 'country_count', countries, count='country_count', first='country_first'),
+        'spending': _sparse(raw, 'spending_count', countries,
+                            count='spending_count', sum='spending_sum', first='spending_first'),
+        'roi': {
+            'cell': raw['roi_cell'].tolist(),
+            'position': roi_positions.tolist(),
+            'value': raw['roi_value'].tolist(),
+            'title': roi_movies['title'].astype(str).tolist(),
+            'budget': roi_movies['budget'].tolist(),
+            'revenue': roi_movies['revenue'].tolist(),
+            'year': roi_movies['year'].astype(float).tolist()
+        },
+        'density': dict(
+            _sparse(raw, 'density_count', DENSITY_CELLS, count='density_count'),
+            edges=raw['density_edges'].tolist(),
+            popularity_bins=DENSITY_POPULARITY_BINS,
+            rating_bins=DENSITY_RATING_BINS,
+            **{name: raw[name].tolist() for name in DENSITY_SUMS}
+        )
+    })
+    return payload
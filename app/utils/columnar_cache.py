@@ -0,0 +1,179 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional
+
+from .file_lock import file_lock, temp_path
+
+FORMAT_VERSION = 1
+
+SCALAR_COLUMNS = {
+    'id': 'int64',
+    'title': 'str',
+    'original_language': 'str',
+    'release_date': 'datetime64[ns]',
+    'year': 'float64',
+    'vote_average': 'float64',
+    'vote_count': 'int64',
+    'popularity': 'float64',
+    'budget': 'int64',
+    'revenue': 'int64',
+    'runtime': 'int64',
+}
+
+BRIDGE_COLUMNS = ['genre_movie', 'genre_id', 'country_movie', 'country_code']
+
+DASHBOARD_COLUMNS = ['id', 'title', 'release_date', 'year', 'vote_average', 'popularity', 'budget', 'revenue']
+
+
+def _scalar_array(frame: pd.DataFrame, name: str, dtype: str) -> np.ndarray:
+    if name == 'year':
+        years = pd.to_datetime(frame.get('release_date'), errors='coerce').dt.year
+        return years.to_numpy(dtype=dtype)
+
+    if name not in frame:
+        values = pd.Series([None] * len(frame), dtype=object)
+    else:
+        values = frame[name]
+
+    if dtype == 'str':
+        return np.array(values.fillna('').astype(str).tolist(), dtype=str)
+    if dtype.startswith('datetime64'):
+        return pd.to_datetime(values, errors='coerce').to_numpy(dtype=dtype)
+    return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=dtype)
+
+
+def build_bridges(movies: List[Dict]) -> Dict[str, np.ndarray]:
+    genre_movie, genre_id = [], []
+    country_movie, country_code = [], []
+    country_codes = {}
+
+    for position, movie in enumerate(movies):
+        genre_ids = movie.get('genre_ids')
+        if isinstance(genre_ids, list):
+            for gid in genre_ids:
+                genre_movie.append(position)
+                genre_id.append(gid)
+
+        countries = movie.get('production_countries')
+        if isinstance(countries, list):
+            for country in countries:
+                if isinstance(country, dict) and 'name' in country:
+                    code = country_codes.setdefault(country['name'], len(country_codes))
+                    country_movie.append(position)
+                    country_code.append(code)
+
+    return {
+        'genre_movie': np.array(genre_movie, dtype=np.int32),
+        'genre_id': np.array(genre_id, dtype=np.int32),
+        'country_movie': np.array(country_movie, dtype=np.int32),
+        'country_code': np.array(country_code, dtype=np.int32),
+        'country_names': list(country_codes)
+    }
+
+
+def write_columnar(movies: List[Dict], path: str):
+    frame = pd.DataFrame(movies)
+    bridges = build_bridges(movies)
+
+    tmp_path = temp_path(path)
+    os.makedirs(tmp_path)
+
+    for name, dtype in SCALAR_COLUMNS.items():
+        np.save(os.path.join(tmp_path, f'{name}.npy'), _scalar_array(frame, name, dtype))
+
+    for name in BRIDGE_COLUMNS:
+        np.save(os.path.join(tmp_path, f'{name}.npy'), bridges[name])
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': len(movies),
+        'columns': list(SCALAR_COLUMNS),
+        'country_names': bridges['country_names']
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # Diretórios não são substituídos atomicamente: o antigo sai do caminho
+    # por rename e só é apagado depois da troca, com os leitores bloqueados
+    # pelo lock (os arrays já mapeados por eles continuam válidos)
+    old_path = temp_path(path, '.old')
+    with file_lock(path):
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_columnar(path: str, columns: List[str] = None) -> Optional[Dict]:
+    with file_lock(path, shared=True):
+        return _load_columnar(path, columns)
+
+
+def _load_columnar(path: str, columns: List[str] = None) -> Optional[Dict]:
+    try:
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if meta.get('version') != FORMAT_VERSION:
+        return None
+
+    if columns is None:
+        columns = DASHBOARD_COLUMNS
+
+    data = {}
+    for name in list(columns) + BRIDGE_COLUMNS:
+        if name in meta['columns'] or name in BRIDGE_COLUMNS:
+            data[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+    data['country_names'] = np.array(meta['country_names'], dtype=object)
+    return data
+
+
+def columnar_to_records(path: str) -> List[Dict]:
+    data = load_columnar(path, list(SCALAR_COLUMNS))
+    if data is None:
+        return []
+
+    genres = {}
+    for movie, gid in zip(data['genre_movie'].tolist(), data['genre_id'].tolist()):
+        genres.setdefault(movie, []).append(gid)
+
+    countries = {}
+    names = data['country_names']
+    for movie, code in zip(data['country_movie'].tolist(), data['country_code'].tolist()):
+        countries.setdefault(movie, []).append({'name': names[code]})
+
+    release_dates = pd.Series(data['release_date']).dt.strftime('%Y-%m-%d')
+
+    records = []
+    for position in range(len(data['id'])):
+        record = {}
+        for name in SCALAR_COLUMNS:
+            if name == 'release_date':
+                value = release_dates[position]
+                record[name] = value if isinstance(value, str) else None
+            elif name == 'year':
+                value = data[name][position]
+                record[name] = None if np.isnan(value) else int(value)
+            else:
+                record[name] = data[name][position].item()
+        record['genre_ids'] = genres.get(position, [])
+        record['production_countries'] = countries.get(position, [])
+        records.append(record)
+
+    return records
+
+
+def import_json(json_path: str, path: str):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        write_columnar(json.load(f), path)
+
+
+def export_json(path: str, json_path: str):
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(columnar_to_records(path), f, ensure_ascii=False, indent=2)
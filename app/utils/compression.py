@@ -0,0 +1,66 @@
+import gzip
+import zlib
+from flask import Flask, Response, request
+from typing import Callable, Optional
+
+from .lru_cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 500
+COMPRESS_LEVEL = 6
+BROTLI_QUALITY = 5
+# Respostas grandes e repetidas (bundles JS do Dash, layout) são comprimidas uma vez só
+CACHE_MIN_BYTES = 64 * 1024
+CACHE_SIZE = 32
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+
+def choose_encoding(accept_encoding) -> Optional[str]:
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encoding.best_match(encodings)
+
+
+def compress_responses(server: Flask, enabled: bool = True, observe: Callable[[Response, int], None] = None):
+    compressed_bodies = LRUCache(CACHE_SIZE)
+
+    @server.after_request
+    def compress(response: Response) -> Response:
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        data = response.get_data()
+        raw_size = len(data)
+
+        encoding = None
+        if (enabled and raw_size >= COMPRESS_MIN_BYTES and 200 <= response.status_code < 300
+                and 'Content-Encoding' not in response.headers
+                and response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            encoding = choose_encoding(request.accept_encodings)
+            response.vary.add('Accept-Encoding')
+
+        if encoding is not None:
+            if raw_size >= CACHE_MIN_BYTES:
+                key = (encoding, raw_size, zlib.crc32(data))
+                body = compressed_bodies.get_or_compute(key, lambda: _compress(data, encoding))
+            else:
+                body = _compress(data, encoding)
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+
+            # O corpo comprimido não é byte a byte o original
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                response.set_etag(etag, weak=True)
+
+        if observe is not None:
+            observe(response, raw_size)
+        return response
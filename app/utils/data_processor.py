@@ -1,14 +1,231 @@
-
+import os
+import copy
+import time
+import hashlib
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple
-from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+from .columnar_cache import BRIDGE_COLUMNS, build_bridges
+from .lru_cache import LRUCache
+from .streaming_stats import CorrelationAccumulator
+from .metrics import Counter, Histogram, timed, add_data_seconds
+
+FILTER_CACHE_SIZE = 32
+QUERY_CACHE_SIZE = 512
+
+# Grade fina do gráfico de densidade; a resolução exibida se adapta ao
+# número de filmes agrupando células vizinhas.
+DENSITY_POPULARITY_BINS = 64
+DENSITY_RATING_BINS = 40
+DENSITY_CHUNK_SIZE = 1 << 18
+
+COMPACT_SCHEMA = os.getenv('COMPACT_SCHEMA', '1') == '1'
+
+# Esquema compacto: só as colunas lidas pelo dashboard, com tipos menores.
+# Dinheiro continua em int64 e o ROI em float64 para não alterar o ranking.
+COMPACT_COLUMNS = ['id', 'title', 'year', 'vote_average', 'popularity', 'budget', 'revenue']
+COMPACT_DTYPES = {
+    'id': 'int32',
+    'year': 'float32',
+    'vote_average': 'float32',
+    'popularity': 'float32',
+    'budget': 'int64',
+    'revenue': 'int64'
+}
+CATEGORY_COLUMNS = ['title']
+# Categórico só compensa quando há repetição suficiente de valores
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+GENRE_MAP = {
+    28: 'Ação', 12: 'Aventura', 16: 'Animação', 35: 'Comédia',
+    80: 'Crime', 99: 'Documentário', 18: 'Drama', 10751: 'Família',
+    14: 'Fantasia', 36: 'História', 27: 'Terror', 10402: 'Música',
+    9648: 'Mistério', 10749: 'Romance', 878: 'Ficção Científica',
+    10770: 'TV Movie', 53: 'Thriller', 10752: 'Guerra', 37: 'Faroeste'
+}
+
+METHOD_SECONDS = Histogram('data_processor_method_seconds', 'Latência dos métodos do DataProcessor', ['method'])
+QUERY_SECONDS = Histogram('data_processor_query_seconds', 'Latência das consultas sem cache por origem', ['method', 'source'])
+QUERY_TOTAL = Counter('data_processor_queries_total', 'Consultas ao DataProcessor por resultado do cache', ['method', 'cache'])
+
+def genre_name(genre_id: int) -> str:
+    return GENRE_MAP.get(genre_id, f'Gênero {genre_id}')
+
+def density_cells(popularity: np.ndarray, ratings: np.ndarray, popularity_edges: np.ndarray) -> np.ndarray:
+    width = popularity_edges[1] - popularity_edges[0]
+    x = np.floor((np.log10(popularity) - popularity_edges[0]) / width).astype(np.int64)
+    y = np.floor(ratings * DENSITY_RATING_BINS / 10).astype(np.int64)
+    x = np.clip(x, 0, DENSITY_POPULARITY_BINS - 1)
+    y = np.clip(y, 0, DENSITY_RATING_BINS - 1)
+    return y * DENSITY_POPULARITY_BINS + x
+
+def density_result(counts: np.ndarray, popularity_edges: np.ndarray, accumulator: CorrelationAccumulator) -> Dict:
+    movies = int(counts.sum())
+    factor = 1
+    while factor < 8 and movies < counts.size / (factor * factor):
+        factor *= 2
+
+    rows, columns = counts.shape
+    counts = counts.reshape(rows // factor, factor, columns // factor, factor).sum(axis=(1, 3))
+
+    return {
+        'counts': counts,
+        'popularity_edges': popularity_edges[::factor],
+        'rating_edges': np.linspace(0, 10, DENSITY_RATING_BINS + 1)[::factor],
+        'correlation': accumulator.correlation,
+        'movies': movies
+    }
+
+def build_index(keys: np.ndarray, movies: np.ndarray) -> Dict[int, np.ndarray]:
+    # Índice de ids ordenados: para cada chave (gênero ou país), as posições
+    # dos filmes em ordem crescente, sem repetição
+    if len(keys) == 0:
+        return {}
+
+    order = np.lexsort((movies, keys))
+    sorted_keys = keys[order]
+    sorted_movies = movies[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(sorted_keys)]
+    return {
+        int(sorted_keys[start]): np.unique(sorted_movies[start:end])
+        for start, end in zip(starts, ends)
+    }
+
+def plain_columns(df: pd.DataFrame) -> pd.DataFrame:
+    categorical = df.select_dtypes('category').columns
+    if len(categorical) == 0:
+        return df
+    return df.astype({name: object for name in categorical})
 
 class DataProcessor:
     
-    def __init__(self, movies_data: List[Dict]):
+    def __init__(self, movies_data: List[Dict], compact: bool = False):
         self.movies_data = movies_data
-        self.df = self._create_dataframe()
+        self.base_df = self._create_dataframe()
+        self._set_bridges(build_bridges(movies_data or []))
+        if compact:
+            self.base_df = self._compact(self.base_df)
+            # Os registros originais (overview, poster_path...) não são mais necessários
+            self.movies_data = []
+        self._set_arrays()
+
+    @classmethod
+    def from_columns(cls, columns: Dict, compact: bool = False) -> 'DataProcessor':
+        processor = cls.__new__(cls)
+        processor.movies_data = []
+        processor.base_df = processor._create_dataframe_from_columns(columns)
+        if compact:
+            processor.base_df = processor._compact(processor.base_df)
+        processor._set_bridges(columns or {})
+        processor._set_arrays()
+        return processor
+
+    def _compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+
+        df = df[[name for name in COMPACT_COLUMNS if name in df]].copy()
+
+        for name, dtype in COMPACT_DTYPES.items():
+            if name in df:
+                df[name] = df[name].astype(dtype)
+
+        for name in CATEGORY_COLUMNS:
+            if name in df and df[name].nunique() <= len(df) * CATEGORY_MAX_UNIQUE_RATIO:
+                df[name] = df[name].astype('category')
+
+        df['roi'] = np.where(df['budget'] > 0,
+                            (df['revenue'] - df['budget']) / df['budget'] * 100,
+                            0)
+        return df
+
+    def memory_report(self) -> Dict:
+        columns = {name: int(size) for name, size in self.base_df.memory_usage(index=False, deep=True).items()}
+        bridges = {
+            name: int(getattr(self, name).nbytes)
+            for name in ['genre_movie', 'genre_id', 'country_movie', 'country_code']
+        }
+        total = sum(columns.values()) + sum(bridges.values())
+        return {
+            'movies': self.size,
+            'columns': columns,
+            'bridges': bridges,
+            'total_bytes': total,
+            'bytes_per_movie': total / self.size if self.size else 0
+        }
+
+    def _set_bridges(self, bridges: Dict):
+        empty = np.array([], dtype=np.int32)
+        self.genre_movie = np.asarray(bridges.get('genre_movie', empty))
+        self.genre_id = np.asarray(bridges.get('genre_id', empty))
+        self.country_movie = np.asarray(bridges.get('country_movie', empty))
+        self.country_code = np.asarray(bridges.get('country_code', empty))
+        self.country_names = np.asarray(bridges.get('country_names', []), dtype=object)
+        self.genre_index = build_index(self.genre_id, self.genre_movie)
+        self.country_index = build_index(self.country_code, self.country_movie)
+        self.country_codes = {name: code for code, name in enumerate(self.country_names.tolist())}
+
+    def _set_arrays(self):
+        self.mask = None
+        self.size = len(self.base_df)
+        self.filter_cache = LRUCache(FILTER_CACHE_SIZE)
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE)
+        self.cube = None
+        self._version = None
+        self._popularity_edges = None
+
+        if self.base_df.empty:
+            self.years = np.array([], dtype=float)
+            self.ratings = np.array([], dtype=float)
+            self.popularity = np.array([], dtype=float)
+            self.budgets = np.array([], dtype=float)
+            self.revenues = np.array([], dtype=float)
+            self.roi = np.array([], dtype=float)
+            return
+
+        years = self.base_df['year'].to_numpy()
+        self.years = years if years.dtype.kind == 'f' else years.astype(float)
+        self.ratings = self.base_df['vote_average'].to_numpy()
+        self.popularity = self.base_df['popularity'].to_numpy()
+        self.budgets = self.base_df['budget'].to_numpy()
+        self.revenues = self.base_df['revenue'].to_numpy()
+        self.roi = self.base_df['roi'].to_numpy()
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            columns = [name for name in ['id', 'title', 'year', 'vote_average', 'popularity', 'budget', 'revenue']
+                       if name in self.base_df]
+            if columns:
+                digest.update(pd.util.hash_pandas_object(self.base_df[columns], index=False).to_numpy().tobytes())
+            for values in [self.genre_movie, self.genre_id, self.country_movie, self.country_code]:
+                digest.update(np.ascontiguousarray(values).tobytes())
+            digest.update('\n'.join(self.country_names.tolist()).encode('utf-8'))
+            self._version = digest.hexdigest()
+        return self._version
+
+    def use_cube(self, cube):
+        if cube is not None and cube.version != self.version:
+            raise ValueError("O cubo de agregados não corresponde a este conjunto de dados")
+        self.cube = cube
+        self.query_cache.clear()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self.mask is None:
+            return self.base_df
+        return self.base_df[self.mask]
+
+    def _rows(self) -> np.ndarray:
+        if self.mask is None:
+            return np.ones(self.size, dtype=bool)
+        return self.mask
+
+    def __len__(self) -> int:
+        return self.size if self.mask is None else int(np.count_nonzero(self.mask))
     
     def _create_dataframe(self) -> pd.DataFrame:
         if not self.movies_data:
@@ -29,60 +246,64 @@ class DataProcessor:
         
         return df
     
+    def _create_dataframe_from_columns(self, columns: Dict) -> pd.DataFrame:
+        if not columns or len(columns['id']) == 0:
+            return pd.DataFrame()
+
+        scalar_columns = {
+            name: values for name, values in columns.items()
+            if name not in BRIDGE_COLUMNS and name != 'country_names'
+        }
+        df = pd.DataFrame(scalar_columns, copy=False)
+
+        df['roi'] = np.where(df['budget'] > 0,
+                            (df['revenue'] - df['budget']) / df['budget'] * 100,
+                            0)
+
+        return df
+    
+    @timed(METHOD_SECONDS)
     def get_genre_frequency_by_year(self) -> pd.DataFrame:
-        genre_year_data = []
-        
-        for _, movie in self.df.iterrows():
-            if pd.isna(movie['year']) or not movie.get('genre_ids'):
-                continue
-                
-            year = int(movie['year'])
-            genre_ids = movie['genre_ids']
-            
-            genre_map = {
-                28: 'Ação', 12: 'Aventura', 16: 'Animação', 35: 'Comédia',
-                80: 'Crime', 99: 'Documentário', 18: 'Drama', 10751: 'Família',
-                14: 'Fantasia', 36: 'História', 27: 'Terror', 10402: 'Música',
-                9648: 'Mistério', 10749: 'Romance', 878: 'Ficção Científica',
-                10770: 'TV Movie', 53: 'Thriller', 10752: 'Guerra', 37: 'Faroeste'
-            }
-            
-            for genre_id in genre_ids:
-                genre_name = genre_map.get(genre_id, f'Gênero {genre_id}')
-                genre_year_data.append({
-                    'year': year,
-                    'genre': genre_name,
-                    'count': 1
-                })
-        
-        if not genre_year_data:
+        if len(self) == 0 or len(self.genre_movie) == 0:
             return pd.DataFrame()
-        
-        genre_df = pd.DataFrame(genre_year_data)
-        return genre_df.groupby(['year', 'genre']).sum().reset_index()
+
+        years = self.years[self.genre_movie]
+        valid = self._rows()[self.genre_movie] & ~np.isnan(years)
+        if not valid.any():
+            return pd.DataFrame()
+
+        genre_df = pd.DataFrame({
+            'year': years[valid].astype(int),
+            'genre_id': self.genre_id[valid]
+        })
+        counts = genre_df.groupby(['year', 'genre_id']).size().reset_index(name='count')
+        counts['genre'] = [genre_name(gid) for gid in counts['genre_id']]
+
+        return counts.groupby(['year', 'genre'])['count'].sum().reset_index()
     
+    @timed(METHOD_SECONDS)
     def get_top_producing_countries(self, top_n: int = 15) -> pd.DataFrame:
-        country_counts = Counter()
-        
-        for _, movie in self.df.iterrows():
-            countries = movie.get('production_countries', [])
-            if isinstance(countries, list):
-                for country in countries:
-                    if isinstance(country, dict) and 'name' in country:
-                        country_counts[country['name']] += 1
-        
-        if not country_counts:
+        codes = self.country_code[self._rows()[self.country_movie]]
+        if len(codes) == 0:
             return pd.DataFrame()
-        
-        top_countries = country_counts.most_common(top_n)
-        return pd.DataFrame(top_countries, columns=['country', 'movie_count'])
+
+        # sort=False + ordenação estável mantém o desempate do Counter.most_common
+        counts = pd.Series(codes).groupby(codes, sort=False).size()
+        counts = counts.sort_values(ascending=False, kind='stable').head(top_n)
+
+        return pd.DataFrame({
+            'country': self.country_names[counts.index.to_numpy()],
+            'movie_count': counts.to_numpy()
+        })
     
+    @timed(METHOD_SECONDS)
     def get_best_roi_movies(self, min_budget: int = 1000000, top_n: int = 20) -> pd.DataFrame:
-        roi_df = self.df[
-            (self.df['budget'] >= min_budget) & 
-            (self.df['revenue'] > 0) & 
-            (self.df['roi'] > 0)
-        ].copy()
+        if len(self) == 0:
+            return pd.DataFrame()
+
+        candidates = self._rows() & (self.budgets >= min_budget) & (self.revenues > 0)
+        roi_df = self.base_df[candidates]
+        roi_df = roi_df[roi_df['roi'] > 0]
         
         if roi_df.empty:
             return pd.DataFrame()
@@ -91,13 +312,16 @@ class DataProcessor:
             ['title', 'budget', 'revenue', 'roi', 'year', 'vote_average']
         ]
         
-        return roi_df
+        return plain_columns(roi_df)
     
+    @timed(METHOD_SECONDS)
     def get_popularity_rating_correlation(self) -> Tuple[pd.DataFrame, float]:
-        corr_df = self.df[
-            (self.df['popularity'] > 0) & 
-            (self.df['vote_average'] > 0)
-        ][['title', 'popularity', 'vote_average', 'year']].copy()
+        if len(self) == 0:
+            return pd.DataFrame(), 0
+
+        popularity = self.base_df['popularity'].to_numpy()
+        rows = self._rows() & (popularity > 0) & (self.ratings > 0)
+        corr_df = self.base_df.loc[rows, ['title', 'popularity', 'vote_average', 'year']]
         
         if corr_df.empty:
             return pd.DataFrame(), 0
@@ -106,92 +330,174 @@ class DataProcessor:
         
         return corr_df, correlation
 
-    def get_movie_spending_by_country(self, top_n: int = 15) -> pd.DataFrame:
-        country_spending = {}
-        country_movie_count = {}
+    def popularity_edges(self) -> Optional[np.ndarray]:
+        # Faixa de popularidade do conjunto completo, em log10, para que a
+        # grade não mude conforme os filtros
+        if self._popularity_edges is None:
+            positive = self.popularity[self.popularity > 0]
+            if len(positive) == 0:
+                return None
+            low = np.log10(positive.min(), dtype=np.float64)
+            high = np.log10(positive.max(), dtype=np.float64)
+            if high <= low:
+                high = low + 1
+            self._popularity_edges = np.linspace(low, high, DENSITY_POPULARITY_BINS + 1)
+        return self._popularity_edges
 
-        for _, movie in self.df.iterrows():
-            budget = movie.get('budget', 0)
-            countries = movie.get('production_countries', [])
+    @timed(METHOD_SECONDS)
+    def get_popularity_rating_density(self) -> Dict:
+        popularity_edges = self.popularity_edges()
+        if popularity_edges is None or len(self) == 0:
+            return {}
 
-            if budget > 0 and isinstance(countries, list):
-                for country in countries:
-                    if isinstance(country, dict) and 'name' in country:
-                        country_name = country['name']
-                        if country_name not in country_spending:
-                            country_spending[country_name] = 0
-                            country_movie_count[country_name] = 0
+        counts = np.zeros(DENSITY_RATING_BINS * DENSITY_POPULARITY_BINS, dtype=np.int64)
+        accumulator = CorrelationAccumulator()
+        rows = self._rows()
 
-                        country_spending[country_name] += budget
-                        country_movie_count[country_name] += 1
+        # Processa em blocos para limitar a memória temporária em datasets grandes
+        for start in range(0, self.size, DENSITY_CHUNK_SIZE):
+            chunk = slice(start, start + DENSITY_CHUNK_SIZE)
+            popularity = self.popularity[chunk]
+            ratings = self.ratings[chunk]
+            valid = rows[chunk] & (popularity > 0) & (ratings > 0)
+            if not valid.any():
+                continue
 
-        if not country_spending:
-            return pd.DataFrame()
+            popularity = popularity[valid].astype(np.float64)
+            ratings = ratings[valid].astype(np.float64)
+            accumulator.update(popularity, ratings)
+            counts += np.bincount(density_cells(popularity, ratings, popularity_edges), minlength=len(counts))
+
+        if accumulator.n == 0:
+            return {}
+
+        return density_result(counts.reshape(DENSITY_RATING_BINS, DENSITY_POPULARITY_BINS), popularity_edges, accumulator)
 
-        spending_data = []
-        for country, total_budget in country_spending.items():
-            movie_count = country_movie_count[country]
-            avg_budget = total_budget / movie_count if movie_count > 0 else 0
+    @timed(METHOD_SECONDS)
+    def get_movie_spending_by_country(self, top_n: int = 15) -> pd.DataFrame:
+        if len(self) == 0 or len(self.country_code) == 0:
+            return pd.DataFrame()
 
-            spending_data.append({
-                'country': country,
-                'total_budget': total_budget,
-                'movie_count': movie_count,
-                'avg_budget': avg_budget
-            })
+        budgets = self.budgets[self.country_movie]
+        funded = self._rows()[self.country_movie] & (budgets > 0)
+        if not funded.any():
+            return pd.DataFrame()
 
-        spending_df = pd.DataFrame(spending_data)
-        spending_df = spending_df.sort_values('total_budget', ascending=False).head(top_n)
+        spending = pd.Series(budgets[funded]).groupby(self.country_code[funded], sort=False).agg(['sum', 'count'])
+        spending = spending.sort_values('sum', ascending=False, kind='stable').head(top_n)
 
-        return spending_df
+        return pd.DataFrame({
+            'country': self.country_names[spending.index.to_numpy()],
+            'total_budget': spending['sum'].to_numpy(),
+            'movie_count': spending['count'].to_numpy(),
+            'avg_budget': spending['sum'].to_numpy() / spending['count'].to_numpy()
+        })
     
+    @timed(METHOD_SECONDS)
     def get_summary_stats(self) -> Dict:
-        if self.df.empty:
+        total_movies = len(self)
+        if total_movies == 0:
             return {}
+
+        rows = self._rows()
+        years = self.years[rows]
+        funded = self.budgets[rows & (self.budgets > 0)]
         
         return {
-            'total_movies': len(self.df),
-            'years_range': f"{self.df['year'].min():.0f} - {self.df['year'].max():.0f}",
-            'avg_rating': self.df['vote_average'].mean(),
-            'total_revenue': self.df['revenue'].sum(),
-            'avg_budget': self.df[self.df['budget'] > 0]['budget'].mean(),
+            'total_movies': total_movies,
+            'years_range': f"{np.nanmin(years):.0f} - {np.nanmax(years):.0f}",
+            'avg_rating': self.ratings[rows].mean(dtype=np.float64),
+            'total_revenue': self.revenues[rows].sum(),
+            'avg_budget': funded.mean() if len(funded) else np.nan,
             'top_genre': self._get_most_common_genre()
         }
     
     def _get_most_common_genre(self) -> str:
-        genre_counts = Counter()
-        
-        for _, movie in self.df.iterrows():
-            genre_ids = movie.get('genre_ids', [])
-            if isinstance(genre_ids, list):
-                genre_counts.update(genre_ids)
-        
-        if not genre_counts:
+        genre_ids = self.genre_id[self._rows()[self.genre_movie]]
+        if len(genre_ids) == 0:
             return "N/A"
-        
-        genre_map = {
-            28: 'Ação', 12: 'Aventura', 16: 'Animação', 35: 'Comédia',
-            80: 'Crime', 99: 'Documentário', 18: 'Drama', 10751: 'Família',
-            14: 'Fantasia', 36: 'História', 27: 'Terror', 10402: 'Música',
-            9648: 'Mistério', 10749: 'Romance', 878: 'Ficção Científica',
-            10770: 'TV Movie', 53: 'Thriller', 10752: 'Guerra', 37: 'Faroeste'
-        }
-        
-        most_common_id = genre_counts.most_common(1)[0][0]
-        return genre_map.get(most_common_id, f'Gênero {most_common_id}')
+
+        genre_counts = pd.Series(genre_ids).groupby(genre_ids, sort=False).size()
+        return genre_name(int(genre_counts.idxmax()))
     
-    def filter_data(self, year_range: List[int] = None, min_rating: float = 0) -> 'DataProcessor':
-        filtered_df = self.df.copy()
-        
+    @timed(METHOD_SECONDS)
+    def filter_data(self, year_range: List[int] = None, min_rating: float = 0,
+                    genres: List[int] = None, countries: List[str] = None) -> 'DataProcessor':
+        mask = self._rows().copy()
+
         if year_range:
-            filtered_df = filtered_df[
-                (filtered_df['year'] >= year_range[0]) & 
-                (filtered_df['year'] <= year_range[1])
-            ]
-        
+            mask &= (self.years >= year_range[0]) & (self.years <= year_range[1])
+
         if min_rating > 0:
-            filtered_df = filtered_df[filtered_df['vote_average'] >= min_rating]
-        
-        filtered_movies = filtered_df.to_dict('records')
-        
-        return DataProcessor(filtered_movies)
+            mask &= self.ratings >= min_rating
+
+        # Vários gêneros (ou países) se somam; gênero e país se intersectam
+        if genres:
+            mask &= self._indexed_rows(self.genre_index, genres)
+
+        if countries:
+            codes = [self.country_codes[name] for name in countries if name in self.country_codes]
+            mask &= self._indexed_rows(self.country_index, codes)
+
+        return self._view(mask)
+
+    def _indexed_rows(self, index: Dict[int, np.ndarray], keys: List[int]) -> np.ndarray:
+        rows = np.zeros(self.size, dtype=bool)
+        for key in keys:
+            positions = index.get(int(key))
+            if positions is not None:
+                rows[positions] = True
+        return rows
+
+    def _view(self, mask: np.ndarray) -> 'DataProcessor':
+        view = copy.copy(self)
+        view.mask = mask
+        view.filter_cache = LRUCache(FILTER_CACHE_SIZE)
+        view.query_cache = LRUCache(QUERY_CACHE_SIZE)
+        return view
+
+    def _filter_key(self, year_range: List[int] = None, min_rating: float = 0,
+                    genres: List[int] = None, countries: List[str] = None) -> Tuple:
+        return (
+            tuple(int(year) for year in year_range) if year_range else None,
+            float(min_rating or 0),
+            tuple(sorted(int(genre) for genre in genres)) if genres else (),
+            tuple(sorted(countries)) if countries else ()
+        )
+
+    def cached_filter(self, year_range: List[int] = None, min_rating: float = 0,
+                      genres: List[int] = None, countries: List[str] = None) -> 'DataProcessor':
+        key = self._filter_key(year_range, min_rating, genres, countries)
+        return self.filter_cache.get_or_compute(key, lambda: self.filter_data(year_range, min_rating, genres, countries))
+
+    def query(self, year_range: List[int], min_rating: float, method: str, *args,
+              genres: List[int] = None, countries: List[str] = None):
+        key = self._filter_key(year_range, min_rating, genres, countries) + (method, args)
+        started = time.perf_counter()
+        computed = []
+
+        def compute():
+            computed.append(True)
+            return self._compute_query(year_range, min_rating, method, args, genres, countries)
+
+        result = self.query_cache.get_or_compute(key, compute)
+        add_data_seconds(time.perf_counter() - started)
+        QUERY_TOTAL.inc(method, 'miss' if computed else 'hit')
+        return result
+
+    def _compute_query(self, year_range: List[int], min_rating: float, method: str, args: Tuple,
+                       genres: List[int] = None, countries: List[str] = None):
+        # O cubo não tem dimensão de gênero/país; esses filtros usam os índices
+        if (self.cube is not None and self.mask is None and not genres and not countries
+                and self.cube.supports(method, year_range, min_rating, args)):
+            with QUERY_SECONDS.time(method, 'cube'):
+                return self.cube.answer(self, method, year_range, min_rating, args)
+
+        with QUERY_SECONDS.time(method, 'view'):
+            return getattr(self.cached_filter(year_range, min_rating, genres, countries), method)(*args)
+
+    def cache_stats(self) -> Dict:
+        return {
+            'filter': self.filter_cache.stats(),
+            'query': self.query_cache.stats()
+        }
@@ -0,0 +1,94 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .data_processor import DataProcessor
+
+logger = logging.getLogger(__name__)
+
+LOAD_RETRY_BASE = 1.0
+LOAD_RETRY_MAX = 60.0
+
+class DatasetHolder:
+
+    def __init__(self, loader: Callable[[], DataProcessor]):
+        self.loader = loader
+        self.processor: Optional[DataProcessor] = None
+        self.error: Optional[Exception] = None
+        self.started_at = time.time()
+        self.loaded_at = None
+        self.swapped_at = None
+        self.load_callbacks: List[Callable[[DataProcessor], None]] = []
+        self.swap_callbacks: List[Callable[[DataProcessor], None]] = []
+        self.ready = threading.Event()
+        self.thread = None
+        self.deferred = False
+        self.attempts = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.ready.is_set() or (self.thread is not None and self.thread.is_alive()):
+                return
+
+            self.error = None
+            self.thread = threading.Thread(target=self._load, name='dataset-loader', daemon=True)
+            self.thread.start()
+
+    def defer(self):
+        # Worker criado antes de o master terminar a carga: mostra o estado de
+        # carregamento até ser substituído, sem disputar os mesmos arquivos
+        self.deferred = True
+
+    def _load(self):
+        while True:
+            self.attempts += 1
+            try:
+                processor = self.loader()
+                break
+            except Exception as e:
+                self.error = e
+                delay = min(LOAD_RETRY_MAX, LOAD_RETRY_BASE * 2 ** (self.attempts - 1))
+                logger.exception("Erro ao carregar os dados", extra={'attempt': self.attempts, 'retry_in': delay})
+                time.sleep(delay)
+
+        self.processor = processor
+        self.error = None
+        self.loaded_at = time.time()
+
+        # Rodam antes de ready: o master do Gunicorn só recria os workers
+        # depois disso, e eles herdam o que os callbacks prepararam
+        for callback in self.load_callbacks:
+            try:
+                callback(processor)
+            except Exception:
+                logger.exception("Erro no callback de carga")
+
+        self.ready.set()
+        logger.info("Dados prontos", extra={
+            'movies': len(processor),
+            'load_seconds': round(self.loaded_at - self.started_at, 3)
+        })
+
+    def swap(self, processor: DataProcessor):
+        # Troca atômica da referência: callbacks em andamento continuam com o
+        # processor antigo, que é liberado assim que terminam.
+        self.processor = processor
+        self.swapped_at = time.time()
+        self.ready.set()
+
+        for callback in self.swap_callbacks:
+            callback(processor)
+
+    def status(self) -> Dict:
+        processor = self.processor
+        return {
+            'ready': processor is not None,
+            'loading': processor is None and (self.deferred or (self.thread is not None and self.thread.is_alive())),
+            'movies': len(processor) if processor is not None else 0,
+            'version': processor.version if processor is not None else None,
+            'error': str(self.error) if self.error else None,
+            'load_seconds': round(self.loaded_at - self.started_at, 3) if self.loaded_at else None,
+            'swapped_at': self.swapped_at
+        }
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+from dash import Patch
+from typing import Dict, List
+
+# As figuras do layout já trazem template, eixos e escalas de cor; os
+# callbacks devolvem um Patch apenas com os dados e o título.
+TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+GENRE_COLORS = px.colors.qualitative.Set3
+VIRIDIS = px.colors.make_colorscale(px.colors.sequential.Viridis)
+RDYLGN = px.colors.make_colorscale(px.colors.diverging.RdYlGn)
+
+LOADING_TITLE = "Carregando dados..."
+EMPTY_TITLE = "Nenhum dado disponível"
+
+
+def _axis(title: str, **options) -> Dict:
+    return dict(options, title={'text': title})
+
+
+def _color_axis(colorscale: List, title: str) -> Dict:
+    return {'colorscale': colorscale, 'colorbar': {'title': {'text': title}}}
+
+
+def _assign(node, location: List, value):
+    # Copia só o caminho alterado; a figura base continua intacta
+    if not location:
+        return value
+    node = dict(node or {})
+    node[location[0]] = _assign(node.get(location[0]), location[1:], value)
+    return node
+
+
+def apply_patch(figure: Dict, patched: Patch) -> Dict:
+    for operation in patched.to_plotly_json()['operations']:
+        if operation['operation'] != 'Assign':
+            raise ValueError(f"Operação de Patch não suportada: {operation['operation']}")
+        figure = _assign(figure, operation['location'], operation['params']['value'])
+    return figure
+
+
+class FigureSpec:
+
+    def __init__(self, **layout):
+        self.layout = dict(layout, template=TEMPLATE, barmode='relative')
+
+    def initial(self, title: str = LOADING_TITLE) -> Dict:
+        return {'data': [], 'layout': dict(self.layout, title={'text': title})}
+
+    def patch(self, data: List[Dict], title: str) -> Patch:
+        patched = Patch()
+        patched['data'] = data
+        patched['layout']['title'] = {'text': title}
+        return patched
+
+    def message(self, title: str) -> Patch:
+        return self.patch([], title)
+
+    def render(self, patched: Patch) -> Dict:
+        return apply_patch(self.initial(), patched)
+
+
+GENRE_CHART = FigureSpec(
+    xaxis=_axis("Ano", tickmode='array', tickangle=0),
+    yaxis=_axis("Número de Filmes"),
+    legend={'title': {'text': "Gênero"}, 'tracegroupgap': 0},
+    colorway=GENRE_COLORS,
+    hovermode='closest'
+)
+COUNTRIES_CHART = FigureSpec(
+    xaxis=_axis("Número de Filmes"),
+    yaxis=_axis("País", categoryorder='total ascending'),
+    coloraxis=_color_axis(VIRIDIS, "Número de Filmes")
+)
+ROI_CHART = FigureSpec(
+    xaxis=_axis("ROI (%)", tickformat='.2f'),
+    yaxis=_axis("Filme", categoryorder='total ascending'),
+    coloraxis=_color_axis(RDYLGN, "ROI (%)")
+)
+SPENDING_CHART = FigureSpec(
+    xaxis=_axis("País", categoryorder='total descending'),
+    yaxis=_axis("Orçamento Total (Milhões $)"),
+    coloraxis=_color_axis(VIRIDIS, "Orçamento Total (Milhões $)")
+)
+POPULARITY_CHART = FigureSpec(
+    xaxis=_axis("Popularidade (escala log)", tickmode='array'),
+    yaxis=_axis("Avaliação")
+)
+
+
+def genre_figure(genre_data: pd.DataFrame, year_range: List[int]) -> Patch:
+    top_genres = genre_data.groupby('genre')['count'].sum().nlargest(10).index
+    top_data = genre_data[genre_data['genre'].isin(top_genres)]
+
+    # Uma série por gênero, na ordem em que aparecem (a mesma do px.bar)
+    data = []
+    for genre, rows in top_data.groupby('genre', sort=False):
+        data.append({
+            'type': 'bar',
+            'name': genre,
+            'legendgroup': genre,
+            'x': rows['year'].to_numpy(),
+            'y': rows['count'].to_numpy(),
+            'hovertemplate': f"Gênero={genre}<br>Ano=%{{x}}<br>Número de Filmes=%{{y}}<extra></extra>"
+        })
+
+    patched = GENRE_CHART.patch(data, "Top 10 Gêneros por Ano")
+    patched['layout']['xaxis']['tickvals'] = list(range(year_range[0], year_range[1] + 1))
+    return patched
+
+
+def countries_figure(countries_data: pd.DataFrame) -> Patch:
+    counts = countries_data['movie_count'].to_numpy()
+    return COUNTRIES_CHART.patch([{
+        'type': 'bar',
+        'orientation': 'h',
+        'x': counts,
+        'y': countries_data['country'].tolist(),
+        'marker': {'color': counts, 'coloraxis': 'coloraxis'},
+        'hovertemplate': "Número de Filmes=%{x}<br>País=%{y}<extra></extra>"
+    }], "Top 15 Países Produtores")
+
+
+def roi_figure(roi_data: pd.DataFrame) -> Patch:
+    roi = roi_data['roi'].to_numpy()
+    return ROI_CHART.patch([{
+        'type': 'bar',
+        'orientation': 'h',
+        'x': roi,
+        'y': roi_data['title'].astype(str).tolist(),
+        'marker': {'color': roi, 'coloraxis': 'coloraxis'},
+        'customdata': roi_data[['budget', 'revenue', 'year']].to_numpy(dtype=float),
+        'hovertemplate': (
+            "ROI (%)=%{x:.2f}<br>"
+            "Filme=%{y}<br>"
+            "Orçamento=%{customdata[0]:,.2f}<br>"
+            "Receita=%{customdata[1]:,.2f}<br>"
+            "Ano=%{customdata[2]}<extra></extra>"
+        )
+    }], "Top 15 Filmes por ROI (%)")
+
+
+def spending_figure(spending_data: pd.DataFrame) -> Patch:
+    millions = spending_data['total_budget'].to_numpy(dtype=float) / 1e6
+    customdata = np.column_stack([
+        spending_data['movie_count'].to_numpy(dtype=float),
+        spending_data['avg_budget'].to_numpy(dtype=float) / 1e6
+    ])
+    return SPENDING_CHART.patch([{
+        'type': 'bar',
+        'x': spending_data['country'].tolist(),
+        'y': millions,
+        'marker': {'color': millions, 'coloraxis': 'coloraxis'},
+        'customdata': customdata,
+        'hovertemplate': (
+            "País=%{x}<br>"
+            "Orçamento Total= %{y:,.2f}<br>"
+            "Número de Filmes= %{customdata[0]}<br>"
+            "Orçamento Médio= %{customdata[1]:,.2f}<extra></extra>"
+        )
+    }], "Gastos Totais com Filmes por País (Top 15)")
+
+
+def popularity_figure(density: Dict) -> Patch:
+    # O servidor envia só a grade agregada, nunca um ponto por filme
+    popularity_edges = density['popularity_edges']
+    rating_edges = density['rating_edges']
+    counts = density['counts'].astype(float)
+    counts[counts == 0] = np.nan
+
+    ticks = np.arange(np.floor(popularity_edges[0]), np.ceil(popularity_edges[-1]) + 1)
+    correlation = density['correlation']
+    correlation_text = "N/A" if np.isnan(correlation) else f"{correlation:.2f}"
+
+    patched = POPULARITY_CHART.patch([{
+        'type': 'heatmap',
+        'x': (popularity_edges[:-1] + popularity_edges[1:]) / 2,
+        'y': (rating_edges[:-1] + rating_edges[1:]) / 2,
+        'z': counts,
+        'colorscale': 'Viridis',
+        'colorbar': {'title': {'text': 'Filmes'}},
+        'customdata': 10 ** np.broadcast_to(popularity_edges[:-1], counts.shape),
+        'hovertemplate': (
+            "Popularidade a partir de %{customdata:,.1f}<br>"
+            "Avaliação≈%{y:.2f}<br>"
+            "Filmes=%{z}<extra></extra>"
+        )
+    }], f"{density['movies']:,} filmes · correlação {correlation_text}")
+    patched['layout']['xaxis']['tickvals'] = ticks.tolist()
+    patched['layout']['xaxis']['ticktext'] = [f"{10 ** tick:,.0f}" if tick >= 0 else f"{10 ** tick:g}" for tick in ticks]
+    return patched
@@ -0,0 +1,31 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def temp_path(path: str, suffix: str = '') -> str:
+    # Nome exclusivo do processo: cargas simultâneas nunca escrevem no mesmo arquivo temporário
+    return f'{path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}{suffix}'
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    # Lock entre processos (master, workers, ingest.py) sobre <path>.lock;
+    # leitores usam shared=True e só esperam pelas escritas
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f'{path}.lock', 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
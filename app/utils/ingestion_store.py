@@ -0,0 +1,125 @@
+import os
+import json
+import threading
+from typing import Dict, Iterator, Optional
+
+from .file_lock import file_lock, temp_path
+
+class IngestionStore:
+
+    def __init__(self, directory: str = 'data/ingestion'):
+        self.directory = directory
+        self.pages_path = os.path.join(directory, 'pages.jsonl')
+        self.details_path = os.path.join(directory, 'details.jsonl')
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.details = {}
+        self.gone = set()
+        # Linhas substituídas por gravações posteriores; removidas por compact()
+        self.superseded = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        for record in self._read_records(self.pages_path):
+            key = (record['year'], record['page'])
+            self.superseded += key in self.pages
+            self.pages[key] = record
+
+        for record in self._read_records(self.details_path):
+            self.superseded += record['id'] in self.details or record['id'] in self.gone
+            if record.get('gone'):
+                self.details.pop(record['id'], None)
+                self.gone.add(record['id'])
+            else:
+                self.details[record['id']] = record['details']
+                self.gone.discard(record['id'])
+
+    def _read_records(self, path: str) -> Iterator[Dict]:
+        if not os.path.exists(path):
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha truncada por uma execução interrompida
+                    continue
+
+    def _append_record(self, path: str, record: Dict):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+
+    def get_page(self, year: int, page: int) -> Optional[Dict]:
+        record = self.pages.get((year, page))
+        if record is None:
+            return None
+
+        return {
+            'total_pages': record['total_pages'],
+            'results': [dict(movie) for movie in record['results']]
+        }
+
+    def save_page(self, year: int, page: int, data: Dict):
+        record = {
+            'year': year,
+            'page': page,
+            'total_pages': data.get('total_pages', 1),
+            'results': data.get('results', [])
+        }
+
+        with self.lock:
+            previous = self.pages.get((year, page))
+            if previous == record:
+                return
+            self._append_record(self.pages_path, record)
+            self.pages[(year, page)] = record
+            self.superseded += previous is not None
+
+    def get_details(self, movie_id: int) -> Optional[Dict]:
+        return self.details.get(movie_id)
+
+    def save_details(self, movie_id: int, details: Dict):
+        with self.lock:
+            previous = self.details.get(movie_id)
+            if previous == details:
+                return
+            self._append_record(self.details_path, {'id': movie_id, 'details': details})
+            self.details[movie_id] = details
+            self.superseded += previous is not None or movie_id in self.gone
+            self.gone.discard(movie_id)
+
+    def is_gone(self, movie_id: int) -> bool:
+        return movie_id in self.gone
+
+    def save_gone(self, movie_id: int):
+        # Marca o filme como removido (404) para que retomadas não o busquem de novo
+        with self.lock:
+            if movie_id in self.gone:
+                return
+            self._append_record(self.details_path, {'id': movie_id, 'gone': True})
+            self.superseded += self.details.pop(movie_id, None) is not None
+            self.gone.add(movie_id)
+
+    def _rewrite(self, path: str, records: Iterator[Dict]):
+        tmp_path = temp_path(path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+
+    def compact(self) -> int:
+        # Reescreve os arquivos só com a versão atual de cada registro; sem
+        # isso, cada atualização periódica acrescentaria todas as páginas e
+        # detalhes de novo e o checkpoint cresceria sem limite.
+        with self.lock, file_lock(self.pages_path):
+            removed = self.superseded
+            if removed:
+                self._rewrite(self.pages_path, self.pages.values())
+                self._rewrite(self.details_path, [
+                    *({'id': movie_id, 'details': details} for movie_id, details in self.details.items()),
+                    *({'id': movie_id, 'gone': True} for movie_id in sorted(self.gone))
+                ])
+                self.superseded = 0
+        return removed
@@ -0,0 +1,59 @@
+import os
+import json
+import logging
+from datetime import datetime, timezone
+
+# Atributos padrão do LogRecord; o restante vem de `extra=` e vira campo
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in STANDARD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        entry.update(_extra_fields(record))
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return line
+
+
+def setup_logging(log_format: str = None, level: str = None):
+    log_format = (log_format or os.getenv('LOG_FORMAT', 'text')).lower()
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if getattr(existing, 'dashboard_handler', False):
+            root.removeHandler(existing)
+    handler.dashboard_handler = True
+    root.addHandler(handler)
+    root.setLevel(level)
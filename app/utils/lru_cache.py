@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+class LRUCache:
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self.entries = OrderedDict()
+        self.pending: Dict[Hashable, Future] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+            # Os callbacks de uma mesma interação chegam juntos: quem chega
+            # depois espera o cálculo em andamento em vez de repeti-lo
+            pending = self.pending.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self.pending[key] = Future()
+            else:
+                self.hits += 1
+                self.shared += 1
+
+        if not owner:
+            return pending.result()
+
+        # Calcula fora do lock para não serializar chaves diferentes
+        try:
+            value = compute()
+        except BaseException as e:
+            with self.lock:
+                del self.pending[key]
+            pending.set_exception(e)
+            raise
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            del self.pending[key]
+        pending.set_result(value)
+
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared
+            }
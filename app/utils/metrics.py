@@ -0,0 +1,224 @@
+import os
+import time
+import bisect
+import functools
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
+# Orçamento de custo por observação (timer + histograma); o valor medido é
+# exportado em /metrics como metrics_observation_overhead_seconds.
+OVERHEAD_BUDGET_SECONDS = 5e-6
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], labels: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]] = None, registry: 'Registry' = None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple, float] = {}
+        (registry or REGISTRY).register(self)
+
+    def samples(self) -> List[Tuple[Tuple, float]]:
+        if self.collect is not None:
+            return list(self.collect())
+        with self.lock:
+            return list(self.values.items())
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self.samples(), key=lambda sample: tuple(map(str, sample[0]))):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, registry: 'Registry' = None):
+        super().__init__(name, help_text, labelnames, registry=registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels) -> 'Timer':
+        return Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        with self.lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self.values.items()]
+
+        for labels, counts, total in sorted(series, key=lambda item: tuple(map(str, item[0]))):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_label = f'le="{_format_value(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, bucket_label)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Timer:
+
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self) -> 'Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.elapsed = time.perf_counter() - self.started
+        self.histogram.observe(self.elapsed, *self.labels)
+
+
+def timed(histogram: Histogram, label: str = None):
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        name = label or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, name)
+
+        return wrapper
+    return decorator
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self.lock:
+            if any(existing.name == metric.name for existing in self.metrics):
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self.metrics.append(metric)
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def measure_overhead(iterations: int = 20000) -> float:
+    histogram = Histogram('metrics_overhead_probe', 'Histograma descartável', ['label'], registry=Registry())
+
+    @timed(histogram, 'probe')
+    def noop():
+        pass
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        noop()
+    instrumented = time.perf_counter() - started
+
+    bare_noop = getattr(noop, '__wrapped__', noop)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        bare_noop()
+    bare = time.perf_counter() - started
+
+    return max(0.0, (instrumented - bare) / iterations)
+
+
+_overhead = []
+
+
+def _collect_overhead():
+    if not _overhead:
+        _overhead.append(measure_overhead())
+    return [((), _overhead[0])]
+
+
+Gauge('metrics_observation_overhead_seconds', 'Custo medido de uma observação de latência',
+      collect=_collect_overhead)
+Gauge('metrics_observation_overhead_budget_seconds', 'Orçamento de custo por observação de latência',
+      collect=lambda: [((), OVERHEAD_BUDGET_SECONDS)])
+
+# Tempo gasto no DataProcessor dentro da requisição atual; permite separar
+# o custo dos dados do custo de montar as figuras nos callbacks.
+_local = threading.local()
+
+
+def add_data_seconds(seconds: float):
+    _local.data_seconds = getattr(_local, 'data_seconds', 0.0) + seconds
+
+
+def pop_data_seconds() -> float:
+    seconds = getattr(_local, 'data_seconds', 0.0)
+    _local.data_seconds = 0.0
+    return seconds
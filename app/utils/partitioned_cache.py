@@ -0,0 +1,136 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+import numpy as np
+from typing import List, Dict, Optional, Iterable
+
+from .columnar_cache import BRIDGE_COLUMNS, write_columnar, load_columnar, columnar_to_records
+
+logger = logging.getLogger(__name__)
+
+RANGE_CACHE_PATTERN = re.compile(r'movies_(\d{4})_(\d{4})\.(cols|json)$')
+
+
+class PartitionedCache:
+
+    def __init__(self, directory: str = 'data/movies'):
+        self.directory = directory
+
+    def partition_path(self, year: int) -> str:
+        return os.path.join(self.directory, f'{year}.cols')
+
+    def cube_path(self, start_year: int, end_year: int) -> str:
+        # O cubo de agregados fica junto das partições de onde foi gerado
+        return os.path.join(self.directory, f'{start_year}_{end_year}.cube.npz')
+
+    def has(self, year: int) -> bool:
+        return os.path.exists(os.path.join(self.partition_path(year), 'meta.json'))
+
+    def missing(self, years: Iterable[int]) -> List[int]:
+        return [year for year in years if not self.has(year)]
+
+    def modified_at(self, year: int) -> Optional[float]:
+        meta_path = os.path.join(self.partition_path(year), 'meta.json')
+        return os.path.getmtime(meta_path) if os.path.exists(meta_path) else None
+
+    def signature(self, years: Iterable[int]) -> str:
+        # Muda sempre que alguma partição for reescrita, sem ler os dados
+        digest = hashlib.blake2b(digest_size=16)
+        for year in years:
+            meta_path = os.path.join(self.partition_path(year), 'meta.json')
+            if os.path.exists(meta_path):
+                stat = os.stat(meta_path)
+                digest.update(f'{year}:{stat.st_mtime_ns}:{stat.st_size};'.encode())
+        return digest.hexdigest()
+
+    def write(self, year: int, movies: List[Dict]):
+        os.makedirs(self.directory, exist_ok=True)
+        write_columnar(movies, self.partition_path(year))
+
+    def load(self, years: Iterable[int], columns: List[str] = None) -> Optional[Dict]:
+        # Só as partições pedidas são lidas do disco
+        partitions = [load_columnar(self.partition_path(year), columns) for year in years if self.has(year)]
+        if not partitions:
+            return None
+        if len(partitions) == 1:
+            return partitions[0]
+        return _concatenate(partitions)
+
+    def records(self, years: Iterable[int]) -> List[Dict]:
+        records = []
+        for year in years:
+            if self.has(year):
+                records.extend(columnar_to_records(self.partition_path(year)))
+        return records
+
+    def import_range_caches(self, years: Iterable[int], data_dir: str = 'data') -> List[int]:
+        # Divide caches antigos por intervalo (movies_<inicio>_<fim>) em partições anuais
+        wanted = set(self.missing(years))
+        imported = []
+
+        sources = sorted(glob.glob(os.path.join(data_dir, 'movies_*_*.*')),
+                         key=lambda path: (not path.endswith('.cols'), path))
+        for source in sources:
+            match = RANGE_CACHE_PATTERN.search(os.path.basename(source))
+            if not match or not wanted:
+                continue
+
+            start_year, end_year = int(match.group(1)), int(match.group(2))
+            covered = wanted & set(range(start_year, end_year + 1))
+            if not covered:
+                continue
+
+            if source.endswith('.cols'):
+                movies = columnar_to_records(source)
+            else:
+                with open(source, 'r', encoding='utf-8') as f:
+                    movies = json.load(f)
+
+            by_year = {}
+            for movie in movies:
+                if movie.get('year') in covered:
+                    by_year.setdefault(int(movie['year']), []).append(movie)
+
+            for year, year_movies in sorted(by_year.items()):
+                self.write(year, year_movies)
+                wanted.discard(year)
+                imported.append(year)
+
+            if by_year:
+                logger.info("Cache por intervalo convertido em partições anuais",
+                            extra={'source': source, 'years': sorted(by_year)})
+
+        return sorted(imported)
+
+
+def _concatenate(partitions: List[Dict]) -> Dict:
+    combined = {}
+    scalar_names = [name for name in partitions[0] if name not in BRIDGE_COLUMNS and name != 'country_names']
+    for name in scalar_names:
+        combined[name] = np.concatenate([partition[name] for partition in partitions])
+
+    # Cada partição tem seus próprios códigos de país; remapeia para uma
+    # tabela única na ordem de primeira aparição.
+    country_codes = {}
+    genre_movie, genre_id, country_movie, country_code = [], [], [], []
+    offset = 0
+    for partition in partitions:
+        names = partition['country_names']
+        remap = np.array([country_codes.setdefault(name, len(country_codes)) for name in names], dtype=np.int32)
+
+        genre_movie.append(np.asarray(partition['genre_movie']) + offset)
+        genre_id.append(np.asarray(partition['genre_id']))
+        country_movie.append(np.asarray(partition['country_movie']) + offset)
+        country_code.append(remap[np.asarray(partition['country_code'])] if len(names) else
+                            np.asarray(partition['country_code']))
+        offset += len(partition['id'])
+
+    combined['genre_movie'] = np.concatenate(genre_movie).astype(np.int32)
+    combined['genre_id'] = np.concatenate(genre_id).astype(np.int32)
+    combined['country_movie'] = np.concatenate(country_movie).astype(np.int32)
+    combined['country_code'] = np.concatenate(country_code).astype(np.int32)
+    combined['country_names'] = np.array(list(country_codes), dtype=object)
+    return combined
@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = rate
+        self.capacity = capacity if capacity else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def pause(self, seconds: float):
+        # Suspende todas as threads, p.ex. quando a API responde 429
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.last_refill = self.paused_until
+
+    def acquire(self, tokens: int = 1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill()
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from .data_processor import DataProcessor
+from .dataset import DatasetHolder
+from .tmdb_client import TMDBClient
+from .partitioned_cache import PartitionedCache
+
+logger = logging.getLogger(__name__)
+
+CURRENT_YEAR_INTERVAL = 24 * 3600
+PAST_YEAR_INTERVAL = 7 * 24 * 3600
+CHECK_INTERVAL = 3600
+INITIAL_DELAY = 60
+
+class RefreshScheduler:
+
+    def __init__(self, dataset: DatasetHolder, client_factory: Callable[[], TMDBClient],
+                 loader: Callable[[], DataProcessor], cache: PartitionedCache, start_year: int, end_year: int,
+                 state_path: str = 'data/refresh_state.json',
+                 current_interval: float = CURRENT_YEAR_INTERVAL,
+                 past_interval: float = PAST_YEAR_INTERVAL,
+                 check_interval: float = CHECK_INTERVAL):
+        self.dataset = dataset
+        self.client_factory = client_factory
+        self.loader = loader
+        self.cache = cache
+        self.start_year = start_year
+        self.end_year = end_year
+        self.state_path = state_path
+        self.current_interval = current_interval
+        self.past_interval = past_interval
+        self.check_interval = check_interval
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.last_refresh = self._load_state()
+
+    def _load_state(self) -> Dict[int, float]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = {int(year): refreshed_at for year, refreshed_at in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {}
+
+        # Sem histórico, a data de escrita da partição conta como última atualização
+        return {
+            year: state.get(year, self.cache.modified_at(year) or 0)
+            for year in range(self.start_year, self.end_year + 1)
+        }
+
+    def _save_state(self):
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({str(year): refreshed_at for year, refreshed_at in self.last_refresh.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def stale_years(self, now: float = None) -> List[int]:
+        now = now if now is not None else time.time()
+        current_year = datetime.fromtimestamp(now).year
+
+        stale = []
+        for year, refreshed_at in sorted(self.last_refresh.items()):
+            interval = self.current_interval if year >= current_year else self.past_interval
+            if now - refreshed_at >= interval:
+                stale.append(year)
+
+        return stale
+
+    def refresh(self, years: List[int]) -> bool:
+        with self.lock:
+            client = self.client_factory()
+            refreshed = []
+
+            for year in years:
+                movies = client.get_movies_by_year_range(year, year, refresh=True)
+                if client.last_run_failures or not movies:
+                    logger.warning("Atualização incompleta; mantendo os dados atuais", extra={'year': year})
+                    continue
+
+                # Cada ano é uma partição: só ela é reescrita
+                self.cache.write(year, movies)
+                refreshed.append(year)
+
+            if not refreshed:
+                return False
+
+            # O novo processor é montado fora do caminho das requisições e só
+            # então substitui o atual.
+            self.dataset.swap(self.loader())
+
+            now = time.time()
+            for year in refreshed:
+                self.last_refresh[year] = now
+            self._save_state()
+
+            logger.info("Dados atualizados", extra={'years': refreshed})
+            return True
+
+    def _run(self):
+        if self.stop_event.wait(INITIAL_DELAY):
+            return
+
+        while True:
+            stale = self.stale_years()
+            if stale and self.dataset.ready.is_set():
+                try:
+                    self.refresh(stale)
+                except Exception:
+                    logger.exception("Erro na atualização dos dados")
+
+            if self.stop_event.wait(self.check_interval):
+                return
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,344 @@
+import os
+import time
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Tuple
+
+from .data_processor import (
+    DataProcessor, genre_name, density_cells, density_result, QUERY_SECONDS, QUERY_TOTAL, METHOD_SECONDS,
+    QUERY_CACHE_SIZE, DENSITY_POPULARITY_BINS, DENSITY_RATING_BINS
+)
+from .file_lock import temp_path
+from .lru_cache import LRUCache
+from .metrics import timed, add_data_seconds
+from .streaming_stats import CorrelationAccumulator
+
+FORMAT_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE movies (
+    position INTEGER PRIMARY KEY,
+    id INTEGER,
+    title TEXT,
+    year INTEGER,
+    vote_average REAL,
+    popularity REAL,
+    budget INTEGER,
+    revenue INTEGER,
+    roi REAL,
+    density_cell INTEGER
+);
+CREATE TABLE countries (code INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE movie_genres (
+    row INTEGER PRIMARY KEY,
+    movie INTEGER NOT NULL,
+    genre_id INTEGER NOT NULL,
+    year INTEGER,
+    vote_average REAL
+);
+CREATE TABLE movie_countries (
+    row INTEGER PRIMARY KEY,
+    movie INTEGER NOT NULL,
+    country_code INTEGER NOT NULL,
+    year INTEGER,
+    vote_average REAL,
+    budget INTEGER
+);
+"""
+
+INDEXES = """
+CREATE INDEX movies_year_rating ON movies (year, vote_average, budget, revenue);
+CREATE INDEX movies_rating ON movies (vote_average);
+CREATE INDEX movies_budget ON movies (budget);
+CREATE INDEX movie_genres_year_rating ON movie_genres (year, vote_average, genre_id);
+CREATE INDEX movie_countries_year_rating ON movie_countries (year, vote_average, country_code, budget);
+CREATE INDEX movie_genres_genre ON movie_genres (genre_id, movie);
+CREATE INDEX movie_countries_country ON movie_countries (country_code, movie);
+"""
+
+MOVIE_COLUMNS = ['id', 'title', 'year', 'vote_average', 'popularity', 'budget', 'revenue', 'roi']
+
+
+def _native(values: np.ndarray) -> List:
+    # NaN vira NULL, como o NaN dos anos no DataFrame
+    return [None if isinstance(value, float) and value != value else value for value in values.tolist()]
+
+
+def _bridge_columns(columns: Dict[str, List], movies: np.ndarray, names: List[str]) -> List[List]:
+    return [[columns[name][movie] for movie in movies.tolist()] for name in names]
+
+
+def write_sqlite(processor: DataProcessor, path: str, signature: str = ''):
+    tmp_path = temp_path(path)
+
+    df = processor.base_df
+    columns = {name: _native(np.asarray(df[name], dtype=object if name == 'title' else None))
+               for name in MOVIE_COLUMNS if name in df}
+
+    density = np.full(processor.size, None, dtype=object)
+    popularity_edges = processor.popularity_edges()
+    if popularity_edges is not None:
+        rows = (processor.popularity > 0) & (processor.ratings > 0)
+        density[rows] = density_cells(processor.popularity[rows].astype(np.float64),
+                                      processor.ratings[rows].astype(np.float64), popularity_edges).tolist()
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            'INSERT INTO movies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            zip(range(processor.size), *[columns.get(name, [None] * processor.size) for name in MOVIE_COLUMNS],
+                density.tolist())
+        )
+        connection.executemany('INSERT INTO countries VALUES (?, ?)', enumerate(processor.country_names.tolist()))
+        # As pontes repetem ano, avaliação e orçamento do filme para que os
+        # GROUP BY sejam respondidos só pelos índices, sem JOIN com movies
+        connection.executemany('INSERT INTO movie_genres VALUES (?, ?, ?, ?, ?)', zip(
+            range(len(processor.genre_movie)), processor.genre_movie.tolist(), processor.genre_id.tolist(),
+            *_bridge_columns(columns, processor.genre_movie, ['year', 'vote_average'])
+        ))
+        connection.executemany('INSERT INTO movie_countries VALUES (?, ?, ?, ?, ?, ?)', zip(
+            range(len(processor.country_movie)), processor.country_movie.tolist(), processor.country_code.tolist(),
+            *_bridge_columns(columns, processor.country_movie, ['year', 'vote_average', 'budget'])
+        ))
+        connection.executescript(INDEXES)
+        connection.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('format', str(FORMAT_VERSION)),
+            ('version', processor.version),
+            ('signature', signature),
+            ('movies', str(processor.size)),
+            ('rating_dtype', processor.ratings.dtype.name),
+            ('popularity_edges', ','.join(repr(edge) for edge in popularity_edges) if popularity_edges is not None else '')
+        ])
+        connection.commit()
+        connection.execute('ANALYZE')
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, path)
+
+
+def read_meta(path: str) -> Optional[Dict[str, str]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError:
+        return None
+
+    if meta.get('format') != str(FORMAT_VERSION):
+        return None
+    return meta
+
+
+class SQLiteStore:
+
+    def __init__(self, path: str):
+        meta = read_meta(path)
+        if meta is None:
+            raise ValueError(f"Banco SQLite inválido ou inexistente: {path}")
+
+        self.path = path
+        self.version = meta['version']
+        self.signature = meta['signature']
+        self.size = int(meta['movies'])
+        # As avaliações são gravadas com a precisão do DataProcessor (float32 no
+        # esquema compacto); o limite é arredondado igual para que 7.1 >= 7.1
+        # seja verdadeiro nos dois backends.
+        self.rating_type = np.dtype(meta['rating_dtype']).type
+        self.popularity_edges = (np.array([float(edge) for edge in meta['popularity_edges'].split(',')])
+                                 if meta['popularity_edges'] else None)
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE)
+        self.local = threading.local()
+        self.country_names = np.array([name for name, in self._fetch('SELECT name FROM countries ORDER BY code', ())],
+                                      dtype=object)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexão somente leitura por thread e por processo (workers do
+        # Gunicorn não herdam a conexão do master)
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def _fetch(self, sql: str, params: Tuple) -> List[Tuple]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _where(self, filters: Tuple, table: str = 'm') -> Tuple[str, Tuple]:
+        year_range, min_rating, genres, countries = filters
+        movie = f'{table}.position' if table == 'm' else f'{table}.movie'
+        clauses, params = [], []
+        if year_range:
+            clauses.append(f'{table}.year BETWEEN ? AND ?')
+            params.extend(year_range[:2])
+        if min_rating > 0:
+            clauses.append(f'{table}.vote_average >= ?')
+            params.append(min_rating)
+        # Usa os índices (genre_id, movie) e (country_code, movie) das pontes
+        if genres:
+            clauses.append(f'{movie} IN (SELECT movie FROM movie_genres WHERE genre_id IN '
+                           f'({", ".join("?" * len(genres))}))')
+            params.extend(genres)
+        if countries:
+            clauses.append(f'{movie} IN (SELECT movie FROM movie_countries WHERE country_code IN '
+                           f'(SELECT code FROM countries WHERE name IN ({", ".join("?" * len(countries))})))')
+            params.extend(countries)
+        return ' AND '.join(clauses) or '1', tuple(params)
+
+    def query(self, year_range: List[int], min_rating: float, method: str, *args,
+              genres: List[int] = None, countries: List[str] = None):
+        filters = (
+            tuple(int(year) for year in year_range) if year_range else None,
+            float(self.rating_type(min_rating or 0)),
+            tuple(sorted(int(genre) for genre in genres)) if genres else (),
+            tuple(sorted(countries)) if countries else ()
+        )
+        key = filters + (method, args)
+        started = time.perf_counter()
+        computed = []
+
+        def compute():
+            computed.append(True)
+            with QUERY_SECONDS.time(method, 'sqlite'):
+                return getattr(self, method)(filters, *args)
+
+        result = self.query_cache.get_or_compute(key, compute)
+        add_data_seconds(time.perf_counter() - started)
+        QUERY_TOTAL.inc(method, 'miss' if computed else 'hit')
+        return result
+
+    def cache_stats(self) -> Dict:
+        return {'query': self.query_cache.stats()}
+
+    @timed(METHOD_SECONDS)
+    def get_summary_stats(self, filters: Tuple) -> Dict:
+        where, params = self._where(filters)
+        total, first_year, last_year, avg_rating, total_revenue = self._fetch(
+            f'SELECT COUNT(*), MIN(year), MAX(year), AVG(vote_average), SUM(revenue) FROM movies m WHERE {where}',
+            params
+        )[0]
+        if total == 0:
+            return {}
+
+        avg_budget = self._fetch(f'SELECT AVG(budget) FROM movies m WHERE {where} AND m.budget > 0', params)[0][0]
+        genre_where, _ = self._where(filters, 'g')
+        top_genre = self._fetch(
+            f'SELECT g.genre_id FROM movie_genres g WHERE {genre_where} '
+            'GROUP BY g.genre_id ORDER BY COUNT(*) DESC, MIN(g.row) LIMIT 1',
+            params
+        )
+
+        return {
+            'total_movies': total,
+            'years_range': f"{first_year if first_year is not None else np.nan:.0f} - "
+                           f"{last_year if last_year is not None else np.nan:.0f}",
+            'avg_rating': avg_rating,
+            'total_revenue': total_revenue,
+            'avg_budget': avg_budget if avg_budget is not None else np.nan,
+            'top_genre': genre_name(top_genre[0][0]) if top_genre else "N/A"
+        }
+
+    @timed(METHOD_SECONDS)
+    def get_genre_frequency_by_year(self, filters: Tuple) -> pd.DataFrame:
+        where, params = self._where(filters, 'g')
+        rows = self._fetch(
+            f'SELECT g.year, g.genre_id, COUNT(*) FROM movie_genres g '
+            f'WHERE {where} AND g.year IS NOT NULL GROUP BY g.year, g.genre_id',
+            params
+        )
+        if not rows:
+            return pd.DataFrame()
+
+        counts = pd.DataFrame(rows, columns=['year', 'genre_id', 'count'])
+        counts['genre'] = [genre_name(gid) for gid in counts['genre_id']]
+        return counts.groupby(['year', 'genre'])['count'].sum().reset_index()
+
+    def _ranked_countries(self, filters: Tuple, top_n: int, funded: bool) -> List[Tuple]:
+        where, params = self._where(filters, 'c')
+        if funded:
+            where += ' AND c.budget > 0'
+        # MIN(row) reproduz o desempate por primeira aparição das versões em memória
+        return self._fetch(
+            'SELECT n.name, t.movies, t.budget FROM ('
+            '    SELECT c.country_code AS code, COUNT(*) AS movies, SUM(c.budget) AS budget, MIN(c.row) AS first'
+            f'    FROM movie_countries c WHERE {where} GROUP BY c.country_code'
+            f') t JOIN countries n ON n.code = t.code ORDER BY {"t.budget" if funded else "t.movies"} DESC, t.first '
+            'LIMIT ?',
+            params + (top_n,)
+        )
+
+    @timed(METHOD_SECONDS)
+    def get_top_producing_countries(self, filters: Tuple, top_n: int = 15) -> pd.DataFrame:
+        rows = self._ranked_countries(filters, top_n, funded=False)
+        if not rows:
+            return pd.DataFrame()
+
+        return pd.DataFrame({
+            'country': np.array([row[0] for row in rows], dtype=object),
+            'movie_count': np.array([row[1] for row in rows], dtype=np.int64)
+        })
+
+    @timed(METHOD_SECONDS)
+    def get_movie_spending_by_country(self, filters: Tuple, top_n: int = 15) -> pd.DataFrame:
+        rows = self._ranked_countries(filters, top_n, funded=True)
+        if not rows:
+            return pd.DataFrame()
+
+        totals = np.array([row[2] for row in rows], dtype=np.int64)
+        counts = np.array([row[1] for row in rows], dtype=np.int64)
+        return pd.DataFrame({
+            'country': np.array([row[0] for row in rows], dtype=object),
+            'total_budget': totals,
+            'movie_count': counts,
+            'avg_budget': totals / counts
+        })
+
+    @timed(METHOD_SECONDS)
+    def get_best_roi_movies(self, filters: Tuple, min_budget: int = 1000000, top_n: int = 20) -> pd.DataFrame:
+        where, params = self._where(filters)
+        rows = self._fetch(
+            'SELECT title, budget, revenue, roi, year, vote_average FROM movies m '
+            f'WHERE {where} AND m.budget >= ? AND m.revenue > 0 AND m.roi > 0 '
+            'ORDER BY m.roi DESC, m.position LIMIT ?',
+            params + (min_budget, top_n)
+        )
+        if not rows:
+            return pd.DataFrame()
+
+        roi_df = pd.DataFrame(rows, columns=['title', 'budget', 'revenue', 'roi', 'year', 'vote_average'])
+        roi_df['year'] = roi_df['year'].astype(float)
+        return roi_df
+
+    @timed(METHOD_SECONDS)
+    def get_popularity_rating_density(self, filters: Tuple) -> Dict:
+        if self.popularity_edges is None:
+            return {}
+
+        where, params = self._where(filters)
+        rows = self._fetch(
+            'SELECT density_cell, COUNT(*), SUM(popularity), SUM(vote_average), SUM(popularity * popularity), '
+            'SUM(vote_average * vote_average), SUM(popularity * vote_average) FROM movies m '
+            f'WHERE {where} AND m.density_cell IS NOT NULL GROUP BY density_cell',
+            params
+        )
+        if not rows:
+            return {}
+
+        cells = np.array(rows, dtype=np.float64)
+        counts = np.zeros(DENSITY_RATING_BINS * DENSITY_POPULARITY_BINS, dtype=np.int64)
+        counts[cells[:, 0].astype(np.int64)] = cells[:, 1]
+        accumulator = CorrelationAccumulator.from_sums(int(counts.sum()), *cells[:, 2:].sum(axis=0))
+        return density_result(counts.reshape(DENSITY_RATING_BINS, DENSITY_POPULARITY_BINS),
+                              self.popularity_edges, accumulator)
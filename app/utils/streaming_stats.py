@@ -0,0 +1,79 @@
+import math
+import numpy as np
+
+
+class CorrelationAccumulator:
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    @classmethod
+    def from_moments(cls, n: int, mean_x: float, mean_y: float,
+                     m2_x: float, m2_y: float, c_xy: float) -> 'CorrelationAccumulator':
+        accumulator = cls()
+        accumulator.n = int(n)
+        accumulator.mean_x = float(mean_x)
+        accumulator.mean_y = float(mean_y)
+        accumulator.m2_x = float(m2_x)
+        accumulator.m2_y = float(m2_y)
+        accumulator.c_xy = float(c_xy)
+        return accumulator
+
+    @classmethod
+    def from_sums(cls, n: int, sum_x: float, sum_y: float,
+                  sum_xx: float, sum_yy: float, sum_xy: float) -> 'CorrelationAccumulator':
+        if n == 0:
+            return cls()
+        mean_x = sum_x / n
+        mean_y = sum_y / n
+        return cls.from_moments(
+            n, mean_x, mean_y,
+            max(0.0, sum_xx - sum_x * mean_x),
+            max(0.0, sum_yy - sum_y * mean_y),
+            sum_xy - sum_x * mean_y
+        )
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        if len(x) == 0:
+            return
+
+        mean_x = x.mean()
+        mean_y = y.mean()
+        dx = x - mean_x
+        dy = y - mean_y
+        self.merge(CorrelationAccumulator.from_moments(
+            len(x), mean_x, mean_y, np.dot(dx, dx), np.dot(dy, dy), np.dot(dx, dy)
+        ))
+
+    def merge(self, other: 'CorrelationAccumulator'):
+        # Combinação de momentos por blocos (Chan et al.): cada bloco é
+        # processado uma vez e descartado, com memória constante.
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean_x, self.mean_y = other.n, other.mean_x, other.mean_y
+            self.m2_x, self.m2_y, self.c_xy = other.m2_x, other.m2_y, other.c_xy
+            return
+
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.n = n
+
+    @property
+    def correlation(self) -> float:
+        if self.n < 2 or self.m2_x <= 0 or self.m2_y <= 0:
+            return float('nan')
+        return self.c_xy / math.sqrt(self.m2_x * self.m2_y)
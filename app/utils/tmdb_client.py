@@ -1,15 +1,172 @@
 import requests
 import os
-import time
+import re
 import json
-from typing import List, Dict, Optional
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
+
+from .rate_limiter import TokenBucket
+from .ingestion_store import IngestionStore
+from .partitioned_cache import PartitionedCache
+from .metrics import Counter, Histogram
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TMDB_REQUESTS_PER_SECOND = 40
+TMDB_TIMEOUT = (3.05, 20)
+TMDB_MAX_RETRIES = 5
+TMDB_BACKOFF_BASE = 0.5
+TMDB_BACKOFF_MAX = 30
+TMDB_RETRY_AFTER_MAX = 120
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Respostas definitivas: o filme foi removido do TMDB ou a página não existe
+GONE_STATUSES = {404, 422}
+RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = Histogram('tmdb_request_seconds', 'Latência das requisições à API do TMDB', ['endpoint'])
+REQUESTS_TOTAL = Counter('tmdb_requests_total', 'Requisições à API do TMDB por status', ['endpoint', 'status'])
+RETRIES_TOTAL = Counter('tmdb_retries_total', 'Novas tentativas de requisições ao TMDB', ['endpoint', 'status'])
+FAILURES_TOTAL = Counter('tmdb_failures_total', 'Requisições ao TMDB que falharam definitivamente', ['endpoint'])
+RATE_LIMIT_SECONDS = Histogram('tmdb_rate_limit_wait_seconds', 'Espera no limitador de requisições')
+
+class ResourceGone(Exception):
+    pass
+
+def endpoint_key(endpoint: str) -> str:
+    return re.sub(r'/\d+', '/{id}', endpoint)
+
+def redact(message: str) -> str:
+    return re.sub(r'api_key=[^&\s]+', 'api_key=***', message)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RequestStats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.bytes = {}
+        self.retries = {}
+        self.failures = {}
+
+    def _increment(self, counts: Dict, endpoint: str, amount: int = 1):
+        key = endpoint_key(endpoint)
+        with self.lock:
+            counts[key] = counts.get(key, 0) + amount
+
+    def record(self, endpoint: str, size: int):
+        self._increment(self.requests, endpoint)
+        self._increment(self.bytes, endpoint, size)
+
+    def record_retry(self, endpoint: str):
+        self._increment(self.retries, endpoint)
+
+    def record_failure(self, endpoint: str):
+        self._increment(self.failures, endpoint)
+
+    def reset(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes.clear()
+            self.retries.clear()
+            self.failures.clear()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                key: {
+                    'requests': self.requests.get(key, 0),
+                    'bytes': self.bytes.get(key, 0),
+                    'retries': self.retries.get(key, 0),
+                    'failures': self.failures.get(key, 0)
+                }
+                for key in sorted(set(self.requests) | set(self.failures))
+            }
+
+    def report(self) -> str:
+        with self.lock:
+            lines = ["Requisições à API:"]
+            for key in sorted(set(self.requests) | set(self.failures)):
+                lines.append(
+                    f"  {key}: {self.requests.get(key, 0)} ({self.bytes.get(key, 0) / 1e6:.2f} MB), "
+                    f"{self.retries.get(key, 0)} novas tentativas, {self.failures.get(key, 0)} falhas"
+                )
+            lines.append(
+                f"  Total: {sum(self.requests.values())} ({sum(self.bytes.values()) / 1e6:.2f} MB), "
+                f"{sum(self.retries.values())} novas tentativas, {sum(self.failures.values())} falhas"
+            )
+        return "\n".join(lines)
 
 class TMDBClient:
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = 8,
+                 requests_per_second: float = TMDB_REQUESTS_PER_SECOND,
+                 store: Optional[IngestionStore] = None,
+                 cache: Optional[PartitionedCache] = None,
+                 append_to_response: List[str] = None,
+                 timeout: Tuple[float, float] = TMDB_TIMEOUT,
+                 max_retries: int = TMDB_MAX_RETRIES,
+                 compress: bool = True,
+                 base_url: str = TMDB_BASE_URL):
         self.api_key = api_key
-        self.base_url = "https://api.themoviedb.org/3"
+        self.store = store
+        self.cache = cache or PartitionedCache()
+        self.append_to_response = list(append_to_response or [])
+        self.request_stats = RequestStats()
+        self.last_run_failures = 0
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.rate_limiter = TokenBucket(requests_per_second)
         self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate' if compress else 'identity',
+            'Connection': 'keep-alive'
+        })
+        # Uma conexão persistente por worker, mais uma para as páginas de
+        # discover da thread principal, que assim não esperam a fila de
+        # detalhes; pool_block evita abrir e descartar conexões extras.
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers + 1, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, TMDB_RETRY_AFTER_MAX)
+
+        # Backoff exponencial com jitter: metade fixa, metade aleatória
+        delay = min(TMDB_BACKOFF_MAX, TMDB_BACKOFF_BASE * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
 
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         if params is None:
@@ -17,23 +174,77 @@ class TMDBClient:
 
         params['api_key'] = self.api_key
 
-        try:
-            response = self.session.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição: {e}")
-            return None
+        key = endpoint_key(endpoint)
+        url = f"{self.base_url}{endpoint}"
+
+        for attempt in range(self.max_retries + 1):
+            with RATE_LIMIT_SECONDS.time():
+                self.rate_limiter.acquire()
+
+            response = None
+            status = 'error'
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                status = str(response.status_code)
+                self.request_stats.record(endpoint, len(response.content))
+                if response.status_code in GONE_STATUSES:
+                    raise ResourceGone(f"HTTP {response.status_code} em {key}")
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except RETRYABLE_ERRORS as e:
+                error = redact(str(e))
+            except requests.exceptions.RequestException as e:
+                # Erros do cliente (404, 401...) não melhoram com novas tentativas
+                self.request_stats.record_failure(endpoint)
+                FAILURES_TOTAL.inc(key)
+                logger.error("Erro na requisição", extra={'endpoint': key, 'status': status, 'error': redact(str(e))})
+                return None
+            finally:
+                REQUEST_SECONDS.observe(time.perf_counter() - started, key)
+                REQUESTS_TOTAL.inc(key, status)
+
+            if attempt == self.max_retries:
+                break
+
+            delay = self._retry_delay(attempt, response)
+            self.request_stats.record_retry(endpoint)
+            RETRIES_TOTAL.inc(key, status)
+            logger.warning("Repetindo requisição", extra={
+                'endpoint': key, 'status': status, 'attempt': attempt + 1, 'delay': round(delay, 3), 'error': error
+            })
+
+            if response is not None and response.status_code == 429:
+                # O limite é da conta: todas as threads aguardam juntas
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+        self.request_stats.record_failure(endpoint)
+        FAILURES_TOTAL.inc(key)
+        logger.error("Requisição falhou após novas tentativas", extra={
+            'endpoint': key, 'status': status, 'attempts': self.max_retries + 1, 'error': error
+        })
+        return None
 
     def get_popular_movies(self, page: int = 1, year: int = None) -> Optional[Dict]:
         params = {'page': page}
         if year:
             params['primary_release_year'] = year
 
-        return self._make_request("/movie/popular", params)
+        try:
+            return self._make_request("/movie/popular", params)
+        except ResourceGone:
+            return None
 
-    def get_movie_details(self, movie_id: int) -> Optional[Dict]:
-        return self._make_request(f"/movie/{movie_id}")
+    def get_movie_details(self, movie_id: int, append_to_response: List[str] = None) -> Optional[Dict]:
+        params = {}
+        if append_to_response:
+            params['append_to_response'] = ','.join(append_to_response)
+
+        return self._make_request(f"/movie/{movie_id}", params)
 
     def discover_movies(self, year: int, page: int = 1) -> Optional[Dict]:
         params = {
@@ -44,42 +255,134 @@ class TMDBClient:
         return self._make_request("/discover/movie", params)
 
     def get_genres(self) -> Optional[Dict]:
-        return self._make_request("/genre/movie/list")
+        try:
+            return self._make_request("/genre/movie/list")
+        except ResourceGone:
+            return None
 
-    def get_movies_by_year_range(self, start_year: int = 2020, end_year: int = 2024, max_pages: int = 5) -> List[Dict]:
-        all_movies = []
+    def _extract_details(self, details: Dict) -> Dict:
+        extracted = {
+            'budget': details.get('budget', 0),
+            'revenue': details.get('revenue', 0),
+            'runtime': details.get('runtime', 0),
+            'production_countries': details.get('production_countries', []),
+            'production_companies': details.get('production_companies', [])
+        }
+
+        for resource in self.append_to_response:
+            if resource in details:
+                extracted[resource] = details[resource]
+
+        return extracted
+
+    def _get_discover_page(self, year: int, page: int, refresh: bool = False) -> Optional[Dict]:
+        if self.store and not refresh:
+            checkpoint = self.store.get_page(year, page)
+            if checkpoint:
+                return checkpoint
+
+        data = self.discover_movies(year, page)
+
+        if self.store and data and 'results' in data:
+            self.store.save_page(year, page, data)
+
+        return data
+
+    def _fetch_movie_details(self, movie_id: int, refresh: bool = False) -> Optional[Dict]:
+        if self.store and not refresh and self.store.is_gone(movie_id):
+            raise ResourceGone(f"Filme {movie_id} removido do TMDB")
+
+        details = self.store.get_details(movie_id) if self.store and not refresh else None
 
-        for year in range(start_year, end_year + 1):
-            print(f"Buscando filmes de {year}...")
+        if details is None or any(resource not in details for resource in self.append_to_response):
+            try:
+                response = self.get_movie_details(movie_id, self.append_to_response)
+            except ResourceGone:
+                # Não é falha: o filme saiu do TMDB e não deve travar a partição do ano
+                if self.store:
+                    self.store.save_gone(movie_id)
+                raise
+            if not response:
+                return None
 
-            for page in range(1, max_pages + 1):
-                data = self.discover_movies(year, page)
+            details = self._extract_details(response)
+            if self.store:
+                self.store.save_details(movie_id, details)
 
-                if data and 'results' in data:
-                    movies = data['results']
+        return details
 
-                    for movie in movies:
-                        movie['year'] = year
+    def get_movies_by_year_range(self, start_year: int = 2020, end_year: int = 2024, max_pages: int = 5,
+                                 refresh: bool = False) -> List[Dict]:
+        all_movies = []
+        pending = {}
+        gone = set()
+        failed = 0
+
+        self.request_stats.reset()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for year in range(start_year, end_year + 1):
+                logger.info("Buscando filmes", extra={'year': year})
+
+                for page in range(1, max_pages + 1):
+                    try:
+                        data = self._get_discover_page(year, page, refresh)
+                    except ResourceGone:
+                        # Página além do limite da API: o ano terminou
+                        break
 
-                        details = self.get_movie_details(movie['id'])
-                        if details:
-                            movie.update({
-                                'budget': details.get('budget', 0),
-                                'revenue': details.get('revenue', 0),
-                                'runtime': details.get('runtime', 0),
-                                'production_countries': details.get('production_countries', []),
-                                'production_companies': details.get('production_companies', [])
-                            })
+                    if data and 'results' in data:
+                        movies = data['results']
 
-                    all_movies.extend(movies)
+                        for movie in movies:
+                            movie['year'] = year
+                            if movie['id'] not in pending:
+                                pending[movie['id']] = executor.submit(self._fetch_movie_details, movie['id'], refresh)
 
-                    time.sleep(0.25)
+                        all_movies.extend(movies)
 
-                    if page >= data.get('total_pages', 1):
+                        if page >= data.get('total_pages', 1):
+                            break
+                    else:
+                        if data is None:
+                            failed += 1
                         break
-                else:
-                    break
 
+            movie_ids = {future: movie_id for movie_id, future in pending.items()}
+            for done, future in enumerate(as_completed(movie_ids), start=1):
+                try:
+                    if future.result() is None:
+                        failed += 1
+                except ResourceGone:
+                    gone.add(movie_ids[future])
+                if done % 100 == 0 or done == len(pending):
+                    logger.info("Detalhes dos filmes", extra={
+                        'done': done, 'total': len(pending), 'failed': failed, 'gone': len(gone)
+                    })
+
+        if gone:
+            logger.info("Filmes removidos do TMDB descartados", extra={'movies': sorted(gone)})
+            all_movies = [movie for movie in all_movies if movie['id'] not in gone]
+
+        for movie in all_movies:
+            details = pending[movie['id']].result()
+            if details:
+                movie.update(details)
+
+        logger.info("Busca concluída", extra={
+            'movies': len(all_movies),
+            'duplicates': len(all_movies) + len(gone) - len(pending),
+            'gone': len(gone),
+            'failed': failed,
+            'requests': self.request_stats.snapshot()
+        })
+
+        if refresh and self.store:
+            removed = self.store.compact()
+            if removed:
+                logger.info("Checkpoint compactado", extra={'superseded_records': removed})
+
+        self.last_run_failures = failed
         return all_movies
 
     def save_data_to_cache(self, data: List[Dict], filename: str):
@@ -94,19 +397,44 @@ class TMDBClient:
         except FileNotFoundError:
             return None
 
-    def get_cached_or_fetch_movies(self, start_year: int, end_year: int) -> List[Dict]:
-        cache_file = f'movies_{start_year}_{end_year}.json'
+    def fill_partitions(self, start_year: int, end_year: int) -> List[int]:
+        years = list(range(start_year, end_year + 1))
+        missing = self.cache.missing(years)
+        if missing:
+            self.cache.import_range_caches(missing)
+            missing = self.cache.missing(years)
+
+        failures = 0
+        for year in missing:
+            logger.info("Partição não encontrada. Buscando dados da API...", extra={'year': year})
+            movies = self.get_movies_by_year_range(year, year)
 
-        cached_data = self.load_data_from_cache(cache_file)
-        if cached_data:
-            print(f"Dados carregados do cache: {len(cached_data)} filmes")
-            return cached_data
+            if self.last_run_failures:
+                # Partição incompleta não é salva; com checkpoint, a próxima execução só busca o que falta
+                failures += self.last_run_failures
+                logger.warning("Ingestão incompleta; a partição não será salva",
+                               extra={'year': year, 'failed': self.last_run_failures})
+            elif movies:
+                self.cache.write(year, movies)
+                logger.info("Partição salva", extra={'year': year, 'movies': len(movies)})
+
+        self.last_run_failures = failures
+        return self.cache.missing(years)
+
+    def get_cached_or_fetch_movies(self, start_year: int, end_year: int) -> List[Dict]:
+        missing = self.fill_partitions(start_year, end_year)
+        if missing:
+            logger.warning("Anos sem dados", extra={'years': missing})
 
-        print("Cache não encontrado. Buscando dados da API...")
-        movies = self.get_movies_by_year_range(start_year, end_year)
+        return self.cache.records(range(start_year, end_year + 1))
 
-        if movies:
-            self.save_data_to_cache(movies, cache_file)
-            print(f"Dados salvos no cache: {len(movies)} filmes")
+    def get_cached_or_fetch_columns(self, start_year: int, end_year: int, columns: List[str] = None) -> Optional[Dict]:
+        missing = self.fill_partitions(start_year, end_year)
+        if missing:
+            logger.warning("Anos sem dados", extra={'years': missing})
 
-        return movies
+        cached_columns = self.cache.load(range(start_year, end_year + 1), columns)
+        if cached_columns is not None:
+            logger.info("Dados carregados do cache particionado",
+                        extra={'movies': len(cached_columns['id']), 'years': f'{start_year}-{end_year}'})
+        return cached_columns
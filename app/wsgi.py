@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, dataset, refresh_scheduler, DATA_REFRESH_ENABLED
+
+server = app.server
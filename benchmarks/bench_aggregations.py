@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from synthetic import generate_movies
+from legacy_data_processor import LegacyDataProcessor
+from utils.data_processor import DataProcessor
+
+AGGREGATIONS = [
+    ('get_genre_frequency_by_year', ()),
+    ('get_top_producing_countries', (15,)),
+    ('get_movie_spending_by_country', (15,)),
+    ('get_summary_stats', ()),
+]
+
+
+def time_call(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compara as agregações com iterrows e com tabelas de ligação")
+    parser.add_argument('--sizes', default='2000,100000,1000000')
+    parser.add_argument('--legacy-max', type=int, default=1000000,
+                        help="Maior tamanho em que a versão com iterrows é medida")
+    parser.add_argument('--json', action='store_true', help="Saída em JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+
+    for size in [int(size) for size in args.sizes.split(',')]:
+        movies = generate_movies(size, with_text=False)
+        processor = DataProcessor(movies)
+        legacy = LegacyDataProcessor(movies) if size <= args.legacy_max else None
+
+        for name, call_args in AGGREGATIONS:
+            vectorized = time_call(getattr(processor, name), *call_args)
+            baseline = time_call(getattr(legacy, name), *call_args) if legacy else None
+            results.append({
+                'size': size,
+                'method': name,
+                'vectorized_s': round(vectorized, 6),
+                'iterrows_s': round(baseline, 6) if baseline is not None else None,
+                'speedup': round(baseline / vectorized, 1) if baseline is not None else None
+            })
+
+        del movies, processor, legacy
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'filmes':>9} {'método':<32} {'iterrows':>10} {'vetorizado':>11} {'speedup':>8}")
+    for row in results:
+        baseline = f"{row['iterrows_s']:.4f}s" if row['iterrows_s'] is not None else '-'
+        speedup = f"{row['speedup']}x" if row['speedup'] is not None else '-'
+        print(f"{row['size']:>9} {row['method']:<32} {baseline:>10} {row['vectorized_s']:>10.4f}s {speedup:>8}")
+
+
+if __name__ == '__main__':
+    main()
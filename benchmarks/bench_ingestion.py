@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import tempfile
+
+from fake_tmdb import add_fault_arguments, create_fake, PAGE_SIZE
+from run_benchmarks import git_commit
+
+from utils.tmdb_client import TMDBClient
+from utils.ingestion_store import IngestionStore
+from utils.partitioned_cache import PartitionedCache
+
+
+def run_ingestion(fake, workers: int, args: argparse.Namespace, pages: int) -> dict:
+    fake.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = IngestionStore(os.path.join(tmp, 'ingestion')) if args.with_store else None
+        client = TMDBClient('fake', max_workers=workers, requests_per_second=args.client_rps,
+                            store=store, cache=PartitionedCache(os.path.join(tmp, 'movies')),
+                            max_retries=args.max_retries, base_url=fake.base_url)
+
+        started = time.perf_counter()
+        movies = client.get_movies_by_year_range(min(fake.years), max(fake.years), pages)
+        elapsed = time.perf_counter() - started
+
+    stats = client.request_stats.snapshot()
+    requests = sum(row['requests'] for row in stats.values())
+    complete = sum(1 for movie in movies if 'budget' in movie)
+    return {
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'movies': len(movies),
+        'complete': complete,
+        'movies_per_s': round(complete / elapsed, 1),
+        'requests': requests,
+        'requests_per_s': round(requests / elapsed, 1),
+        'retries': sum(row['retries'] for row in stats.values()),
+        'failures': client.last_run_failures,
+        'server': fake.snapshot()
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Throughput da ingestão contra o TMDB local de fake_tmdb.py")
+    parser.add_argument('--workers', default='1,4,8,16', help="Números de workers do TMDBClient")
+    parser.add_argument('--client-rps', type=float, default=1000,
+                        help="Limite do TokenBucket do cliente (o padrão do TMDBClient é 40)")
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--with-store', action='store_true', help="Inclui o checkpoint em disco (IngestionStore)")
+    parser.add_argument('--verbose', action='store_true', help="Mostra os logs de novas tentativas do cliente")
+    parser.add_argument('--output', help="Arquivo JSON de saída (padrão: stdout)")
+    add_fault_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.verbose:
+        logging.getLogger('utils.tmdb_client').setLevel(logging.ERROR)
+
+    fake = create_fake(args)
+    fake.start()
+    pages = max(math.ceil(len(movies) / PAGE_SIZE) for movies in fake.years.values())
+    print(f"TMDB local com {fake.movies()} filmes em {fake.base_url} ({pages} páginas por ano)", file=sys.stderr)
+
+    results = []
+    print(f"{'workers':>7} {'tempo (s)':>10} {'filmes/s':>9} {'req/s':>8} {'repetições':>11} {'falhas':>7}", file=sys.stderr)
+    for workers in [int(workers) for workers in args.workers.split(',')]:
+        row = run_ingestion(fake, workers, args, pages)
+        results.append(row)
+        print(f"{row['workers']:>7} {row['seconds']:>10.2f} {row['movies_per_s']:>9.1f} {row['requests_per_s']:>8.1f} "
+              f"{row['retries']:>11} {row['failures']:>7}", file=sys.stderr)
+    fake.stop()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'movies': fake.movies(),
+            'latency_s': args.latency,
+            'jitter_s': args.jitter,
+            'rate_limit': args.rate_limit,
+            'error_429': args.error_429,
+            'error_5xx': args.error_5xx,
+            'client_rps': args.client_rps,
+            'seed': args.seed
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
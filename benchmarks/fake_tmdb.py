@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import gzip
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from typing import List, Dict, Optional, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'app'))
+
+from utils.data_processor import GENRE_MAP
+from utils.tmdb_client import endpoint_key
+
+DEFAULT_FIXTURE = os.path.join(ROOT, 'data', 'movies_2015_2024.json')
+PAGE_SIZE = 20
+MAX_PAGE = 500
+
+DISCOVER_FIELDS = [
+    'adult', 'backdrop_path', 'genre_ids', 'id', 'original_language', 'original_title', 'overview',
+    'popularity', 'poster_path', 'release_date', 'title', 'video', 'vote_average', 'vote_count'
+]
+DETAIL_FIELDS = DISCOVER_FIELDS + ['budget', 'revenue', 'runtime', 'production_countries', 'production_companies']
+SERVER_ERRORS = [500, 502, 503, 504]
+
+
+def load_fixture(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def error_body(status_code: int, message: str) -> Dict:
+    return {'success': False, 'status_code': status_code, 'status_message': message}
+
+
+class FaultInjector:
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0,
+                 error_429: float = 0.0, error_5xx: float = 0.0, retry_after: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.tokens = float(max(1, int(rate_limit)))
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + jitter)
+
+    def _over_limit(self) -> Optional[float]:
+        # Limite da conta: balde de fichas, como o do TMDB (~40-50 req/s)
+        now = time.monotonic()
+        capacity = max(1, int(self.rate_limit))
+        self.tokens = min(capacity, self.tokens + (now - self.last_refill) * self.rate_limit)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rate_limit
+
+    def fault(self) -> Optional[Tuple[int, Dict[str, str]]]:
+        with self.lock:
+            if self.rate_limit:
+                wait = self._over_limit()
+                if wait is not None:
+                    return 429, {'Retry-After': str(max(1, math.ceil(wait)))}
+            if self.error_429 and self.rng.random() < self.error_429:
+                return 429, {'Retry-After': f'{self.retry_after:g}'}
+            if self.error_5xx and self.rng.random() < self.error_5xx:
+                return self.rng.choice(SERVER_ERRORS), {}
+        return None
+
+
+class FakeTMDB:
+
+    def __init__(self, movies: List[Dict], faults: FaultInjector = None, api_key: str = None,
+                 compress: bool = True):
+        self.faults = faults or FaultInjector()
+        self.api_key = api_key
+        self.compress = compress
+        self.details = {}
+        self.years = {}
+        for movie in movies:
+            self.details.setdefault(movie['id'], {field: movie.get(field) for field in DETAIL_FIELDS})
+            self.years.setdefault(int(movie['year']), {})[movie['id']] = movie
+        # Mesma ordem do sort_by=popularity.desc usado pelo cliente
+        for year, by_id in self.years.items():
+            self.years[year] = [
+                {field: movie.get(field) for field in DISCOVER_FIELDS}
+                for movie in sorted(by_id.values(), key=lambda movie: (-movie.get('popularity', 0), movie['id']))
+            ]
+        self.genres = {'genres': [{'id': gid, 'name': name} for gid, name in sorted(GENRE_MAP.items())]}
+
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.server = None
+        self.thread = None
+
+    def movies(self) -> int:
+        return sum(len(movies) for movies in self.years.values())
+
+    def record(self, endpoint: str, status: int):
+        with self.lock:
+            key = (endpoint, status)
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            snapshot = {}
+            for (endpoint, status), count in sorted(self.stats.items()):
+                snapshot.setdefault(endpoint, {})[str(status)] = count
+            return snapshot
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def discover(self, params: Dict) -> Tuple[int, Dict]:
+        try:
+            year = int(params.get('primary_release_year', 0))
+            page = int(params.get('page', 1))
+        except ValueError:
+            return 422, error_body(22, "Invalid page: Pages start at 1 and max at 500.")
+        if not 1 <= page <= MAX_PAGE:
+            return 422, error_body(22, "Invalid page: Pages start at 1 and max at 500.")
+
+        movies = self.years.get(year, [])
+        return 200, {
+            'page': page,
+            'results': movies[(page - 1) * PAGE_SIZE:page * PAGE_SIZE],
+            'total_pages': max(1, math.ceil(len(movies) / PAGE_SIZE)),
+            'total_results': len(movies)
+        }
+
+    def movie(self, movie_id: str, params: Dict) -> Tuple[int, Dict]:
+        details = self.details.get(int(movie_id)) if movie_id.isdigit() else None
+        if details is None:
+            return 404, error_body(34, "The resource you requested could not be found.")
+
+        extras = [resource for resource in params.get('append_to_response', '').split(',') if resource]
+        if extras:
+            # A fixture não tem sub-recursos; devolve objetos vazios para o cliente seguir adiante
+            details = dict(details, **{resource: {} for resource in extras})
+        return 200, details
+
+    def route(self, path: str, params: Dict) -> Tuple[int, Dict]:
+        if self.api_key is not None and params.get('api_key') != self.api_key:
+            return 401, error_body(7, "Invalid API key: You must be granted a valid key.")
+
+        if path == '/discover/movie':
+            return self.discover(params)
+        if path == '/genre/movie/list':
+            return 200, self.genres
+        if path.startswith('/movie/') and path.count('/') == 2:
+            return self.movie(path[len('/movie/'):], params)
+        return 404, error_body(34, "The resource you requested could not be found.")
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path[2:] if url.path.startswith('/3/') else url.path
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+                delay = fake.faults.delay()
+                if delay:
+                    time.sleep(delay)
+
+                fault = fake.faults.fault()
+                if fault is not None:
+                    status, headers = fault
+                    payload = error_body(25, "Your request count is over the allowed limit.") if status == 429 \
+                        else error_body(11, "Internal error: Something went wrong, contact TMDb.")
+                else:
+                    status, payload = fake.route(path, params)
+                    headers = {}
+                fake.record(endpoint_key(path), status)
+
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json;charset=utf-8')
+                if fake.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=5)
+                    self.send_header('Content-Encoding', 'gzip')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-tmdb', daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/3'
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help="JSON de filmes no formato do cache")
+    parser.add_argument('--synthetic', type=int, help="Usa N filmes sintéticos em vez da fixture")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latência por requisição, em segundos")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variação uniforme (+/-) da latência")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Requisições por segundo antes de responder 429 (0 desativa)")
+    parser.add_argument('--error-429', type=float, default=0.0, help="Fração de respostas 429 aleatórias")
+    parser.add_argument('--error-5xx', type=float, default=0.0, help="Fração de respostas 5xx aleatórias")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After dos 429 aleatórios")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def create_fake(args: argparse.Namespace) -> FakeTMDB:
+    if args.synthetic:
+        from synthetic import generate_movies
+        movies = generate_movies(args.synthetic, seed=args.seed)
+    else:
+        movies = load_fixture(args.fixture)
+    faults = FaultInjector(args.latency, args.jitter, args.rate_limit, args.error_429, args.error_5xx,
+                           args.retry_after, args.seed)
+    return FakeTMDB(movies, faults, api_key=getattr(args, 'api_key', None))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do TMDB a partir do cache de filmes")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-key', help="Exige esta chave (padrão: aceita qualquer uma)")
+    add_fault_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    fake = create_fake(args)
+    base_url = fake.start(args.host, args.port)
+    print(f"TMDB local com {fake.movies()} filmes em {base_url}", file=sys.stderr)
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
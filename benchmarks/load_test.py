@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SLIDERS = ['year-slider', 'rating-slider']
+UPDATE_PATH = '_dash-update-component'
+# Conexões simultâneas por host nos navegadores (HTTP/1.1)
+BROWSER_CONNECTIONS = 6
+INTERACTION = 'interação'
+
+
+def wait_ready(session: requests.Session, url: str, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = session.get(f'{url}/ready', timeout=5)
+            if response.status_code == 200:
+                return response.json()
+        except requests.RequestException:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"O servidor em {url} não ficou pronto em {timeout:.0f} s")
+        time.sleep(1)
+
+
+def find_components(node, ids: list, found: dict) -> dict:
+    if isinstance(node, list):
+        for child in node:
+            find_components(child, ids, found)
+    elif isinstance(node, dict):
+        props = node.get('props', {})
+        if props.get('id') in ids:
+            found[props['id']] = props
+        for value in props.values():
+            find_components(value, ids, found)
+    return found
+
+
+def split_outputs(output: str) -> list:
+    # Mesmo formato do renderer do Dash: "..a.children...b.figure.." para múltiplas saídas
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    outputs = []
+    for part in parts:
+        component, prop = part.rsplit('.', 1)
+        outputs.append({'id': component, 'property': prop})
+    return outputs
+
+
+class SliderCallback:
+    def __init__(self, dependency: dict):
+        self.output = dependency['output']
+        outputs = split_outputs(self.output)
+        self.outputs = outputs if self.output.startswith('..') else outputs[0]
+        self.name = outputs[0]['id']
+        self.inputs = dependency['inputs']
+        self.state = dependency['state']
+
+    def payload(self, values: dict, changed: str) -> dict:
+        def props(dependencies):
+            return [dict(dep, value=values.get(f"{dep['id']}.{dep['property']}")) for dep in dependencies]
+
+        return {
+            'output': self.output,
+            'outputs': self.outputs,
+            'inputs': props(self.inputs),
+            'state': props(self.state),
+            'changedPropIds': [changed]
+        }
+
+
+def slider_callbacks(dependencies: list, names: list) -> list:
+    callbacks = []
+    for dependency in dependencies:
+        # Callbacks clientside não chegam ao servidor
+        if dependency.get('clientside_function'):
+            continue
+        if not any(dep['id'] in SLIDERS for dep in dependency['inputs']):
+            continue
+        callback = SliderCallback(dependency)
+        if not names or callback.name in names:
+            callbacks.append(callback)
+    return callbacks
+
+
+class SliderSession:
+    def __init__(self, sliders: dict, rng: random.Random):
+        self.rng = rng
+        self.years = sliders['year-slider']
+        self.rating = sliders['rating-slider']
+        self.values = {
+            'year-slider.value': list(self.years['value']),
+            'rating-slider.value': self.rating['value']
+        }
+
+    def move(self) -> str:
+        # Arrastar um dos controles alguns passos; às vezes um clique longe do valor atual
+        if self.rng.random() < 0.5:
+            low, high = self.values['year-slider.value']
+            step = self.rng.choice([-2, -1, 1, 2])
+            if self.rng.random() < 0.5:
+                low = min(max(low + step, self.years['min']), high)
+            else:
+                high = max(min(high + step, self.years['max']), low)
+            if self.rng.random() < 0.1:
+                low, high = sorted(self.rng.sample(range(self.years['min'], self.years['max'] + 1), 2))
+            self.values['year-slider.value'] = [low, high]
+            return 'year-slider.value'
+
+        step = self.rating['step']
+        positions = int(round((self.rating['max'] - self.rating['min']) / step))
+        current = int(round((self.values['rating-slider.value'] - self.rating['min']) / step))
+        if self.rng.random() < 0.1:
+            current = self.rng.randint(0, positions)
+        else:
+            current = min(max(current + self.rng.choice([-2, -1, 1, 2]), 0), positions)
+        self.values['rating-slider.value'] = self.rating['min'] + current * step
+        return 'rating-slider.value'
+
+
+def post_callback(session: requests.Session, url: str, callback: SliderCallback, values: dict,
+                  changed: str, timeout: float) -> tuple:
+    payload = callback.payload(values, changed)
+    started = time.monotonic()
+    try:
+        response = session.post(f'{url}/{UPDATE_PATH}', json=payload, timeout=timeout)
+        ok = response.status_code in (200, 204)
+        # Tamanho na rede (comprimido, se o servidor comprimir)
+        size = int(response.headers.get('Content-Length', len(response.content)))
+    except requests.RequestException:
+        ok = False
+        size = 0
+    return callback.name, started, time.monotonic(), ok, size
+
+
+def run_client(url: str, callbacks: list, sliders: dict, version: str, seed: int,
+               warmup_until: float, deadline: float, think: float,
+               timeout: float, samples: list, interactions: list):
+    rng = random.Random(seed)
+    session = requests.Session()
+    slider_session = SliderSession(sliders, rng)
+    slider_session.values['data-version.data'] = version
+    with ThreadPoolExecutor(max_workers=min(len(callbacks), BROWSER_CONNECTIONS)) as executor:
+        while time.monotonic() < deadline:
+            changed = slider_session.move()
+            values = dict(slider_session.values)
+            # Como o navegador: cada movimento dispara ao mesmo tempo os callbacks
+            # que dependem do slider alterado
+            started = time.monotonic()
+            results = list(executor.map(
+                lambda callback: post_callback(session, url, callback, values, changed, timeout), callbacks
+            ))
+            finished = time.monotonic()
+
+            if started >= warmup_until and finished <= deadline:
+                for name, request_started, request_finished, ok, size in results:
+                    samples.append((name, request_finished - request_started, ok, size))
+                interactions.append((INTERACTION, finished - started, all(row[3] for row in results),
+                                     sum(row[4] for row in results)))
+            if finished >= deadline:
+                return
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+
+
+def summarize(name: str, rows: list, seconds: float) -> dict:
+    latencies = np.array([row[1] for row in rows if row[2]]) * 1000
+    errors = sum(1 for row in rows if not row[2])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (None, None, None)
+    return {
+        'callback': name,
+        'requests': len(rows),
+        'errors': errors,
+        'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+        'throughput_rps': round(len(rows) / seconds, 2),
+        'p50_ms': None if p50 is None else round(float(p50), 2),
+        'p95_ms': None if p95 is None else round(float(p95), 2),
+        'p99_ms': None if p99 is None else round(float(p99), 2),
+        'avg_wire_bytes': round(float(np.mean([row[3] for row in rows])), 1) if rows else 0.0
+    }
+
+
+def print_table(results: list):
+    def ms(value):
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    print(f"{'callback':<20} {'req':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>7}", file=sys.stderr)
+    for row in results:
+        print(f"{row['callback']:<20} {row['requests']:>7} {row['throughput_rps']:>8.2f} "
+              f"{ms(row['p50_ms'])} {ms(row['p95_ms'])} {ms(row['p99_ms'])} {row['error_rate']:>6.1%}", file=sys.stderr)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga dos callbacks dos sliders em um dashboard em execução")
+    parser.add_argument('--url', default='http://localhost:8050')
+    parser.add_argument('--concurrency', type=int, default=8, help="Clientes simultâneos")
+    parser.add_argument('--duration', type=float, default=15, help="Duração da medição em segundos")
+    parser.add_argument('--warmup', type=float, default=2, help="Segundos iniciais descartados")
+    parser.add_argument('--think', type=float, default=0,
+                        help="Pausa média entre movimentos de slider, em segundos")
+    parser.add_argument('--callbacks', help="Ids das saídas a exercitar, separados por vírgula (padrão: todos)")
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Arquivo JSON de saída (padrão: stdout)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    url = args.url.rstrip('/')
+
+    session = requests.Session()
+    status = wait_ready(session, url, args.timeout)
+    dependencies = session.get(f'{url}/_dash-dependencies', timeout=args.timeout).json()
+    layout = session.get(f'{url}/_dash-layout', timeout=args.timeout).json()
+    sliders = find_components(layout, SLIDERS, {})
+
+    names = args.callbacks.split(',') if args.callbacks else []
+    callbacks = slider_callbacks(dependencies, names)
+    if not callbacks:
+        raise SystemExit("Nenhum callback do servidor depende dos sliders (modo CLIENTSIDE_FILTERING?)")
+
+    print(f"{args.concurrency} clientes por {args.duration:.0f} s contra {url} "
+          f"({status['movies']} filmes, callbacks: {', '.join(c.name for c in callbacks)})", file=sys.stderr)
+
+    samples = []
+    interactions = []
+    started = time.monotonic()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+    threads = [
+        threading.Thread(target=run_client, daemon=True, args=(
+            url, callbacks, sliders, status['version'], args.seed + client,
+            warmup_until, deadline, args.think, args.timeout, samples, interactions
+        ))
+        for client in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = [summarize(callback.name, [row for row in samples if row[0] == callback.name], args.duration)
+               for callback in callbacks]
+    results.append(summarize('total', samples, args.duration))
+    # Tempo até todos os callbacks de um movimento responderem
+    results.append(summarize(INTERACTION, interactions, args.duration))
+    print_table(results)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'url': url,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'think_s': args.think,
+            'browser_connections': BROWSER_CONNECTIONS,
+            'seed': args.seed,
+            'movies': status['movies'],
+            'version': status['version']
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
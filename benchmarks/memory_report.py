@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'app'))
+
+from synthetic import generate_movies
+from utils.data_processor import DataProcessor, COMPACT_COLUMNS
+from utils.columnar_cache import write_columnar, load_columnar
+
+
+def report_modes(cache_path: str, movies=None) -> dict:
+    modes = {}
+    if movies is not None:
+        modes['registros'] = DataProcessor(movies).memory_report()
+        modes['registros_compacto'] = DataProcessor(movies, compact=True).memory_report()
+    modes['colunar'] = DataProcessor.from_columns(load_columnar(cache_path)).memory_report()
+    modes['colunar_compacto'] = DataProcessor.from_columns(
+        load_columnar(cache_path, COMPACT_COLUMNS), compact=True
+    ).memory_report()
+    return modes
+
+
+def print_table(size, modes: dict):
+    print(f"\n{size} filmes", file=sys.stderr)
+    print(f"{'modo':<20} {'bytes/filme':>12} {'total (MB)':>11}", file=sys.stderr)
+    for mode, report in modes.items():
+        print(f"{mode:<20} {report['bytes_per_movie']:>12.1f} {report['total_bytes'] / 1e6:>11.2f}", file=sys.stderr)
+
+    compact = modes['colunar_compacto']
+    print("colunas do modo compacto (bytes/filme): " + ', '.join(
+        f"{name}={size / compact['movies']:.1f}" for name, size in compact['columns'].items()
+    ), file=sys.stderr)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Memória por filme do DataProcessor, com e sem o esquema compacto")
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--cache', help="Usa um cache colunar existente em vez de dados sintéticos")
+    parser.add_argument('--output', help="Arquivo JSON de saída (padrão: stdout)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {}
+
+    if args.cache:
+        modes = report_modes(args.cache)
+        print_table(args.cache, modes)
+        results[args.cache] = modes
+    else:
+        for size in [int(size) for size in args.sizes.split(',')]:
+            movies = generate_movies(size)
+            with tempfile.TemporaryDirectory() as tmp:
+                cache_path = os.path.join(tmp, 'movies.cols')
+                write_columnar(movies, cache_path)
+                modes = report_modes(cache_path, movies)
+            print_table(size, modes)
+            results[str(size)] = modes
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
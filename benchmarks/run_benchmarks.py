@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'app'))
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_movies
+from utils.data_processor import DataProcessor
+from utils.columnar_cache import write_columnar, load_columnar
+from utils.aggregate_cube import AggregateCube
+
+YEAR_RANGE = [2016, 2022]
+MIN_RATING = 6.5
+GENRES = [28, 12]
+COUNTRIES = ['United States of America', 'France']
+
+CALLBACKS = [
+    'update_stats',
+    'update_genre_chart',
+    'update_countries_chart',
+    'update_roi_chart',
+    'update_spending_chart',
+    'update_popularity_chart',
+]
+
+
+def measure(func, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def load_dashboard():
+    os.chdir(ROOT)
+    # As mensagens do carregamento não podem se misturar ao JSON em stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        import main
+        if main.dataset.thread is not None:
+            main.dataset.thread.join()
+    return main
+
+
+def cold_callback(main, processor, name):
+    callback = getattr(main, name)
+
+    def run():
+        processor.filter_cache.clear()
+        processor.query_cache.clear()
+        callback(YEAR_RANGE, MIN_RATING, None, None, processor.version)
+
+    return run
+
+
+def benchmark_size(size: int, repeat: int, with_text: bool, main) -> list:
+    movies = generate_movies(size, with_text=with_text)
+    processor = DataProcessor(movies)
+    view = processor.filter_data(YEAR_RANGE, MIN_RATING)
+
+    cases = [
+        ('DataProcessor.__init__', lambda: DataProcessor(movies)),
+        ('DataProcessor._create_dataframe', processor._create_dataframe),
+        ('filter_data', lambda: processor.filter_data(YEAR_RANGE, MIN_RATING)),
+        ('filter_data[genres,countries]', lambda: processor.filter_data(YEAR_RANGE, MIN_RATING, GENRES, COUNTRIES)),
+        ('get_genre_frequency_by_year', view.get_genre_frequency_by_year),
+        ('get_top_producing_countries', lambda: view.get_top_producing_countries(15)),
+        ('get_best_roi_movies', lambda: view.get_best_roi_movies(1000000, 15)),
+        ('get_popularity_rating_correlation', view.get_popularity_rating_correlation),
+        ('get_popularity_rating_density', view.get_popularity_rating_density),
+        ('get_movie_spending_by_country', lambda: view.get_movie_spending_by_country(15)),
+        ('get_summary_stats', view.get_summary_stats),
+        ('AggregateCube.build', lambda: AggregateCube.build(processor)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'movies.cols')
+        cases.append(('write_columnar', lambda: write_columnar(movies, cache_path)))
+        write_columnar(movies, cache_path)
+        cases.append(('DataProcessor.from_columns', lambda: DataProcessor.from_columns(load_columnar(cache_path))))
+
+        results = []
+        for name, func in cases:
+            wall, peak = measure(func, repeat)
+            results.append({'size': size, 'name': name, 'wall_s': round(wall, 6), 'peak_mb': round(peak / 1e6, 3)})
+
+    if main is not None:
+        processor.use_cube(AggregateCube.build(processor))
+        with contextlib.redirect_stdout(sys.stderr):
+            main.dataset.swap(processor)
+        for name in CALLBACKS:
+            wall, peak = measure(cold_callback(main, processor, name), repeat)
+            results.append({'size': size, 'name': f'main.{name}', 'wall_s': round(wall, 6), 'peak_mb': round(peak / 1e6, 3)})
+
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(row['size'], row['name']): row for row in json.load(f)['results']}
+
+    print(f"{'filmes':>9} {'caso':<36} {'antes':>10} {'depois':>10} {'variação':>9}", file=sys.stderr)
+    for row in results:
+        before = baseline.get((row['size'], row['name']))
+        if before is None or not before['wall_s']:
+            continue
+        change = (row['wall_s'] - before['wall_s']) / before['wall_s'] * 100
+        print(f"{row['size']:>9} {row['name']:<36} {before['wall_s']:>9.4f}s {row['wall_s']:>9.4f}s {change:>+8.1f}%", file=sys.stderr)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks do DataProcessor e dos callbacks do dashboard")
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-text', action='store_true',
+                        help="Gera registros sem overview/poster_path/backdrop_path (menos memória)")
+    parser.add_argument('--skip-callbacks', action='store_true')
+    parser.add_argument('--output', help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument('--compare', help="JSON de uma execução anterior para comparação")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # load_dashboard muda para a raiz do repositório (main.py usa caminhos relativos a data/)
+    args.output = os.path.abspath(args.output) if args.output else None
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+    dashboard = None if args.skip_callbacks else load_dashboard()
+
+    results = []
+    for size in [int(size) for size in args.sizes.split(',')]:
+        print(f"Executando benchmarks com {size} filmes...", file=sys.stderr)
+        results.extend(benchmark_size(size, args.repeat, not args.no_text, dashboard))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count()
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
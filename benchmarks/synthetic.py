@@ -0,0 +1,82 @@
+import random
+from typing import List, Dict
+
+GENRE_WEIGHTS = {
+    18: 30, 35: 20, 28: 15, 53: 15, 27: 10, 10749: 10, 12: 8, 80: 8, 878: 7,
+    14: 6, 16: 5, 9648: 5, 10751: 5, 99: 4, 36: 3, 10402: 3, 10752: 2, 37: 1, 10770: 1
+}
+
+COUNTRY_WEIGHTS = {
+    ('US', 'United States of America'): 45, ('GB', 'United Kingdom'): 8, ('FR', 'France'): 6,
+    ('CA', 'Canada'): 5, ('JP', 'Japan'): 5, ('DE', 'Germany'): 4, ('KR', 'South Korea'): 4,
+    ('IN', 'India'): 4, ('CN', 'China'): 3, ('ES', 'Spain'): 3, ('IT', 'Italy'): 2,
+    ('AU', 'Australia'): 2, ('BR', 'Brazil'): 2, ('MX', 'Mexico'): 2, ('BE', 'Belgium'): 1,
+    ('SE', 'Sweden'): 1, ('DK', 'Denmark'): 1, ('NZ', 'New Zealand'): 1, ('AR', 'Argentina'): 1
+}
+
+LANGUAGES = ['en', 'en', 'en', 'en', 'fr', 'ja', 'ko', 'es', 'hi', 'de', 'zh', 'it', 'pt']
+
+WORDS = ['Night', 'Last', 'Dark', 'Love', 'City', 'War', 'Secret', 'Lost', 'Dream',
+         'Road', 'Star', 'House', 'Blood', 'King', 'Summer', 'Ghost', 'Wild', 'Storm']
+
+
+def generate_movies(count: int, start_year: int = 2015, end_year: int = 2024,
+                    seed: int = 42, with_text: bool = True) -> List[Dict]:
+    rng = random.Random(seed)
+    genres = list(GENRE_WEIGHTS)
+    genre_weights = list(GENRE_WEIGHTS.values())
+    countries = list(COUNTRY_WEIGHTS)
+    country_weights = list(COUNTRY_WEIGHTS.values())
+
+    movies = []
+    for index in range(count):
+        year = rng.randint(start_year, end_year)
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+        has_budget = rng.random() < 0.35
+        budget = int(rng.lognormvariate(16.5, 1.3)) if has_budget else 0
+        if has_budget and rng.random() < 0.85:
+            revenue = int(budget * rng.lognormvariate(0.6, 1.1))
+        else:
+            revenue = 0
+
+        vote_count = int(rng.paretovariate(1.2) * 5) if rng.random() < 0.95 else 0
+        vote_average = round(min(10.0, max(0.0, rng.gauss(6.4, 1.1))), 3) if vote_count else 0
+
+        movie = {
+            'adult': False,
+            'genre_ids': [] if rng.random() < 0.03 else list(dict.fromkeys(
+                rng.choices(genres, genre_weights, k=rng.randint(1, 4))
+            )),
+            'id': 100000 + index,
+            'original_language': rng.choice(LANGUAGES),
+            'original_title': title,
+            'popularity': round(rng.lognormvariate(2.0, 1.2), 4),
+            'release_date': f'{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'title': title,
+            'video': False,
+            'vote_average': vote_average,
+            'vote_count': vote_count,
+            'year': year,
+            'budget': budget,
+            'revenue': revenue,
+            'runtime': rng.randint(75, 180),
+            'production_countries': [
+                {'iso_3166_1': iso, 'name': name}
+                for iso, name in dict.fromkeys(rng.choices(countries, country_weights, k=rng.randint(1, 3)))
+            ],
+            'production_companies': [
+                {'id': rng.randint(1, 200000), 'logo_path': None,
+                 'name': f'{rng.choice(WORDS)} Pictures', 'origin_country': 'US'}
+                for _ in range(rng.randint(0, 3))
+            ]
+        }
+
+        if with_text:
+            movie['overview'] = ' '.join(rng.choice(WORDS).lower() for _ in range(rng.randint(20, 60)))
+            movie['poster_path'] = f'/{rng.getrandbits(64):016x}.jpg'
+            movie['backdrop_path'] = f'/{rng.getrandbits(64):016x}.jpg'
+
+        movies.append(movie)
+
+    return movies
@@ -0,0 +1,89 @@
+import gc
+import os
+import sys
+import signal
+import threading
+
+pythonpath = 'app'
+wsgi_app = 'wsgi:server'
+bind = f"0.0.0.0:{os.getenv('PORT', '8050')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Carrega dados, DataProcessor e cubo uma única vez no master;
+# os workers herdam essas páginas via copy-on-write no fork.
+preload_app = True
+
+forked_before_ready = False
+
+
+def _preloaded_dataset():
+    wsgi = sys.modules.get('wsgi')
+    return wsgi.dataset if wsgi is not None else None
+
+
+def _freeze_heap():
+    # Move os objetos já carregados para a geração permanente, para que o
+    # coletor de lixo dos workers não escreva nessas páginas e force cópias.
+    gc.collect()
+    gc.freeze()
+
+
+def _reload_workers(server):
+    server.log.info("Novo conjunto de dados no master; substituindo workers")
+    os.kill(os.getpid(), signal.SIGHUP)
+
+
+def _on_dataset_swap(server):
+    def callback(processor):
+        # Libera o conjunto de dados anterior antes de congelar o novo heap
+        gc.unfreeze()
+        _freeze_heap()
+        _reload_workers(server)
+    return callback
+
+
+def _reload_when_loaded(server, dataset):
+    dataset.ready.wait()
+    if forked_before_ready:
+        _freeze_heap()
+        _reload_workers(server)
+
+
+def when_ready(server):
+    _freeze_heap()
+
+    dataset = _preloaded_dataset()
+    if dataset is None:
+        return
+
+    if not dataset.ready.is_set():
+        threading.Thread(target=_reload_when_loaded, args=(server, dataset), daemon=True).start()
+
+    # A atualização periódica roda só no master; os workers recebem os
+    # novos dados ao serem recriados a partir dele.
+    wsgi = sys.modules['wsgi']
+    if wsgi.DATA_REFRESH_ENABLED:
+        dataset.swap_callbacks.append(_on_dataset_swap(server))
+        wsgi.refresh_scheduler.start()
+
+
+def pre_fork(server, worker):
+    global forked_before_ready
+    dataset = _preloaded_dataset()
+    if dataset is not None and not dataset.ready.is_set():
+        forked_before_ready = True
+
+
+def post_fork(server, worker):
+    dataset = _preloaded_dataset()
+    if dataset is None:
+        return
+
+    dataset.swap_callbacks.clear()
+    if not dataset.ready.is_set():
+        # A thread de carga do master não sobrevive ao fork, mas a carga
+        # continua no master; o SIGHUP de _reload_when_loaded troca este
+        # worker por um que já herda os dados prontos.
+        dataset.defer()
@@ -0,0 +1,47 @@
+import os
+import sys
+import random
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'app'))
+sys.path.append(os.path.join(ROOT, 'benchmarks'))
+
+from synthetic import generate_movies
+from utils.data_processor import DataProcessor
+
+START_YEAR = 2015
+END_YEAR = 2024
+
+
+@pytest.fixture(scope='session')
+def movies():
+    movies = generate_movies(3000, START_YEAR, END_YEAR, seed=7, with_text=False)
+    # Parte das notas em décimos exatos (6.1, 7.1...), onde float32 e float64 divergem
+    for movie in movies[::3]:
+        movie['vote_average'] = round(movie['vote_average'], 1)
+    return movies
+
+
+@pytest.fixture(scope='session')
+def processor(movies):
+    return DataProcessor(movies, compact=True)
+
+
+@pytest.fixture(scope='session')
+def slider_states(processor):
+    # Estados aleatórios dos filtros, incluindo anos fora dos dados e notas arbitrárias
+    rng = random.Random(11)
+    genres = sorted({int(gid) for gid in processor.genre_id.tolist()})
+    countries = sorted(processor.country_names.tolist())
+
+    states = [([START_YEAR, END_YEAR], 0, [], []), ([START_YEAR, END_YEAR], 10, [], [])]
+    while len(states) < 2500:
+        low = rng.randint(START_YEAR - 2, END_YEAR)
+        high = rng.randint(low, END_YEAR + 2)
+        min_rating = rng.choice([0, rng.randint(0, 20) / 2, round(rng.uniform(0, 10), 1), rng.uniform(0, 10)])
+        selected_genres = rng.sample(genres, rng.randint(1, 3)) if rng.random() < 0.2 else []
+        selected_countries = rng.sample(countries, rng.randint(1, 2)) if rng.random() < 0.2 else []
+        states.append(([low, high], min_rating, selected_genres, selected_countries))
+    return states
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def assert_same(expected, actual, context: str = ''):
+    if isinstance(expected, pd.DataFrame):
+        assert isinstance(actual, pd.DataFrame), context
+        if expected.empty:
+            assert actual.empty, context
+            return
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                      check_dtype=False, rtol=1e-9, obj=context)
+    elif isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), context
+        for key, value in expected.items():
+            assert_same(value, actual[key], f'{context} {key}')
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), expected.astype(float),
+                                   rtol=1e-6, equal_nan=True, err_msg=context)
+    elif isinstance(expected, (float, np.floating)):
+        if np.isnan(expected):
+            assert np.isnan(actual), context
+        else:
+            assert actual == pytest.approx(expected, rel=1e-6), context
+    else:
+        assert expected == actual, context
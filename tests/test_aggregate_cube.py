@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from helpers import assert_same
+from utils.aggregate_cube import AggregateCube, load_or_build_cube, ROI_CANDIDATES
+from utils.data_processor import DataProcessor
+
+METHODS = [
+    ('get_summary_stats', ()),
+    ('get_genre_frequency_by_year', ()),
+    ('get_top_producing_countries', (15,)),
+    ('get_movie_spending_by_country', (15,)),
+    ('get_best_roi_movies', (1000000, 15)),
+    ('get_best_roi_movies', (1000000, ROI_CANDIDATES)),
+    ('get_popularity_rating_density', ()),
+]
+
+
+@pytest.fixture(scope='module')
+def cube(processor):
+    return AggregateCube.build(processor)
+
+
+def cube_states(count: int, seed: int = 5):
+    # O cubo responde só a notas em passos de 0,5 (os sliders do dashboard)
+    rng = random.Random(seed)
+    states = [([2015, 2024], 0), ([2015, 2024], 10), ([2013, 2014], 0), ([2024, 2026], 9.5)]
+    while len(states) < count:
+        low = rng.randint(2013, 2024)
+        states.append(([low, rng.randint(low, 2026)], rng.randint(0, 20) / 2))
+    return states
+
+
+@pytest.mark.parametrize('method,args', METHODS)
+def test_cube_matches_filter_data(processor, cube, method, args):
+    for year_range, min_rating in cube_states(300):
+        assert cube.supports(method, year_range, min_rating, args)
+        expected = getattr(processor.filter_data(year_range, min_rating), method)(*args)
+        assert_same(expected, cube.answer(processor, method, year_range, min_rating, args),
+                    f'{method}{args} {year_range} {min_rating}')
+
+
+def test_unsupported_states_fall_back_to_views(processor, cube):
+    assert not cube.supports('get_summary_stats', [2015, 2024], 7.1, ())
+    assert not cube.supports('get_best_roi_movies', [2015, 2024], 7, (5000000, 15))
+    assert not cube.supports('get_best_roi_movies', [2015, 2024], 7, (1000000, ROI_CANDIDATES + 1))
+    assert not cube.supports('get_popularity_rating_correlation', [2015, 2024], 7, ())
+
+
+def test_ties_keep_first_appearance():
+    # Drama e Comédia empatam; o DataFrame original desempata pela primeira aparição
+    movies = []
+    for index, (genre, country) in enumerate([(35, 'France'), (18, 'Spain'), (18, 'Spain'), (35, 'France')]):
+        movies.append({
+            'id': index + 1, 'title': f'Filme {index}', 'release_date': '2020-05-01', 'year': 2020,
+            'vote_average': 7.0, 'vote_count': 10, 'popularity': 5.0, 'budget': 2000000, 'revenue': 4000000,
+            'genre_ids': [genre], 'production_countries': [{'name': country}]
+        })
+    processor = DataProcessor(movies, compact=True)
+    cube = AggregateCube.build(processor)
+
+    for method, args in METHODS:
+        expected = getattr(processor.filter_data([2015, 2024], 0), method)(*args)
+        assert_same(expected, cube.answer(processor, method, [2015, 2024], 0, args), method)
+    assert cube.answer(processor, 'get_summary_stats', [2015, 2024], 0, ())['top_genre'] == 'Comédia'
+    countries = cube.answer(processor, 'get_top_producing_countries', [2015, 2024], 0, (15,))
+    assert countries['country'].tolist() == ['France', 'Spain']
+
+
+def test_saved_cube_is_reused_until_the_data_changes(processor, movies, tmp_path):
+    path = str(tmp_path / 'movies.cube.npz')
+    built = load_or_build_cube(processor, path)
+    loaded = AggregateCube.load(path)
+    assert loaded.version == built.version == processor.version
+    assert_same(built.answer(processor, 'get_summary_stats', [2016, 2020], 6.5, ()),
+                loaded.answer(processor, 'get_summary_stats', [2016, 2020], 6.5, ()))
+
+    changed = DataProcessor(movies[:-1], compact=True)
+    rebuilt = load_or_build_cube(changed, path)
+    assert rebuilt.version == changed.version != processor.version
+    assert AggregateCube.load(path).version == changed.version
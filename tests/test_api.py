@@ -0,0 +1,90 @@
+import pytest
+from flask import Flask
+
+from utils.api import create_api, MAX_TOP_N
+from utils.data_processor import DataProcessor
+from utils.dataset import DatasetHolder
+
+
+@pytest.fixture
+def dataset(processor):
+    dataset = DatasetHolder(lambda: None)
+    dataset.processor = processor
+    return dataset
+
+
+@pytest.fixture
+def client(dataset):
+    app = Flask(__name__)
+    app.register_blueprint(create_api(dataset, 2015, 2024))
+    return app.test_client()
+
+
+def test_responses_match_the_processor(client, processor):
+    response = client.get('/api/v1/countries?year_start=2016&year_end=2020&min_rating=6.5&top_n=5')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['version'] == processor.version
+    assert body['filters'] == {'year_start': 2016, 'year_end': 2020, 'min_rating': 6.5,
+                               'genres': [], 'countries': [], 'top_n': 5}
+    expected = processor.query([2016, 2020], 6.5, 'get_top_producing_countries', 5)
+    assert body['data'] == expected.to_dict('records')
+
+
+def test_genre_and_country_filters(client, processor):
+    response = client.get('/api/v1/summary?genre=28&genre=35&genre=28&country=France')
+    body = response.get_json()
+    assert body['filters']['genres'] == [28, 35]
+    assert body['filters']['countries'] == ['France']
+    expected = processor.query([2015, 2024], 0, 'get_summary_stats', genres=[28, 35], countries=['France'])
+    assert body['data']['total_movies'] == expected['total_movies']
+
+
+def test_etag_revalidation(client, dataset, movies):
+    response = client.get('/api/v1/summary')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    # A ETag depende só da versão dos dados, então vale para qualquer filtro
+    for url in ['/api/v1/summary', '/api/v1/roi?min_budget=5000000']:
+        revalidated = client.get(url, headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b''
+        assert revalidated.headers['ETag'] == etag
+
+    dataset.swap(DataProcessor(movies[:100], compact=True))
+    changed = client.get('/api/v1/summary', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['data']['total_movies'] == 100
+
+
+@pytest.mark.parametrize('query', [
+    'year_start=2020&year_end=2016',
+    'year_start=2010',
+    'year_end=dois mil',
+    'min_rating=11',
+    'min_rating=-1',
+    'min_rating=nan',
+    'min_rating=inf',
+    'min_rating=alto',
+    'top_n=0',
+    f'top_n={MAX_TOP_N + 1}',
+    'genre=ação',
+])
+def test_invalid_parameters_are_rejected(client, query):
+    endpoint = 'countries' if 'top_n' in query else 'summary'
+    response = client.get(f'/api/v1/{endpoint}?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_unknown_endpoint_and_loading(client, dataset):
+    response = client.get('/api/v1/atores')
+    assert response.status_code == 404
+    assert 'summary' in response.get_json()['endpoints']
+
+    dataset.processor = None
+    loading = client.get('/api/v1/summary')
+    assert loading.status_code == 503
+    assert loading.headers['Retry-After'] == '2'
@@ -0,0 +1,92 @@
+import os
+import json
+import random
+import shutil
+import subprocess
+
+import numpy as np
+import plotly
+import pytest
+
+from conftest import ROOT
+from utils.client_payload import build_client_payload
+from utils.figures import POPULARITY_CHART, popularity_figure
+
+CLIENTSIDE_JS = os.path.join(ROOT, 'app', 'assets', 'clientside.js')
+
+# Carrega o clientside.js num "window" vazio e aplica uma função a cada estado
+RUNNER = """
+const PreventUpdate = {};
+global.window = {dash_clientside: {}};
+require(process.argv[1]);
+window.dash_clientside.PreventUpdate = PreventUpdate;
+const input = JSON.parse(require('fs').readFileSync(0, 'utf-8'));
+const dashboard = window.dash_clientside.dashboard;
+const results = input.states.map(([yearRange, minRating, genres, countries]) => {
+    try {
+        return dashboard[input.name](yearRange, minRating, genres || null, countries || null, input.payload);
+    } catch (e) {
+        if (e === PreventUpdate) {
+            return 'PreventUpdate';
+        }
+        throw e;
+    }
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='node não instalado')
+
+
+def run_clientside(name, payload, states):
+    result = subprocess.run(
+        ['node', '-e', RUNNER, CLIENTSIDE_JS],
+        input=json.dumps({'name': name, 'payload': payload, 'states': states}, cls=plotly.utils.PlotlyJSONEncoder),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def as_array(values):
+    return np.array([[np.nan if value is None else value for value in row] for row in values], dtype=float)
+
+
+def test_popularity_chart_matches_server(processor):
+    payload = build_client_payload(processor)
+    rng = random.Random(3)
+    states = [([2015, 2024], 0), ([2015, 2024], 10), ([2013, 2014], 0), ([2024, 2024], 9.5)]
+    while len(states) < 60:
+        low = rng.randint(2013, 2024)
+        states.append(([low, rng.randint(low, 2026)], rng.randint(0, 20) / 2))
+
+    for (year_range, min_rating), actual in zip(states, run_clientside('popularity_chart', payload, states)):
+        density = processor.filter_data(year_range, min_rating).get_popularity_rating_density()
+        if not density:
+            assert actual['data'] == [], (year_range, min_rating)
+            continue
+
+        expected = POPULARITY_CHART.render(popularity_figure(density))
+        trace, actual_trace = expected['data'][0], actual['data'][0]
+        assert actual['layout']['title']['text'] == expected['layout']['title']['text']
+        for axis in ['x', 'y']:
+            np.testing.assert_allclose(actual_trace[axis], trace[axis], rtol=1e-9)
+        np.testing.assert_array_equal(as_array(actual_trace['z']), trace['z'])
+        np.testing.assert_allclose(actual_trace['customdata'], trace['customdata'], rtol=1e-9)
+        assert actual['layout']['xaxis']['tickvals'] == expected['layout']['xaxis']['tickvals']
+        assert actual['layout']['xaxis']['ticktext'] == expected['layout']['xaxis']['ticktext']
+
+
+def test_genre_and_country_filters_go_to_the_server(processor):
+    payload = build_client_payload(processor)
+    states = [([2015, 2024], 0, [], []), ([2015, 2024], 0, [28], []), ([2016, 2020], 5, [], ['France']),
+              ([2015, 2024], 0, [28], ['France'])]
+
+    for name in ['stats', 'genre_chart', 'countries_chart', 'roi_chart', 'spending_chart', 'popularity_chart']:
+        results = run_clientside(name, payload, states)
+        assert results[0] != 'PreventUpdate'
+        assert results[1:] == ['PreventUpdate'] * 3
+
+    # payload faz o papel do data-version aqui
+    filters = run_clientside('server_filters', 'v1', states)
+    assert filters[0] == 'PreventUpdate'
+    assert filters[1:] == [list(state) + ['v1'] for state in states[1:]]
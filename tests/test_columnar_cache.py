@@ -0,0 +1,42 @@
+import os
+import time
+import threading
+
+from utils.columnar_cache import write_columnar, load_columnar
+
+
+def test_readers_never_see_a_partition_mid_swap(movies, tmp_path):
+    path = os.path.join(tmp_path, '2020.cols')
+    versions = [movies[:50], movies[50:130]]
+    write_columnar(versions[0], path)
+
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        for turn in range(20):
+            write_columnar(versions[turn % 2], path)
+        stop.set()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                data = load_columnar(path)
+                assert data is not None
+                rows = len(data['id'])
+                assert rows in (50, 80)
+                assert len(data['genre_movie']) == 0 or data['genre_movie'].max() < rows
+            except Exception as e:
+                errors.append(e)
+                return
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # Nenhum diretório antigo ou temporário fica para trás
+    assert sorted(name for name in os.listdir(tmp_path) if not name.endswith('.lock')) == ['2020.cols']
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def expected_ids(movies, year_range, min_rating, genres, countries):
+    # Varredura direta dos registros; as notas na mesma precisão do processor (float32)
+    ids = set()
+    for movie in movies:
+        if not year_range[0] <= movie['year'] <= year_range[1]:
+            continue
+        if min_rating > 0 and np.float32(movie['vote_average']) < np.float32(min_rating):
+            continue
+        if genres and not set(genres) & set(movie['genre_ids']):
+            continue
+        names = {country['name'] for country in movie['production_countries']}
+        if countries and not set(countries) & names:
+            continue
+        ids.add(movie['id'])
+    return ids
+
+
+def test_genre_and_country_indexes_match_a_scan(movies, processor, slider_states):
+    filtered = [state for state in slider_states if state[2] or state[3]]
+    assert len(filtered) > 500
+
+    for year_range, min_rating, genres, countries in filtered:
+        view = processor.filter_data(year_range, min_rating, genres, countries)
+        assert set(view.df['id'].tolist()) == expected_ids(movies, year_range, min_rating, genres, countries), \
+            (year_range, min_rating, genres, countries)
+
+
+def test_unknown_genre_or_country_selects_nothing(processor):
+    assert len(processor.filter_data([2015, 2024], 0, genres=[999999])) == 0
+    assert len(processor.filter_data([2015, 2024], 0, countries=['Atlântida'])) == 0
+    assert len(processor.filter_data([2015, 2024], 0, genres=[28], countries=['Atlântida'])) == 0
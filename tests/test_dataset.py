@@ -0,0 +1,32 @@
+from utils.dataset import DatasetHolder
+
+
+class FakeProcessor:
+
+    def __init__(self, version: str):
+        self.version = version
+
+    def __len__(self):
+        return 1
+
+
+def test_load_callbacks_run_before_ready():
+    dataset = DatasetHolder(lambda: FakeProcessor('v1'))
+    seen = []
+
+    def callback(processor):
+        # O que o callback prepara precisa estar pronto quando ready for visto
+        seen.append((processor.version, dataset.processor is processor, dataset.ready.is_set()))
+
+    dataset.load_callbacks.append(callback)
+    dataset.start()
+    assert dataset.ready.wait(5)
+    assert seen == [('v1', True, False)]
+
+
+def test_load_callback_errors_do_not_block_ready():
+    dataset = DatasetHolder(lambda: FakeProcessor('v1'))
+    dataset.load_callbacks.append(lambda processor: 1 / 0)
+    dataset.start()
+    assert dataset.ready.wait(5)
+    assert dataset.status()['ready']
@@ -0,0 +1,90 @@
+import os
+
+from fake_tmdb import FakeTMDB, FaultInjector
+from utils.tmdb_client import TMDBClient
+from utils.ingestion_store import IngestionStore
+
+
+def line_count(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return sum(1 for _ in f)
+
+
+def test_reload_skips_truncated_lines(tmp_path):
+    store = IngestionStore(str(tmp_path))
+    store.save_page(2020, 1, {'total_pages': 3, 'results': [{'id': 1}]})
+    store.save_details(1, {'budget': 10})
+    store.save_gone(2)
+    # Execução interrompida no meio de uma gravação
+    with open(store.details_path, 'a', encoding='utf-8') as f:
+        f.write('{"id": 3, "deta')
+
+    reloaded = IngestionStore(str(tmp_path))
+    assert reloaded.get_page(2020, 1) == {'total_pages': 3, 'results': [{'id': 1}]}
+    assert reloaded.get_page(2020, 2) is None
+    assert reloaded.get_details(1) == {'budget': 10}
+    assert reloaded.get_details(3) is None
+    assert reloaded.is_gone(2)
+
+
+def test_unchanged_records_are_not_appended(tmp_path):
+    store = IngestionStore(str(tmp_path))
+    for _ in range(3):
+        store.save_page(2020, 1, {'total_pages': 1, 'results': [{'id': 1}]})
+        store.save_details(1, {'budget': 10})
+        store.save_gone(2)
+    assert line_count(store.pages_path) == 1
+    assert line_count(store.details_path) == 2
+    assert store.compact() == 0
+
+
+def test_compact_keeps_only_the_latest_records(tmp_path):
+    store = IngestionStore(str(tmp_path))
+    for budget in (10, 20, 30):
+        store.save_page(2020, 1, {'total_pages': 1, 'results': [{'id': 1, 'budget': budget}]})
+        store.save_details(1, {'budget': budget})
+    store.save_details(2, {'budget': 5})
+    store.save_gone(2)
+    store.save_gone(3)
+
+    reloaded = IngestionStore(str(tmp_path))
+    assert reloaded.superseded == store.superseded == 5
+    assert store.compact() == 5
+    assert line_count(store.pages_path) == 1
+    assert line_count(store.details_path) == 3
+    assert [name for name in os.listdir(tmp_path) if '.tmp-' in name] == []
+
+    compacted = IngestionStore(str(tmp_path))
+    assert compacted.superseded == 0
+    assert compacted.get_page(2020, 1)['results'] == [{'id': 1, 'budget': 30}]
+    assert compacted.get_details(1) == {'budget': 30}
+    assert compacted.is_gone(2) and compacted.is_gone(3)
+    assert compacted.get_details(2) is None
+
+
+def test_interrupted_ingestion_resumes_from_the_checkpoint(movies, tmp_path):
+    fake = FakeTMDB([movie for movie in movies if movie['year'] == 2019],
+                    faults=FaultInjector(error_5xx=0.3, seed=1))
+    base_url = fake.start()
+    try:
+        first = TMDBClient('chave', requests_per_second=1000, max_retries=0,
+                           store=IngestionStore(str(tmp_path)), base_url=base_url)
+        first.get_movies_by_year_range(2019, 2019)
+        assert first.last_run_failures > 0
+
+        fake.faults = FaultInjector()
+        fake.reset()
+        store = IngestionStore(str(tmp_path))
+        saved_pages, saved_details = len(store.pages), len(store.details)
+
+        second = TMDBClient('chave', requests_per_second=1000, store=store, base_url=base_url)
+        resumed = second.get_movies_by_year_range(2019, 2019)
+        assert second.last_run_failures == 0
+        assert len(resumed) == 100
+
+        # Só o que faltava no checkpoint é buscado de novo
+        requests = fake.snapshot()
+        assert requests['/movie/{id}'] == {'200': 100 - saved_details}
+        assert requests.get('/discover/movie', {}).get('200', 0) == 5 - saved_pages
+    finally:
+        fake.stop()
@@ -0,0 +1,94 @@
+import time
+import threading
+
+import pytest
+
+from utils.lru_cache import LRUCache
+
+
+def test_evicts_the_least_recently_used():
+    cache = LRUCache(2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 0)
+    cache.get_or_compute('c', lambda: 3)
+
+    assert cache.get_or_compute('a', lambda: 0) == 1
+    assert cache.get_or_compute('b', lambda: 20) == 20
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 4, 'shared': 0}
+
+
+def wait_until(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def start_waiting(cache, key, compute, callers):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+               for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_misses_compute_once():
+    cache = LRUCache(4)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(True)
+        started.set()
+        release.wait(5)
+        return 'valor'
+
+    threads, results = start_waiting(cache, 'chave', compute, 1)
+    assert started.wait(5)
+    waiters, waiter_results = start_waiting(cache, 'chave', compute, 4)
+    # Os quatro já estão esperando o cálculo em andamento
+    wait_until(lambda: cache.stats()['shared'] == 4)
+    release.set()
+    for thread in threads + waiters:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results + waiter_results == ['valor'] * 5
+    assert cache.stats() == {'size': 1, 'maxsize': 4, 'hits': 4, 'misses': 1, 'shared': 4}
+
+
+def test_failed_computation_is_shared_and_not_cached():
+    cache = LRUCache(4)
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise ValueError('falhou')
+
+    def call():
+        try:
+            cache.get_or_compute('chave', compute)
+        except ValueError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    wait_until(lambda: cache.stats()['shared'] == 1)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(errors) == 2
+    # A próxima chamada calcula de novo
+    assert cache.get_or_compute('chave', lambda: 'ok') == 'ok'
+    with pytest.raises(KeyError):
+        cache.pending['chave']
@@ -0,0 +1,79 @@
+import os
+import json
+
+from utils.columnar_cache import write_columnar
+from utils.partitioned_cache import PartitionedCache
+
+
+def countries_by_movie(data):
+    countries = {}
+    for movie, code in zip(data['movie_ids'], data['country_code'].tolist()):
+        countries.setdefault(movie, set()).add(data['country_names'][code])
+    return countries
+
+
+def load_with_ids(cache, years):
+    data = cache.load(years, ['id'])
+    data['movie_ids'] = data['id'][data['country_movie']].tolist()
+    return data
+
+
+def expected_countries(movies):
+    return {movie['id']: {country['name'] for country in movie['production_countries']}
+            for movie in movies if movie['production_countries']}
+
+
+def test_concatenate_remaps_country_codes(movies, tmp_path):
+    cache = PartitionedCache(os.path.join(tmp_path, 'movies'))
+    by_year = {}
+    for movie in movies:
+        by_year.setdefault(movie['year'], []).append(movie)
+    # Anos em ordem inversa de gravação: cada partição numera os países à sua maneira
+    for year in sorted(by_year, reverse=True):
+        cache.write(year, by_year[year])
+
+    years = sorted(by_year)
+    data = load_with_ids(cache, years)
+    assert len(data['id']) == len(movies)
+    assert len(set(data['country_names'])) == len(data['country_names'])
+    assert countries_by_movie(data) == expected_countries(movies)
+
+    # Primeira aparição na ordem das partições carregadas
+    first = {}
+    for year in years:
+        for movie in by_year[year]:
+            for country in movie['production_countries']:
+                first.setdefault(country['name'], len(first))
+    assert list(data['country_names']) == list(first)
+
+
+def test_import_range_caches_splits_json_and_columnar(movies, tmp_path):
+    data_dir = os.path.join(tmp_path, 'data')
+    os.makedirs(data_dir)
+    json_movies = [movie for movie in movies if movie['year'] in (2015, 2016)]
+    columnar_movies = [movie for movie in movies if movie['year'] in (2017, 2018)]
+    with open(os.path.join(data_dir, 'movies_2015_2016.json'), 'w', encoding='utf-8') as f:
+        json.dump(json_movies, f)
+    write_columnar(columnar_movies, os.path.join(data_dir, 'movies_2017_2018.cols'))
+
+    cache = PartitionedCache(os.path.join(data_dir, 'movies'))
+    cache.write(2016, json_movies[:1])
+
+    # 2016 já existe e não é sobrescrito; 2019 não está em nenhum cache
+    assert cache.import_range_caches([2015, 2016, 2017, 2018, 2019], data_dir) == [2015, 2017, 2018]
+    assert cache.missing(range(2015, 2020)) == [2019]
+
+    for year in (2015, 2017, 2018):
+        expected = sorted(movie['id'] for movie in movies if movie['year'] == year)
+        assert sorted(record['id'] for record in cache.records([year])) == expected
+    assert len(cache.records([2016])) == 1
+
+    data = load_with_ids(cache, [2015, 2017, 2018])
+    assert countries_by_movie(data) == expected_countries(
+        [movie for movie in movies if movie['year'] in (2015, 2017, 2018)]
+    )
+
+
+def test_cube_path_follows_the_cache_directory(tmp_path):
+    cache = PartitionedCache(os.path.join(tmp_path, 'outro'))
+    assert cache.cube_path(2015, 2024) == os.path.join(tmp_path, 'outro', '2015_2024.cube.npz')
@@ -0,0 +1,79 @@
+import time
+import threading
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucket
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        # Como o time.sleep real, nunca acorda antes do pedido (evita laços por arredondamento)
+        self.sleeps.append(seconds)
+        self.now += seconds + 1e-9
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_burst_up_to_capacity_then_rate(clock):
+    bucket = TokenBucket(10)
+    for _ in range(10):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    started = clock.now
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now - started == pytest.approx(0.5, abs=1e-6)
+
+
+def test_idle_time_refills_but_never_above_capacity(clock):
+    bucket = TokenBucket(4, capacity=2)
+    bucket.acquire(2)
+    clock.now += 60
+    bucket.acquire(2)
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.25, abs=1e-6)]
+
+
+def test_pause_blocks_until_deadline_and_empties_the_bucket(clock):
+    bucket = TokenBucket(10)
+    bucket.pause(3)
+
+    started = clock.now
+    bucket.acquire()
+    # Espera a pausa e ainda uma ficha nova, já que o balde foi esvaziado
+    assert clock.now - started == pytest.approx(3.1, abs=1e-6)
+
+    # Uma pausa menor não encurta a que já está em vigor
+    bucket.pause(5)
+    bucket.pause(1)
+    assert bucket.paused_until == pytest.approx(clock.now + 5, abs=1e-6)
+
+
+def test_threads_share_the_budget():
+    bucket = TokenBucket(200, capacity=10)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(15)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 60 fichas: 10 do balde cheio e 50 a 200/s
+    assert time.monotonic() - started >= 50 / 200 * 0.95
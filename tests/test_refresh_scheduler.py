@@ -0,0 +1,91 @@
+import os
+import json
+from datetime import datetime
+
+from utils.dataset import DatasetHolder
+from utils.partitioned_cache import PartitionedCache
+from utils.refresh_scheduler import RefreshScheduler, CURRENT_YEAR_INTERVAL, PAST_YEAR_INTERVAL
+
+NOW = datetime(2024, 6, 1).timestamp()
+
+
+class FakeClient:
+    # Filmes por ano; anos em failing simulam uma busca incompleta
+
+    def __init__(self, movies_by_year, failing=()):
+        self.movies_by_year = movies_by_year
+        self.failing = set(failing)
+        self.last_run_failures = 0
+        self.calls = []
+
+    def get_movies_by_year_range(self, start_year, end_year, refresh=False):
+        self.calls.append((start_year, refresh))
+        self.last_run_failures = 1 if start_year in self.failing else 0
+        return self.movies_by_year.get(start_year, [])
+
+
+def make_scheduler(tmp_path, client, loader=None, dataset=None):
+    return RefreshScheduler(
+        dataset or DatasetHolder(lambda: None), lambda: client, loader or (lambda: 'novo'),
+        PartitionedCache(str(tmp_path / 'movies')), 2022, 2024, state_path=str(tmp_path / 'state.json')
+    )
+
+
+def test_stale_years_use_a_shorter_interval_for_the_current_year(tmp_path):
+    scheduler = make_scheduler(tmp_path, FakeClient({}))
+    scheduler.last_refresh = {
+        2022: NOW - PAST_YEAR_INTERVAL,
+        2023: NOW - PAST_YEAR_INTERVAL + 60,
+        2024: NOW - CURRENT_YEAR_INTERVAL
+    }
+    assert scheduler.stale_years(NOW) == [2022, 2024]
+
+    scheduler.last_refresh[2024] = NOW - CURRENT_YEAR_INTERVAL + 60
+    assert scheduler.stale_years(NOW) == [2022]
+    assert scheduler.stale_years(NOW + 60) == [2022, 2023, 2024]
+
+
+def test_state_falls_back_to_partition_dates(movies, tmp_path):
+    cache = PartitionedCache(str(tmp_path / 'movies'))
+    cache.write(2023, [movie for movie in movies if movie['year'] == 2023])
+    with open(tmp_path / 'state.json', 'w', encoding='utf-8') as f:
+        json.dump({'2022': 123.0}, f)
+
+    scheduler = make_scheduler(tmp_path, FakeClient({}))
+    assert scheduler.last_refresh == {2022: 123.0, 2023: cache.modified_at(2023), 2024: 0}
+
+
+def test_refresh_rewrites_complete_years_and_swaps_the_dataset(movies, tmp_path):
+    by_year = {year: [movie for movie in movies if movie['year'] == year] for year in (2022, 2023)}
+    client = FakeClient(by_year, failing=[2023])
+    dataset = DatasetHolder(lambda: None)
+    dataset.processor = 'antigo'
+    swapped = []
+    dataset.swap_callbacks.append(swapped.append)
+
+    scheduler = make_scheduler(tmp_path, client, dataset=dataset)
+    assert scheduler.refresh([2022, 2023])
+
+    assert client.calls == [(2022, True), (2023, True)]
+    # O ano incompleto mantém a partição atual (aqui, nenhuma)
+    assert scheduler.cache.missing([2022, 2023]) == [2023]
+    assert len(scheduler.cache.records([2022])) == len(by_year[2022])
+
+    assert dataset.processor == 'novo' and swapped == ['novo']
+    assert dataset.ready.is_set() and dataset.swapped_at is not None
+
+    with open(tmp_path / 'state.json', 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    assert set(state) == {'2022', '2023', '2024'}
+    assert state['2022'] == scheduler.last_refresh[2022] > 0
+    assert state['2023'] == 0
+
+
+def test_refresh_without_complete_years_keeps_the_dataset(tmp_path):
+    dataset = DatasetHolder(lambda: None)
+    dataset.processor = 'antigo'
+    scheduler = make_scheduler(tmp_path, FakeClient({}, failing=[2024]), dataset=dataset)
+
+    assert not scheduler.refresh([2023, 2024])
+    assert dataset.processor == 'antigo'
+    assert not os.path.exists(tmp_path / 'state.json')
@@ -0,0 +1,43 @@
+import pytest
+
+from helpers import assert_same
+from utils.sqlite_store import SQLiteStore, write_sqlite
+
+METHODS = [
+    ('get_summary_stats', ()),
+    ('get_genre_frequency_by_year', ()),
+    ('get_top_producing_countries', (15,)),
+    ('get_movie_spending_by_country', (15,)),
+    ('get_best_roi_movies', (1000000, 15)),
+    ('get_best_roi_movies', (5000000, 3)),
+    ('get_popularity_rating_density', ()),
+]
+
+
+@pytest.fixture(scope='module')
+def store(processor, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('sqlite') / 'movies.sqlite')
+    write_sqlite(processor, path, 'signature')
+    return SQLiteStore(path)
+
+
+def test_metadata_matches_processor(processor, store):
+    assert store.version == processor.version
+    assert len(store) == len(processor)
+    assert store.signature == 'signature'
+
+
+@pytest.mark.parametrize('min_rating', [6.1, 7.1, 7.2, 7.7])
+def test_decimal_min_rating_matches_float32_columns(processor, store, min_rating):
+    expected = processor.filter_data([2015, 2024], min_rating).get_summary_stats()
+    assert store.query([2015, 2024], min_rating, 'get_summary_stats')['total_movies'] == expected['total_movies']
+
+
+def test_random_states_match_filter_data(processor, store, slider_states):
+    for index, (year_range, min_rating, genres, countries) in enumerate(slider_states):
+        view = processor.filter_data(year_range, min_rating, genres, countries)
+        # Um método por estado mantém o teste rápido e ainda cobre todos eles
+        method, args = METHODS[index % len(METHODS)]
+        context = f'{method}{args} {year_range} {min_rating} {genres} {countries}'
+        assert_same(getattr(view, method)(*args),
+                    store.query(year_range, min_rating, method, *args, genres=genres, countries=countries), context)
@@ -0,0 +1,143 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from fake_tmdb import FakeTMDB
+from utils import tmdb_client
+from utils.tmdb_client import (TMDBClient, ResourceGone, parse_retry_after, TMDB_BACKOFF_BASE,
+                               TMDB_RETRY_AFTER_MAX)
+from utils.ingestion_store import IngestionStore
+from utils.partitioned_cache import PartitionedCache
+
+
+def make_response(status: int, body: dict = None, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body if body is not None else {}).encode()
+    response.headers.update(headers or {})
+    response.url = 'http://tmdb.test/3/movie/1'
+    return response
+
+
+class ScriptedClient(TMDBClient):
+    # Responde cada requisição com o próximo item do roteiro e registra as esperas
+
+    def __init__(self, script: list, **kwargs):
+        super().__init__('chave', requests_per_second=1000, **kwargs)
+        self.script = list(script)
+        self.sleeps = []
+        self.pauses = []
+        self.session.get = self._get
+        self.rate_limiter.pause = self.pauses.append
+
+    def _get(self, url, params=None, timeout=None):
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(tmdb_client.time, 'sleep', sleeps.append)
+    logging.getLogger('utils.tmdb_client').setLevel(logging.CRITICAL)
+    return sleeps
+
+
+@pytest.mark.parametrize('value,expected', [('3', 3.0), ('0.5', 0.5), ('-2', 0.0), (None, None), ('', None),
+                                            ('soon', None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+def test_server_errors_are_retried_with_exponential_backoff(no_sleep):
+    client = ScriptedClient([make_response(503), make_response(502), requests.exceptions.ConnectionError('reset'),
+                             make_response(200, {'id': 1})])
+    assert client.get_movie_details(1) == {'id': 1}
+
+    assert len(no_sleep) == 3
+    for attempt, delay in enumerate(no_sleep):
+        # Metade fixa, metade aleatória
+        full = TMDB_BACKOFF_BASE * 2 ** attempt
+        assert full / 2 <= delay <= full
+    stats = client.request_stats.snapshot()['/movie/{id}']
+    assert (stats['retries'], stats['failures']) == (3, 0)
+
+
+def test_retry_after_pauses_every_thread(no_sleep):
+    client = ScriptedClient([make_response(429, headers={'Retry-After': '2'}),
+                             make_response(429, headers={'Retry-After': '100000'}),
+                             make_response(200, {'id': 1})])
+    assert client.get_movie_details(1) == {'id': 1}
+    assert client.pauses == [2.0, TMDB_RETRY_AFTER_MAX]
+    assert no_sleep == []
+
+
+def test_exhausted_retries_count_as_failure():
+    client = ScriptedClient([make_response(500)] * 3, max_retries=2)
+    assert client.get_movie_details(1) is None
+    assert client.script == []
+    stats = client.request_stats.snapshot()['/movie/{id}']
+    assert (stats['requests'], stats['retries'], stats['failures']) == (3, 2, 1)
+
+
+@pytest.mark.parametrize('status', [404, 422])
+def test_gone_responses_are_not_retried_or_failures(status):
+    client = ScriptedClient([make_response(status)])
+    with pytest.raises(ResourceGone):
+        client.get_movie_details(1)
+    stats = client.request_stats.snapshot()['/movie/{id}']
+    assert (stats['requests'], stats['retries'], stats['failures']) == (1, 0, 0)
+
+
+@pytest.mark.parametrize('status', [404, 422])
+def test_gone_is_none_for_list_endpoints(status):
+    # Só detalhes e discover tratam ResourceGone; as demais mantêm o retorno None
+    client = ScriptedClient([make_response(status), make_response(status)])
+    assert client.get_genres() is None
+    assert client.get_popular_movies(page=600) is None
+
+
+def test_pool_keeps_a_connection_for_discover():
+    client = TMDBClient('chave', max_workers=4)
+    assert client.session.get_adapter(client.base_url)._pool_maxsize == 5
+
+
+def test_other_client_errors_fail_without_retry():
+    client = ScriptedClient([make_response(401)])
+    assert client.get_movie_details(1) is None
+    stats = client.request_stats.snapshot()['/movie/{id}']
+    assert (stats['retries'], stats['failures']) == (0, 1)
+
+
+def test_deleted_movie_does_not_block_its_year(movies, tmp_path, monkeypatch):
+    # Sem os caches por intervalo de data/, tudo vem do TMDB local
+    monkeypatch.chdir(tmp_path)
+    fake = FakeTMDB([movie for movie in movies if movie['year'] in (2017, 2018)])
+    deleted = fake.years[2018][0]['id']
+    del fake.details[deleted]
+    base_url = fake.start()
+    try:
+        for run in range(2):
+            store = IngestionStore(str(tmp_path / 'ingestion'))
+            client = TMDBClient('chave', requests_per_second=1000, store=store, base_url=base_url,
+                                cache=PartitionedCache(str(tmp_path / f'movies-{run}')))
+            assert client.fill_partitions(2017, 2018) == []
+            assert client.last_run_failures == 0
+            assert store.is_gone(deleted)
+            ids = client.cache.load([2018])['id'].tolist()
+            # 5 páginas de 20 filmes, menos o removido
+            assert deleted not in ids and len(ids) == 99
+    finally:
+        fake.stop()